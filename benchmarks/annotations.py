@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+
+"""
+usage:
+    annotations.py [-n <classes>] [-a <annotations>] [-r <repeat>] [-c <revision>]...
+
+Measures what annotations cost at import time, for a module full of
+annotated classes, declared with conventional class statements and
+with @forward() and @continue_().
+
+The generated module declares <classes> classes (default 200),
+each with <annotations> annotated attributes (default 20), whose
+annotations refer to builtin generics and to the classes declared
+before it, e.g. "a3: list[tuple[int, C7]] | None".  It's compiled
+once; only running the module's code is timed.
+
+Reports the best time over <repeat> runs (default 5) of:
+
+    import      running the module's code
+    annotations then reading every class's __annotations__
+                (the first time, which evaluates them on 3.14+)
+
+Before Python 3.14, annotations are evaluated when the class body
+runs, so "import" pays for them.  Starting with 3.14 (PEP 649 and
+PEP 749) they're evaluated when someone asks for them; continue_
+merges the classes' __annotate__ functions instead of their
+__annotations__, so forward-declared classes don't pay for them
+at import time either.
+
+-c <revision> runs in regression mode: it compares two revisions of
+forward/__init__.py.  <revision> is either a path to a file or a git
+revision of this repository.  Specify -c twice to compare two
+revisions; specify it once to compare a revision against the
+working tree.
+"""
+
+import gc
+import sys
+import time
+
+import revisions
+
+
+def usage(s):
+    sys.exit(f"error: {s}\n\n{__doc__.strip()}")
+
+
+def make_source(classes, annotations, forwarded):
+    lines = []
+    for i in range(classes):
+        if forwarded:
+            lines.append("@forward()")
+            lines.append(f"class C{i}:")
+            lines.append("    ...")
+            lines.append(f"@continue_(C{i})")
+            lines.append("class _____:")
+        else:
+            lines.append(f"class C{i}:")
+        for j in range(annotations):
+            # (only earlier classes, so the class statements
+            # also work before 3.14.)
+            other = f"C{(i * annotations + j) % i}" if i else "int"
+            lines.append(f"    a{j}: list[tuple[int, {other}]] | None = None")
+        lines.append(f"    def get(self) -> dict[str, 'C{i}']:")
+        lines.append(f"        return {{}}")
+    return "".join(f"{line}\n" for line in lines)
+
+def make_code(classes, annotations, forwarded):
+    source = make_source(classes, annotations, forwarded)
+    return compile(source, f"<annotations {'forwarded' if forwarded else 'plain'}>", "exec")
+
+
+def time_import(code, module, classes, repeat):
+    """
+    returns a tuple of the best times, over repeat runs, to run
+    code (with the forward and continue_ from module, if it's not
+    None), and then to read the __annotations__ of every class.
+    """
+    best_import = best_annotations = None
+    names = [f"C{i}" for i in range(classes)]
+    for _ in range(repeat):
+        namespace = {"__name__": "annotated"}
+        if module is not None:
+            namespace["forward"] = module.forward
+            namespace["continue_"] = module.continue_
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            exec(code, namespace)
+            imported = time.perf_counter()
+            for name in names:
+                namespace[name].__annotations__
+            finished = time.perf_counter()
+        finally:
+            gc.enable()
+        if (best_import is None) or ((imported - start) < best_import):
+            best_import = imported - start
+        if (best_annotations is None) or ((finished - imported) < best_annotations):
+            best_annotations = finished - imported
+    return best_import, best_annotations
+
+def check(plain, forwarded, module, classes):
+    """
+    checks that the forward-declared classes end up with
+    the same annotations as the conventional ones.
+    """
+    namespaces = []
+    for code, m in ((plain, None), (forwarded, module)):
+        namespace = {"__name__": "annotated"}
+        if m is not None:
+            namespace["forward"] = m.forward
+            namespace["continue_"] = m.continue_
+        exec(code, namespace)
+        namespaces.append(namespace)
+    for i in range(classes):
+        expected = {name: repr(value) for name, value in namespaces[0][f"C{i}"].__annotations__.items()}
+        found = {name: repr(value) for name, value in namespaces[1][f"C{i}"].__annotations__.items()}
+        if expected != found:
+            sys.exit(f"error: the annotations of C{i} don't match:\n    plain:     {expected}\n    forwarded: {found}")
+
+
+def print_row(label, times, baseline=None):
+    imported, annotations = times
+    total = imported + annotations
+    ratio = f"{total / sum(baseline):8.2f}" if baseline else f"{'':8}"
+    print(f"{label:<24} {imported * 1e3:10.2f} {annotations * 1e3:14.2f} {total * 1e3:10.2f} {ratio}")
+
+
+def main():
+    classes = 200
+    annotations = 20
+    repeat = 5
+    compare = []
+
+    process_classes = False
+    process_annotations = False
+    process_repeat = False
+    process_compare = False
+
+    for arg in sys.argv[1:]:
+        if process_classes or process_annotations or process_repeat:
+            if not arg.isdigit() or not int(arg):
+                option = "-n" if process_classes else "-a" if process_annotations else "-r"
+                usage(f"invalid argument to {option}: {arg!r}")
+            if process_classes:
+                classes = int(arg)
+            elif process_annotations:
+                annotations = int(arg)
+            else:
+                repeat = int(arg)
+            process_classes = process_annotations = process_repeat = False
+            continue
+        if process_compare:
+            compare.append(arg)
+            process_compare = False
+            continue
+        if arg == "-n":
+            process_classes = True
+            continue
+        if arg == "-a":
+            process_annotations = True
+            continue
+        if arg == "-r":
+            process_repeat = True
+            continue
+        if arg == "-c":
+            process_compare = True
+            continue
+        usage("unknown option " + arg)
+
+    if process_classes or process_annotations or process_repeat or process_compare:
+        usage("missing argument")
+    if len(compare) > 2:
+        usage("-c may only be specified twice")
+
+    plain = make_code(classes, annotations, False)
+    forwarded = make_code(classes, annotations, True)
+
+    print(f"Python {sys.version.split()[0]}, {classes} classes with {annotations} annotations each\n")
+    print(f"{'':<24} {'import ms':>10} {'annotations ms':>14} {'total ms':>10} {'ratio':>8}")
+    baseline = time_import(plain, None, classes, repeat)
+    print_row("class statement", baseline)
+
+    if compare:
+        if len(compare) == 1:
+            compare.append(None)
+        for revision in compare:
+            module = revisions.load_forward(revision)
+            check(plain, forwarded, module, classes)
+            print_row(revisions.describe(revision), time_import(forwarded, module, classes, repeat), baseline)
+        return
+
+    module = revisions.load_forward()
+    check(plain, forwarded, module, classes)
+    print_row("forward()/continue_()", time_import(forwarded, module, classes, repeat), baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+
+"""
+usage:
+    class_creation.py [-n <seconds>] [-g] [-a] [-c <revision>]...
+
+Measures the cost of declaring a class with @forward() and
+@continue_() compared to a single conventional class statement.
+
+Sweeps four dimensions, one at a time, starting from a small
+baseline class:
+
+    attributes  plain class attributes in the body
+    supercalls  methods using no-argument super()
+                (continue_ has to repoint their __class__ cell)
+    annotations annotated class attributes
+    depth       depth of the chain of base classes
+
+For every configuration it reports the time per class, and the
+memory allocated per class (as measured by tracemalloc) for
+both the plain class statement and forward()/continue_().
+
+-n <seconds> is roughly how long to spend timing each measurement.
+The default is 0.2.
+
+-g sweeps the full grid of every combination of the dimensions,
+instead of one dimension at a time.  (This takes a while.)
+
+-a skips the allocation measurements, which are slow.
+
+-c <revision> runs in regression mode: it compares two revisions of
+forward/__init__.py, instead of comparing forward() against the
+class statement.  <revision> is either a path to a file or a git
+revision of this repository.  Specify -c twice to compare two
+revisions; specify it once to compare a revision against the
+working tree.
+"""
+
+import itertools
+import sys
+import timeit
+import tracemalloc
+
+import revisions
+
+
+dimensions = {
+    "attributes": (0, 10, 100),
+    "supercalls": (0, 10, 50),
+    "annotations": (0, 10, 100),
+    "depth": (0, 3, 10),
+}
+
+baseline = {name: values[0] for name, values in dimensions.items()}
+baseline["attributes"] = 10
+
+
+def usage(s):
+    sys.exit(f"error: {s}\n\n{__doc__.strip()}")
+
+
+def class_body(attributes, supercalls, annotations, indent):
+    lines = []
+    for i in range(attributes):
+        lines.append(f"a{i} = {i}")
+    for i in range(annotations):
+        lines.append(f"n{i}: int = {i}")
+    for i in range(supercalls):
+        lines.append(f"def m{i}(self):")
+        lines.append(f"    return super().__init__")
+    if not lines:
+        lines.append("pass")
+    return "".join(f"{indent}{line}\n" for line in lines)
+
+def make_factories(attributes, supercalls, annotations, depth):
+    """
+    returns a tuple of two functions, (plain, forwarded).
+    each one declares and returns a new class with the specified
+    shape.  forwarded takes the forward and continue_ functions
+    to use as arguments.
+    """
+    base = "object"
+    namespace = {}
+    for i in range(depth):
+        exec(f"class Base{i}({base}):\n    pass\n", namespace)
+        base = f"Base{i}"
+
+    body = class_body(attributes, supercalls, annotations, "        ")
+    source = (
+        f"def plain():\n"
+        f"    class C({base}):\n"
+        f"{body}"
+        f"    return C\n"
+        f"\n"
+        f"def forwarded(forward, continue_):\n"
+        f"    @forward()\n"
+        f"    class C({base}):\n"
+        f"        ...\n"
+        f"    @continue_(C)\n"
+        f"    class _____:\n"
+        f"{body}"
+        f"    return C\n"
+        )
+    exec(compile(source, "<class_creation>", "exec"), namespace)
+    return namespace["plain"], namespace["forwarded"]
+
+
+def time_per_call(fn, seconds):
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    repeat = max(3, int(seconds / max(elapsed, 1e-9)))
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number
+
+def allocations_per_call(fn, count=200):
+    """
+    returns (bytes, blocks) allocated per call to fn,
+    keeping every result alive while measuring.
+    """
+    fn()
+    keep = []
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for _ in range(count):
+            keep.append(fn())
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    size = sum(stat.size_diff for stat in stats)
+    blocks = sum(stat.count_diff for stat in stats)
+    return size / count, blocks / count
+
+
+def configurations(grid):
+    if grid:
+        names = list(dimensions)
+        for values in itertools.product(*(dimensions[name] for name in names)):
+            yield dict(zip(names, values))
+        return
+    yield dict(baseline)
+    for name, values in dimensions.items():
+        for value in values:
+            if value == baseline[name]:
+                continue
+            config = dict(baseline)
+            config[name] = value
+            yield config
+
+def describe(config):
+    return " ".join(f"{name}={value:<3}" for name, value in config.items())
+
+
+def main():
+    seconds = 0.2
+    grid = False
+    allocations = True
+    compare = []
+
+    process_seconds = False
+    process_compare = False
+
+    for arg in sys.argv[1:]:
+        if process_seconds:
+            try:
+                seconds = float(arg)
+            except ValueError:
+                usage(f"invalid argument to -n: {arg!r}")
+            process_seconds = False
+            continue
+        if process_compare:
+            compare.append(arg)
+            process_compare = False
+            continue
+        if arg == "-n":
+            process_seconds = True
+            continue
+        if arg == "-c":
+            process_compare = True
+            continue
+        if arg == "-g":
+            grid = not grid
+            continue
+        if arg == "-a":
+            allocations = not allocations
+            continue
+        usage("unknown option " + arg)
+
+    if process_seconds or process_compare:
+        usage("missing argument")
+    if len(compare) > 2:
+        usage("-c may only be specified twice")
+
+    if compare:
+        if len(compare) == 1:
+            compare.append(None)
+        old, new = (revisions.load_forward(r) for r in compare)
+        print(f"comparing forward/__init__.py revisions\n    old: {revisions.describe(compare[0])}\n    new: {revisions.describe(compare[1])}\n")
+        print(f"{'configuration':<57} {'old us':>9} {'new us':>9} {'new/old':>8}")
+        for config in configurations(grid):
+            plain, forwarded = make_factories(**config)
+            old_time = time_per_call(lambda: forwarded(old.forward, old.continue_), seconds)
+            new_time = time_per_call(lambda: forwarded(new.forward, new.continue_), seconds)
+            print(f"{describe(config):<57} {old_time * 1e6:9.2f} {new_time * 1e6:9.2f} {new_time / old_time:8.2f}")
+        return
+
+    forward = revisions.load_forward()
+    header = f"{'configuration':<57} {'class us':>9} {'forward us':>10} {'ratio':>6}"
+    if allocations:
+        header += f" {'class KiB':>9} {'forward KiB':>11} {'class blk':>9} {'forward blk':>11}"
+    print(header)
+    for config in configurations(grid):
+        plain, forwarded = make_factories(**config)
+        fn = lambda: forwarded(forward.forward, forward.continue_)
+        plain_time = time_per_call(plain, seconds)
+        forward_time = time_per_call(fn, seconds)
+        line = f"{describe(config):<57} {plain_time * 1e6:9.2f} {forward_time * 1e6:10.2f} {forward_time / plain_time:6.2f}"
+        if allocations:
+            plain_size, plain_blocks = allocations_per_call(plain)
+            forward_size, forward_blocks = allocations_per_call(fn)
+            line += f" {plain_size / 1024:9.2f} {forward_size / 1024:11.2f} {plain_blocks:9.1f} {forward_blocks:11.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
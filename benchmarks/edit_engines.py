@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+"""
+usage:
+    edit_engines.py [-n <repeat>] [-e <engine>] [-v] [<path>]
+
+Benchmarks the rewriter engines in tools/editor against each other.
+
+Reads every "*.py" file found under <path> into memory, then
+times each engine adding @forward() declarations to every file,
+and then removing them again.  Nothing is written to disk.
+<path> defaults to the Lib directory of the running Python
+(so, by default, it benchmarks against the standard library).
+
+Reports the best time over <repeat> runs (default 5) for each
+engine and behavior, and the number of files where the output
+of an engine differs from the output of the first engine.
+(The engines are expected to differ on a few files; the "ast"
+engine handles class statements inside triple-quoted strings,
+and multi-line class headers, which the "lines" engine doesn't.)
+
+-e adds an engine to the list of engines to benchmark.
+The default is every engine.
+
+-v prints the path of every file where the engines differ.
+"""
+
+import os.path
+import sys
+import sysconfig
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+import editor
+
+
+def usage(s):
+    sys.exit(f"error: {s}\n\n{__doc__.strip()}")
+
+
+def read_tree(path):
+    sources = []
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if not filename.endswith(".py"):
+                continue
+            file_path = os.path.join(dirpath, filename)
+            try:
+                with open(file_path, "rt", encoding="utf-8") as f:
+                    sources.append((file_path, f.read()))
+            except UnicodeDecodeError:
+                continue
+    return sources
+
+
+def run(engine, behavior, sources):
+    """
+    runs engine over every file in sources.
+    returns a tuple (elapsed, outputs).
+    outputs maps file paths to the edited text
+    (or None, if the engine couldn't process the file).
+    """
+    outputs = {}
+    edit = editor.forward_edit_text
+    start = time.perf_counter()
+    for file_path, text in sources:
+        try:
+            _, _, text = edit(text, behavior, (), path=file_path, engine=engine)
+        except (SyntaxError, AssertionError, AttributeError):
+            # the engines are allowed to choke on files they can't understand
+            text = None
+        outputs[file_path] = text
+    return time.perf_counter() - start, outputs
+
+
+def main():
+    path = sysconfig.get_paths()["stdlib"]
+    repeat = 5
+    engines = []
+    verbose = False
+
+    process_repeat = False
+    process_engine = False
+
+    for arg in sys.argv[1:]:
+        if process_repeat:
+            if not arg.isdigit():
+                usage(f"invalid argument to -n: {arg!r}")
+            repeat = int(arg)
+            process_repeat = False
+            continue
+        if process_engine:
+            if arg not in editor.engines:
+                usage(f"unknown engine {arg!r}")
+            engines.append(arg)
+            process_engine = False
+            continue
+        if arg == "-n":
+            process_repeat = True
+            continue
+        if arg == "-e":
+            process_engine = True
+            continue
+        if arg == "-v":
+            verbose = not verbose
+            continue
+        if arg.startswith("-"):
+            usage("unknown option " + arg)
+        path = arg
+
+    if process_repeat or process_engine:
+        usage("missing argument")
+    if not engines:
+        engines = list(editor.engines)
+
+    sources = read_tree(path)
+    total_bytes = sum(len(text) for _, text in sources)
+    print(f"{path}\n    {len(sources)} files, {total_bytes / (1024 * 1024):.1f} MiB\n")
+
+    baseline = {}
+    for behavior in ("add", "remove"):
+        for engine in engines:
+            if behavior == "add":
+                inputs = sources
+            else:
+                # remove the declarations added by this engine
+                inputs = [(p, t) for p, t in baseline[("add", engine)].items() if t is not None]
+            best = None
+            for _ in range(repeat):
+                elapsed, outputs = run(engine, behavior, inputs)
+                if (best is None) or (elapsed < best):
+                    best = elapsed
+            baseline[(behavior, engine)] = outputs
+            failed = sum(1 for text in outputs.values() if text is None)
+            print(f"    {behavior:6} {engine:5}  {best * 1000:9.1f} ms  {len(inputs) / best:9.0f} files/sec  ({failed} files skipped)")
+
+        reference = baseline[(behavior, engines[0])]
+        for engine in engines[1:]:
+            outputs = baseline[(behavior, engine)]
+            different = sorted(p for p in reference if outputs.get(p) != reference[p])
+            print(f"    {behavior:6} {engine:5}  output differs from {engines[0]!r} in {len(different)} files")
+            if verbose:
+                for p in different:
+                    print(f"        {p}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
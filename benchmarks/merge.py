@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+
+"""
+usage:
+    merge.py [-n <count>] [-r <repeat>] [-c <revision>]...
+
+Measures the cost of the merge performed by continue_, copying
+the body of the continuation class into the forward-declared
+class, for classes with many members.
+
+Sweeps the number of members (10, 100, 300, 1000) of each kind:
+
+    attributes  plain class attributes
+    methods     methods that don't use super()
+    supercalls  methods using no-argument super()
+                (continue_ has to repoint their __class__ cell)
+    mixed       an even mix of the three
+
+Only the continue_ call is timed (with the garbage collector
+disabled); the forward-declared class and the continuation
+class are created beforehand.  Reports the
+best time over <repeat> runs (default 5) of merging <count>
+classes (default 50), as the time per class and per member.
+
+-c <revision> runs in regression mode: it compares two revisions of
+forward/__init__.py.  <revision> is either a path to a file or a git
+revision of this repository.  Specify -c twice to compare two
+revisions; specify it once to compare a revision against the
+working tree.
+"""
+
+import gc
+import sys
+import time
+
+import revisions
+
+
+kinds = ("attributes", "methods", "supercalls", "mixed")
+sizes = (10, 100, 300, 1000)
+
+
+def usage(s):
+    sys.exit(f"error: {s}\n\n{__doc__.strip()}")
+
+
+def member(kind, i):
+    if kind == "mixed":
+        kind = kinds[i % 3]
+    if kind == "attributes":
+        return [f"a{i} = {i}"]
+    if kind == "methods":
+        return [f"def m{i}(self):", f"    return {i}"]
+    return [f"def s{i}(self):", f"    return super().__init__"]
+
+def make_factory(kind, size):
+    """
+    returns a function taking the forward function to use,
+    which declares and returns a tuple of two new classes:
+    (forward_cls, continue_cls).
+    """
+    lines = []
+    for i in range(size):
+        lines.extend(member(kind, i))
+    body = "".join(f"        {line}\n" for line in lines)
+    source = (
+        f"def factory(forward):\n"
+        f"    @forward()\n"
+        f"    class C:\n"
+        f"        ...\n"
+        f"    class _____:\n"
+        f"{body}"
+        f"    return C, _____\n"
+        )
+    namespace = {}
+    exec(compile(source, "<merge>", "exec"), namespace)
+    return namespace["factory"]
+
+
+def time_merge(module, factory, count, repeat):
+    """
+    returns the best time to merge one class, over repeat runs
+    of merging count classes.
+    """
+    best = None
+    for _ in range(repeat):
+        pairs = [factory(module.forward) for _ in range(count)]
+        continue_ = module.continue_
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for forward_cls, continue_cls in pairs:
+                continue_(forward_cls)(continue_cls)
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        if (best is None) or (elapsed < best):
+            best = elapsed
+    return best / count
+
+
+def main():
+    count = 50
+    repeat = 5
+    compare = []
+
+    process_count = False
+    process_repeat = False
+    process_compare = False
+
+    for arg in sys.argv[1:]:
+        if process_count or process_repeat:
+            if not arg.isdigit() or not int(arg):
+                usage(f"invalid argument to {'-n' if process_count else '-r'}: {arg!r}")
+            if process_count:
+                count = int(arg)
+            else:
+                repeat = int(arg)
+            process_count = process_repeat = False
+            continue
+        if process_compare:
+            compare.append(arg)
+            process_compare = False
+            continue
+        if arg == "-n":
+            process_count = True
+            continue
+        if arg == "-r":
+            process_repeat = True
+            continue
+        if arg == "-c":
+            process_compare = True
+            continue
+        usage("unknown option " + arg)
+
+    if process_count or process_repeat or process_compare:
+        usage("missing argument")
+    if len(compare) > 2:
+        usage("-c may only be specified twice")
+
+    if compare:
+        if len(compare) == 1:
+            compare.append(None)
+        old, new = (revisions.load_forward(r) for r in compare)
+        print(f"comparing forward/__init__.py revisions\n    old: {revisions.describe(compare[0])}\n    new: {revisions.describe(compare[1])}\n")
+        print(f"{'kind':<11} {'members':>7} {'old us':>10} {'new us':>10} {'speedup':>8}")
+        for kind in kinds:
+            for size in sizes:
+                factory = make_factory(kind, size)
+                old_time = time_merge(old, factory, count, repeat)
+                new_time = time_merge(new, factory, count, repeat)
+                print(f"{kind:<11} {size:7} {old_time * 1e6:10.1f} {new_time * 1e6:10.1f} {old_time / new_time:8.2f}")
+        return
+
+    forward = revisions.load_forward()
+    print(f"{'kind':<11} {'members':>7} {'us/class':>10} {'ns/member':>10}")
+    for kind in kinds:
+        for size in sizes:
+            factory = make_factory(kind, size)
+            elapsed = time_merge(forward, factory, count, repeat)
+            print(f"{kind:<11} {size:7} {elapsed * 1e6:10.1f} {elapsed * 1e9 / size:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+"""
+usage:
+    proxy.py [-n <seconds>]
+
+Measures the overhead of the "proxy" backend of forward()
+(forward(backend="proxy")), on the operations programs
+perform on a class over and over, compared to the same class
+declared with a conventional class statement, and with the
+default "copy" backend.
+
+The operations:
+
+    attribute       reading a class attribute (X.a)
+    classmethod     calling a classmethod (X.make())
+    staticmethod    calling a staticmethod (X.double(1))
+    instantiate     creating an instance (X(1))
+    method          calling a method on an instance (x.get())
+    isinstance      isinstance(x, X)
+    declare         declaring the whole class (the class statement,
+                    or forward() and continue_())
+
+Reports the time per operation in nanoseconds (the best of
+several runs), and the ratio of the proxy's time to the
+class statement's.
+
+-n <seconds> is roughly how long to spend timing each measurement.
+The default is 0.2.
+"""
+
+import sys
+import timeit
+
+import revisions
+
+
+body = """
+        a = 1
+
+        def __init__(self, value):
+            self.value = value
+
+        def get(self):
+            return self.value
+
+        @classmethod
+        def make(cls):
+            return cls(2)
+
+        @staticmethod
+        def double(x):
+            return x * 2
+"""
+
+source = f"""
+def plain():
+    class C:
+{body}
+    return C
+
+def forwarded(forward, continue_, backend):
+    @forward(backend=backend)
+    class C:
+        ...
+    @continue_(C)
+    class _____:
+{body}
+    return C
+"""
+
+operations = {
+    "attribute": "C.a",
+    "classmethod": "C.make()",
+    "staticmethod": "C.double(1)",
+    "instantiate": "C(1)",
+    "method": "c.get()",
+    "isinstance": "isinstance(c, C)",
+    "declare": "declare()",
+}
+
+
+def usage(s):
+    sys.exit(f"error: {s}\n\n{__doc__.strip()}")
+
+
+def time_per_operation(statement, namespace, seconds):
+    timer = timeit.Timer(statement, globals=namespace)
+    number, elapsed = timer.autorange()
+    repeat = max(3, int(seconds / max(elapsed, 1e-9)))
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number
+
+
+def main():
+    seconds = 0.2
+
+    process_seconds = False
+
+    for arg in sys.argv[1:]:
+        if process_seconds:
+            try:
+                seconds = float(arg)
+            except ValueError:
+                usage(f"invalid argument to -n: {arg!r}")
+            process_seconds = False
+            continue
+        if arg == "-n":
+            process_seconds = True
+            continue
+        usage("unknown option " + arg)
+
+    if process_seconds:
+        usage("missing argument")
+
+    forward = revisions.load_forward()
+    factories = {}
+    exec(compile(source, "<proxy>", "exec"), factories)
+    plain = factories["plain"]
+    forwarded = factories["forwarded"]
+
+    declarations = {
+        "class": plain,
+        "copy": lambda: forwarded(forward.forward, forward.continue_, "copy"),
+        "proxy": lambda: forwarded(forward.forward, forward.continue_, "proxy"),
+    }
+    namespaces = {}
+    for name, declare in declarations.items():
+        C = declare()
+        namespaces[name] = {"C": C, "c": C(1), "declare": declare}
+
+    print(f"{'operation':<13} {'class ns':>9} {'copy ns':>9} {'proxy ns':>9} {'proxy/class':>11}")
+    for operation, statement in operations.items():
+        times = {name: time_per_operation(statement, namespace, seconds) for name, namespace in namespaces.items()}
+        print(f"{operation:<13} {times['class'] * 1e9:9.1f} {times['copy'] * 1e9:9.1f} {times['proxy'] * 1e9:9.1f} {times['proxy'] / times['class']:11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Helpers for loading different revisions of the "forward" module,
+so benchmarks can compare them against each other.
+"""
+
+import importlib.util
+import os.path
+import subprocess
+import sys
+import tempfile
+
+repository_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+forward_relative_path = "forward/__init__.py"
+
+_loaded = {}
+
+def load_forward(revision=None):
+    """
+    loads and returns a copy of the "forward" module.
+
+    revision is either
+      * None, meaning the working tree,
+      * the path to a file containing a version of forward/__init__.py, or
+      * a git revision (e.g. "HEAD~1" or a commit id), in which case
+        forward/__init__.py is read from that revision of this repository.
+
+    every revision is loaded as a separate module object
+    (none of them are the "forward" in sys.modules),
+    so several revisions can be loaded at once.
+    """
+    if revision in _loaded:
+        return _loaded[revision]
+
+    if revision is None:
+        path = os.path.join(repository_root, forward_relative_path)
+    elif os.path.isfile(revision):
+        path = revision
+    else:
+        try:
+            source = subprocess.run(
+                ["git", "show", f"{revision}:{forward_relative_path}"],
+                cwd=repository_root, check=True, capture_output=True,
+                ).stdout
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"couldn't read {forward_relative_path} from git revision {revision!r}:\n{e.stderr.decode(errors='replace')}")
+        directory = tempfile.mkdtemp(prefix="forward-")
+        path = os.path.join(directory, "forward.py")
+        with open(path, "wb") as f:
+            f.write(source)
+
+    name = f"forward_revision_{len(_loaded)}"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    _loaded[revision] = module
+    return module
+
+def describe(revision):
+    return "working tree" if revision is None else revision
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+"""
+usage:
+    type_hints.py [-n <classes>] [-a <annotations>] [-r <rounds>]
+
+Measures forward.get_type_hints, which caches the type hints it
+resolves, against typing.get_type_hints, which resolves them
+every time, the way validation and serialization libraries call
+them: over and over, on the same classes.
+
+The generated module forward-declares <classes> model classes
+(default 200), derived from a common base class, and then
+continues them.  Each one has <annotations> annotated attributes
+(default 10) referring to other model classes, including ones
+declared after it, so the classes refer to each other in cycles,
+e.g. "parent: Optional[Model7]" and "children: list[Model12]".
+It uses "from __future__ import annotations", so every annotation
+is a string that has to be evaluated.
+
+Calls get_type_hints on every class, <rounds> times (default 20),
+and reports the time per call:
+
+    typing.get_type_hints   every call
+    forward.get_type_hints  the first round (resolving and caching)
+                            and the remaining rounds (cached)
+"""
+
+import sys
+import time
+import types
+import typing
+
+import revisions
+
+
+def usage(s):
+    sys.exit(f"error: {s}\n\n{__doc__.strip()}")
+
+
+def make_source(classes, annotations):
+    lines = [
+        "from __future__ import annotations",
+        "from typing import Optional",
+        "",
+        "class Base:",
+        "    id: int",
+        "    name: Optional[str]",
+        "",
+        ]
+    for i in range(classes):
+        lines.append("@forward()")
+        lines.append(f"class Model{i}(Base):")
+        lines.append("    ...")
+    for i in range(classes):
+        lines.append(f"@continue_(Model{i})")
+        lines.append("class _____:")
+        for j in range(annotations):
+            other = f"Model{(i * 7 + j * 13 + 1) % classes}"
+            if j % 3 == 0:
+                lines.append(f"    parent{j}: Optional[{other}]")
+            elif j % 3 == 1:
+                lines.append(f"    children{j}: list[{other}]")
+            else:
+                lines.append(f"    index{j}: dict[str, tuple[{other}, int]]")
+    return "".join(f"{line}\n" for line in lines)
+
+def make_module(forward, classes, annotations):
+    """
+    creates the model module (in sys.modules, where
+    get_type_hints looks for its globals) and returns
+    a list of its model classes.
+    """
+    module = types.ModuleType("models")
+    module.forward = forward.forward
+    module.continue_ = forward.continue_
+    sys.modules[module.__name__] = module
+    exec(compile(make_source(classes, annotations), "<models>", "exec"), module.__dict__)
+    return [getattr(module, f"Model{i}") for i in range(classes)]
+
+
+def time_round(get_type_hints, models):
+    start = time.perf_counter()
+    for model in models:
+        get_type_hints(model)
+    return time.perf_counter() - start
+
+
+def main():
+    classes = 200
+    annotations = 10
+    rounds = 20
+
+    process_classes = False
+    process_annotations = False
+    process_rounds = False
+
+    for arg in sys.argv[1:]:
+        if process_classes or process_annotations or process_rounds:
+            if not arg.isdigit() or not int(arg):
+                option = "-n" if process_classes else "-a" if process_annotations else "-r"
+                usage(f"invalid argument to {option}: {arg!r}")
+            if process_classes:
+                classes = int(arg)
+            elif process_annotations:
+                annotations = int(arg)
+            else:
+                rounds = int(arg)
+            process_classes = process_annotations = process_rounds = False
+            continue
+        if arg == "-n":
+            process_classes = True
+            continue
+        if arg == "-a":
+            process_annotations = True
+            continue
+        if arg == "-r":
+            process_rounds = True
+            continue
+        usage("unknown option " + arg)
+
+    if process_classes or process_annotations or process_rounds:
+        usage("missing argument")
+    if rounds < 2:
+        usage("-r must be at least 2")
+
+    forward = revisions.load_forward()
+    models = make_module(forward, classes, annotations)
+    for model in models:
+        if forward.get_type_hints(model) != typing.get_type_hints(model):
+            sys.exit(f"error: the type hints of {model.__name__} don't match")
+    for model in models:
+        forward._forget_type_hints(model)
+
+    calls = classes * rounds
+    uncached = sum(time_round(typing.get_type_hints, models) for _ in range(rounds))
+    first = time_round(forward.get_type_hints, models)
+    cached = sum(time_round(forward.get_type_hints, models) for _ in range(rounds - 1))
+
+    print(f"Python {sys.version.split()[0]}, {classes} classes with {annotations + 2} annotations each, {rounds} rounds\n")
+    print(f"{'':<32} {'us/call':>10} {'speedup':>8}")
+    print(f"{'typing.get_type_hints':<32} {uncached * 1e6 / calls:10.2f}")
+    print(f"{'forward.get_type_hints, first':<32} {first * 1e6 / classes:10.2f} {uncached / rounds / first:8.2f}")
+    print(f"{'forward.get_type_hints, cached':<32} {cached * 1e6 / (calls - classes):10.2f} {uncached / rounds / (cached / (rounds - 1)):8.2f}")
+    print(f"{'forward.get_type_hints, overall':<32} {(first + cached) * 1e6 / calls:10.2f} {uncached / (first + cached):8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# Demonstrates using @dataclass(slots=True) with forward.
+#
+# @dataclass(slots=True) returns a new class, so it can't be
+# stacked above @continue_().  Pass it to continue_ instead;
+# continue_ applies it to the continue class, then merges the
+# class it returns into the forward class.  The slots themselves
+# must be declared in the forward class.
+
+from dataclasses import dataclass
+import sys
+import tracemalloc
+
+from forward import *
+
+@forward()
+class Point:
+    __slots__ = ('x', 'y')
+
+@continue_(Point, dataclass(slots=True))
+class _:
+    x: float
+    y: float = 0.0
+
+    def __add__(self, other):
+        return Point(self.x + other.x, self.y + other.y)
+
+
+@dataclass(slots=True)
+class PlainPoint:
+    x: float
+    y: float = 0.0
+
+
+def measure(cls, count=100_000):
+    tracemalloc.start()
+    points = [cls(float(i), float(i)) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size // count
+
+p = Point(1.0, 2.0) + Point(3.0)
+print(p)
+print("Does p have a dict?", "yes." if hasattr(p, '__dict__') else "no.")
+print(f"sys.getsizeof: Point {sys.getsizeof(p)} bytes, PlainPoint {sys.getsizeof(PlainPoint(1.0))} bytes")
+print(f"per instance (including the floats): Point {measure(Point)} bytes, PlainPoint {measure(PlainPoint)} bytes")
@@ -0,0 +1,18 @@
+# Demo of "forward" prototype by Larry Hastings, March 2022.
+# This software is placed in the public domain or under the CC0-1.0-Universal license, whichever is more permissive.
+#
+# Declares the classes cheaply; lazy.impl defines them,
+# and isn't imported until somebody needs one of them.
+from forward import *
+
+@forward(impl=".impl")
+class Parser:
+    ...
+
+@forward(impl=".impl")
+class Document:
+    ...
+
+@forward(backend="proxy", impl=".impl")
+class Registry:
+    ...
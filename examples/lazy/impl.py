@@ -0,0 +1,35 @@
+# Demo of "forward" prototype by Larry Hastings, March 2022.
+# This software is placed in the public domain or under the CC0-1.0-Universal license, whichever is more permissive.
+#
+# Pretend this module is expensive to import.
+print("    (importing lazy.impl)")
+
+from forward import *
+from . import Parser, Document, Registry
+
+
+@continue_(Parser)
+class _:
+    def __init__(self, text):
+        self.text = text
+
+    def parse(self):
+        return Document(self.text.split())
+
+
+@continue_(Document)
+class _:
+    def __init__(self, words):
+        self.words = words
+
+    def __repr__(self):
+        return f"Document({self.words!r})"
+
+
+@continue_(Registry)
+class _:
+    formats = ["text", "words"]
+
+    @classmethod
+    def find(cls, name):
+        return name in cls.formats
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+# Demo of "forward" prototype by Larry Hastings, March 2022.
+# This software is placed in the public domain or under the CC0-1.0-Universal license, whichever is more permissive.
+#
+# Demonstrates forward(impl=...): the lazy package declares
+# its classes with @forward(impl=".impl"), and lazy.impl
+# is only imported the first time one of them is used.
+
+import sys
+
+import forward
+import lazy
+
+print("imported lazy.  lazy.impl imported?", "lazy.impl" in sys.modules)
+print("lazy.Parser is pending?", "lazy.Parser" in forward.pending())
+
+print("instantiating lazy.Parser...")
+document = lazy.Parser("forward class continue class").parse()
+print(document)
+print("lazy.impl imported?", "lazy.impl" in sys.modules)
+
+# lazy.Registry uses the "proxy" backend, so reading an attribute
+# would have imported lazy.impl too; and forward.load() imports it
+# explicitly.  (Both do nothing now.)
+print("Registry.find('words') ->", lazy.Registry.find("words"))
+print(forward.load(lazy.Document) is lazy.Document)
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+# Demo of "forward" prototype by Larry Hastings, March 2022.
+# This software is placed in the public domain or under the CC0-1.0-Universal license, whichever is more permissive.
+#
+# Demonstrates forward.lazy_namespace: the schema package declares
+# a whole namespace of classes, but only creates the ones that are
+# used, and schema.impl is only imported when one is instantiated.
+
+import sys
+
+import schema
+
+def created():
+    return [name for name in schema.classes if name in vars(schema)]
+
+print("imported schema.  classes created:", created())
+print("schema has Table?", "Table" in dir(schema))
+
+print("instantiating schema.Document...")
+document = schema.Document(schema.Paragraph("forward", "class"), schema.Paragraph("continue", "class"))
+print(document)
+print(document.text())
+print("schema.impl imported?", "schema.impl" in sys.modules)
+print("classes created:", created())
+assert created() == ["Node", "Document", "Paragraph"]
+assert isinstance(document, schema.Node)
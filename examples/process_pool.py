@@ -0,0 +1,85 @@
+# Demonstrates sending forward-declared classes, their instances,
+# and their bound methods to other processes.
+#
+# pickle finds classes and functions by their qualified names.
+# The methods and nested classes defined in a continue class start
+# out named after it ("_.area"), so continue_ renames them after
+# the forward-declared class ("Shape.area").  Run it with
+# "-X forward_rename_code" to also rename their code objects
+# (which some profilers show) on Python 3.11+.
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import pickle
+import sys
+
+from forward import *
+
+@forward()
+class Shape:
+    ...
+
+@continue_(Shape)
+class _:
+    class Kind:
+        def __init__(self, name):
+            self.name = name
+
+        def __repr__(self):
+            return f"Shape.Kind({self.name!r})"
+
+    def __init__(self, width, height):
+        self.kind = Shape.Kind("rectangle")
+        self.width = width
+        self.height = height
+
+    def area(self):
+        return self.width * self.height
+
+    def scaled(self, factor):
+        return Shape(self.width * factor, self.height * factor)
+
+    @classmethod
+    def square(cls, side):
+        return cls(side, side)
+
+    @staticmethod
+    def total(shapes):
+        return sum(shape.area() for shape in shapes)
+
+def describe(shape):
+    return f"{shape.kind!r} {shape.width}x{shape.height}"
+
+
+if __name__ == "__main__":
+    print("qualified names:")
+    for value in (Shape.area, Shape.square.__func__, Shape.total, Shape.Kind, Shape.Kind.__init__):
+        print(f"    {value.__qualname__}")
+    assert Shape.area.__qualname__ == "Shape.area"
+    assert Shape.Kind.__qualname__ == "Shape.Kind"
+    if (sys.version_info >= (3, 11)) and ("forward_rename_code" in sys._xoptions):
+        assert Shape.area.__code__.co_qualname == "Shape.area"
+
+    # functions and classes pickle by reference.
+    for value in (Shape, Shape.area, Shape.total, Shape.Kind):
+        assert pickle.loads(pickle.dumps(value)) is value
+
+    shapes = [Shape(2, 3), Shape.square(4), Shape(1, 10)]
+
+    # "spawn" starts fresh interpreters, which re-import this
+    # module, so everything really goes through pickle.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=2, mp_context=context) as executor:
+        # instances (including an instance of a nested class).
+        print("described:", list(executor.map(describe, shapes)))
+        # bound methods, and methods as plain functions.
+        areas = [executor.submit(shape.area) for shape in shapes]
+        print("areas:", [future.result() for future in areas])
+        assert list(executor.map(Shape.area, shapes)) == [6, 16, 10]
+        # classmethods, staticmethods, and results that are instances.
+        assert executor.submit(Shape.square, 5).result().area() == 25
+        assert executor.submit(Shape.total, shapes).result() == 32
+        doubled = list(executor.map(Shape.scaled, shapes, [2] * len(shapes)))
+        print("doubled:", [describe(shape) for shape in doubled])
+
+    print("forward-declared classes work with process pools!")
@@ -0,0 +1,64 @@
+# Demonstrates class keywords with the "proxy" backend.
+#
+# With backend="proxy", continue_ creates the class by calling
+# its metaclass, like a class statement would, so __init_subclass__
+# sees the whole class body.  A decorator never sees the keywords
+# in a class statement, so pass the bases and keywords to forward()
+# instead; then __init_subclass__ only runs once, for the real class.
+
+from forward import *
+
+class Plugin:
+    registry = {}
+    calls = 0
+
+    def __init_subclass__(cls, name, **kwargs):
+        super().__init_subclass__(**kwargs)
+        Plugin.calls += 1
+        # only the real class is complete.
+        assert hasattr(cls, "load"), f"{cls.__name__} has no load method"
+        Plugin.registry[name] = cls
+
+@forward(backend="proxy", bases=(Plugin,), kwds={"name": "json"})
+class JSONPlugin:
+    """Loads JSON."""
+
+assert Plugin.calls == 0
+assert Plugin.__subclasses__() == []
+
+@continue_(JSONPlugin)
+class _:
+    def load(self, text):
+        import json
+        return json.loads(text)
+
+assert Plugin.calls == 1
+assert Plugin.__subclasses__() == [Plugin.registry["json"]]
+assert isinstance(JSONPlugin(), Plugin)
+print(JSONPlugin.__doc__, JSONPlugin().load('{"zot": 33}'))
+
+
+# Declaring the bases in the class statement works too, without
+# keywords; but then the class statement calls __init_subclass__
+# for the empty forward class, and continue_ calls it again.
+
+class Codec:
+    calls = 0
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        Codec.calls += 1
+
+@forward(backend="proxy")
+class Rot13(Codec):
+    ...
+
+@continue_(Rot13)
+class _:
+    def encode(self, text):
+        import codecs
+        return codecs.encode(text, "rot13")
+
+assert Codec.calls == 2
+assert len(Codec.__subclasses__()) == 1
+print(Rot13().encode("frotz"))
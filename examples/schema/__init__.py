@@ -0,0 +1,22 @@
+# Demo of "forward" prototype by Larry Hastings, March 2022.
+# This software is placed in the public domain or under the CC0-1.0-Universal license, whichever is more permissive.
+#
+# Pretend this module was generated from a big schema.  It declares
+# every class in the schema without creating any of them; each one
+# is created (and forward-declared) the first time it's used.
+# schema.impl continues the ones this demo uses.
+import forward
+
+classes = {
+    "Node": (),
+    "Document": ("Node",),
+    "Section": ("Node",),
+    "Paragraph": ("Node",),
+    "Table": ("Node",),
+    "Row": ("Node",),
+    "Cell": ("Node",),
+    "Image": ("Node",),
+    "Link": ("Node",),
+}
+
+forward.lazy_namespace(globals(), classes, impl=".impl")
@@ -0,0 +1,29 @@
+# Demo of "forward" prototype by Larry Hastings, March 2022.
+# This software is placed in the public domain or under the CC0-1.0-Universal license, whichever is more permissive.
+#
+# Continues the classes from the schema that have behavior.
+print("    (importing schema.impl)")
+
+from forward import *
+from . import Node, Document, Paragraph
+
+
+@continue_(Node)
+class _:
+    def __init__(self, *children):
+        self.children = list(children)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(map(repr, self.children))})"
+
+
+@continue_(Document)
+class _:
+    def text(self):
+        return "\n".join(child.text() for child in self.children)
+
+
+@continue_(Paragraph)
+class _:
+    def text(self):
+        return " ".join(self.children)
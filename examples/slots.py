@@ -18,3 +18,47 @@ class _:
 z = Zotz(33, 44)
 z.print()
 print("Does z have a dict?", "yes." if hasattr(z, '__dict__') else "no.")
+
+# The continue class may repeat the slots, so they read naturally
+# next to the methods that use them.  They must match the slots
+# declared in the forward class exactly; CPython fixes the layout
+# of instances when the class is created, so the forward class is
+# the only place slots can actually be declared.
+
+@forward()
+class Frotz:
+    __slots__ = ('x', 'y')
+
+@continue_(Frotz)
+class _:
+    __slots__ = ('x', 'y')
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+f = Frotz(1, 2)
+print("Does f have a dict?", "yes." if hasattr(f, '__dict__') else "no.")
+
+try:
+    @forward()
+    class Rezrov:
+        ...
+
+    @continue_(Rezrov)
+    class _:
+        __slots__ = ('x',)
+except TypeError as e:
+    print("TypeError:", e)
+
+# The failed continue_ left Rezrov incomplete.  Complete it without
+# __slots__ (so its instances have a dict), or forward() warns about
+# it at exit.
+
+@continue_(Rezrov)
+class _:
+    def __init__(self, x):
+        self.x = x
+
+r = Rezrov(5)
+print("Does r have a dict?", "yes." if hasattr(r, '__dict__') else "no.")
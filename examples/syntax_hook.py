@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+# Demo of "forward" prototype by Larry Hastings, March 2022.
+# This software is placed in the public domain or under the CC0-1.0-Universal license, whichever is more permissive.
+#
+# Demonstrates forward.syntax, the import hook that accepts the
+# proposed "forward class" / "continue class" syntax.
+#
+# (The form feed in the module is on purpose: older code often
+# separates sections with them, and they shouldn't confuse the hook.)
+#
+# (The module using the syntax is written to a temporary directory,
+# because tools that compile every .py file in this directory,
+# like compileall, don't understand the syntax.)
+
+import os
+import sys
+import tempfile
+
+import forward.syntax
+
+module_source = '''
+forward class Parent()
+forward class Child()
+\f
+continue class Parent:
+    def __init__(self):
+        self.children = [Child(self)]
+
+continue class Child:
+    def __init__(self, parent: Parent):
+        self.parent = parent
+'''
+
+directory = tempfile.mkdtemp(prefix="forward-syntax-")
+with open(os.path.join(directory, "family.py"), "wt") as f:
+    f.write(module_source)
+sys.path.insert(0, directory)
+
+forward.syntax.install()
+import family
+
+parent = family.Parent()
+print("parent.children[0].parent is parent?", parent.children[0].parent is parent)
+cache = os.path.join(directory, "__pycache__")
+if os.path.isdir(cache):
+    print("cached:", ", ".join(os.listdir(cache)))
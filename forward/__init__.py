@@ -6,6 +6,19 @@ Proof-of-concept of "forward class" / "continue class", using decorators.
 
 # hey, forward.tools.editor! ignore this file!
 
+# tools/edit_stdlib.py installs this module into the standard library,
+# where the modules it imports would themselves use @forward().
+# So it only imports modules built into the interpreter.
+import _functools
+import _operator
+import _thread
+import _warnings
+import _weakref
+import atexit
+import gc
+import itertools
+import sys
+
 __version__ = "1.0"
 
 class _sample_class:
@@ -19,28 +32,1293 @@ existing_attributes = set(_sample_class.__dict__) | set(_sample_class_with_bases
 
 object_init = object.__init__
 
-def forward():
+def _sample_function(self):
+    pass
+
+class _sample_class_with_slots:
+    __slots__ = ("slot",)
+
+# (the same as types.FunctionType, types.CodeType,
+# types.MethodType, and types.MemberDescriptorType)
+FunctionType = type(_sample_function)
+CodeType = type(_sample_function.__code__)
+MethodType = type(_sample_function.__get__(_sample_class()))
+MemberDescriptorType = type(_sample_class_with_slots.slot)
+
+# names in a continuation class's __dict__ that are never
+# copied to the forward class.  (Note that this includes
+# __doc__; the forward class keeps its own docstring.)
+skip_attributes = frozenset(existing_attributes | dont_overwrite_attributes)
+
+# continue_ only bothers with the bulk merge for classes
+# with at least this many attributes; for smaller classes
+# the setup costs more than it saves.
+bulk_merge_threshold = 32
+
+# continue_ may only update a class's dict directly on CPython,
+# and not on a free-threaded build (where another thread could
+# be looking up attributes on the class at the same time).
+_can_update_type_dict = (sys.implementation.name == "cpython") and getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+# The registry of forward-declared classes that haven't been
+# completed by continue_ yet, keyed by qualified name
+# ("module.qualname").  The values are weak references,
+# so the registry never keeps a class alive.
+_pending = {}
+
+def _qualified_name(cls):
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+def _register(cls):
+    name = _qualified_name(cls)
+    def remove(ref, name=name):
+        if _pending.get(name) is ref:
+            del _pending[name]
+    _pending[name] = _weakref.ref(cls, remove)
+
+def _unregister(cls):
+    name = _qualified_name(cls)
+    ref = _pending.get(name)
+    if (ref is not None) and (ref() is cls):
+        del _pending[name]
+
+def pending():
+    """
+    Returns a dict of the forward-declared classes that
+    haven't been completed yet, mapping their qualified
+    names ("module.qualname") to the classes.
+    """
+    classes = {}
+    for name, ref in list(_pending.items()):
+        cls = ref()
+        if cls is not None:
+            classes[name] = cls
+    # (see forward(compact=True).)
+    for cls in list(_compact_classes.values()):
+        classes[_qualified_name(cls)] = cls
+    return classes
+
+@atexit.register
+def _warn_pending():
+    classes = pending()
+    if classes:
+        names = ", ".join(sorted(classes))
+        _warnings.warn(f"{len(classes)} forward-declared classes were never completed: {names}", ResourceWarning)
+
+
+# Instrumentation, off by default.  Run Python with "-X forward_stats",
+# or set the environment variable PYTHONFORWARDSTATS to a non-empty
+# string, and forward() and continue_() record, for every class:
+#   * the time between declaring it and completing it,
+#   * the time spent merging the continue class into it,
+#   * the time spent repointing the __class__ cells of its functions,
+#     and renaming them after it (see _requalify), and
+#   * the number of attributes merged.
+# Each is raised as a sys.audit event:
+#   "forward.forward", with arguments (module, qualname)
+#   "forward.continue_", with arguments (module, qualname,
+#       pending_ns, merge_ns, patch_ns, attributes)
+# and a summary, by module, is printed to stderr at exit.
+
+stats_option = "forward_stats"
+stats_variable = "PYTHONFORWARDSTATS"
+
+# a list of the tuples passed to the "forward.continue_"
+# audit events, or None if instrumentation is off.
+_stats = None
+
+# maps id(cls) to the time cls was declared.
+_declared = {}
+
+def _requested(option, variable):
+    """
+    Returns True if Python was run with "-X option",
+    or the environment variable variable is set to
+    a non-empty string.
+    """
+    if option in getattr(sys, "_xoptions", ()):
+        return True
+    if sys.flags.ignore_environment:
+        return False
+    try:
+        import posix as os
+    except ImportError:
+        import nt as os
+    # (on POSIX, the keys and values of posix.environ are bytes.)
+    return bool(os.environ.get(variable) or os.environ.get(variable.encode("ascii")))
+
+def _enable_stats():
+    global _stats, _clock, _audit
+    if _stats is not None:
+        return
+    import time
+    _stats = []
+    _clock = time.perf_counter_ns
+    _audit = getattr(sys, "audit", lambda event, *args: None)
+    atexit.register(_print_stats)
+
+def _stats_forward(cls):
+    _declared[id(cls)] = _clock()
+    _audit("forward.forward", cls.__module__, cls.__qualname__)
+
+def _stats_continue(cls, start, merged, finished, attributes):
+    declared = _declared.pop(id(cls), start)
+    record = (cls.__module__, cls.__qualname__, start - declared, merged - start, finished - merged, attributes)
+    _stats.append(record)
+    _audit("forward.continue_", *record)
+
+def _print_stats(file=None, classes=10):
+    """
+    Prints a summary of the recorded stats: the totals
+    for every module, the modules with the most time spent
+    in continue_ first, and then the slowest classes.
+    """
+    if file is None:
+        file = sys.stderr
+    modules = {}
+    for module, qualname, pending, merge, patch, attributes in _stats:
+        totals = modules.setdefault(module, [0, 0, 0, 0, 0])
+        totals[0] += 1
+        totals[1] += pending
+        totals[2] += merge
+        totals[3] += patch
+        totals[4] += attributes
+
+    merge = sum(totals[2] for totals in modules.values())
+    patch = sum(totals[3] for totals in modules.values())
+    print(f"forward stats: {len(_stats)} classes completed in {len(modules)} modules, {merge / 1e6:.2f} ms merging, {patch / 1e6:.2f} ms patching closures.", file=file)
+    if not _stats:
+        return
+    print(f"{'module':40} {'classes':>7} {'pending ms':>10} {'merge ms':>9} {'patch ms':>9} {'attributes':>10}", file=file)
+    for module, totals in sorted(modules.items(), key=lambda item: (-(item[1][2] + item[1][3]), item[0])):
+        count, pending, merge, patch, attributes = totals
+        print(f"{module:40} {count:7} {pending / 1e6:10.2f} {merge / 1e6:9.2f} {patch / 1e6:9.2f} {attributes:10}", file=file)
+    print(file=file)
+    print(f"{'slowest classes':40} {'':>7} {'pending ms':>10} {'merge ms':>9} {'patch ms':>9} {'attributes':>10}", file=file)
+    for module, qualname, pending, merge, patch, attributes in sorted(_stats, key=lambda record: -(record[3] + record[4]))[:classes]:
+        print(f"{module + '.' + qualname:48} {pending / 1e6:10.2f} {merge / 1e6:9.2f} {patch / 1e6:9.2f} {attributes:10}", file=file)
+
+if _requested(stats_option, stats_variable):
+    _enable_stats()
+
+
+# The "proxy" backend, described in docs/proto-pep.part.2.class.proxy.txt.
+#
+# forward(backend="proxy") returns a proxy wrapping the class
+# created by the class statement (the "stub").  continue_ creates the
+# real class, by calling the metaclass with the complete namespace,
+# and from then on the proxy passes everything through to it.
+# (So metaclasses and __init_subclass__ see the whole class body.)
+#
+# Instances are instances of the real class, so type(instance) and
+# instance.__class__ are the real class, not the proxy.
+
+class _ClassProxy:
+    """
+    The base class of class proxies.  Every proxy is the only
+    instance of its own subclass, made by _class_proxy, whose
+    methods find the class they pass through to in a closure.
+    (That's much faster than reading it from the proxy.)
+    """
+    __slots__ = ("_namespace", "__weakref__")
+
+    def __setattr__(self, name, value):
+        setattr(_proxy_target(self), name, value)
+        namespace = _proxy_namespace(self)
+        if namespace is not None:
+            namespace[name] = value
+
+    def __delattr__(self, name):
+        delattr(_proxy_target(self), name)
+        namespace = _proxy_namespace(self)
+        if namespace is not None:
+            namespace.pop(name, None)
+
+    def __subclasscheck__(self, subclass):
+        if isinstance(subclass, _ClassProxy):
+            subclass = _proxy_target(subclass)
+        return issubclass(subclass, _proxy_target(self))
+
+    def __mro_entries__(self, bases):
+        if _proxy_namespace(self) is not None:
+            raise TypeError(f"{_proxy_target(self).__name__} is a forward-declared class, it can't be subclassed until it's continued")
+        return (_proxy_target(self),)
+
+    # Python looks up special methods on the type of an object,
+    # bypassing __getattribute__; these pass through the ones
+    # metaclasses commonly define (e.g. enum.EnumType).
+
+    def __getitem__(self, key):
+        return _proxy_target(self)[key]
+
+    def __iter__(self):
+        return iter(_proxy_target(self))
+
+    def __reversed__(self):
+        return reversed(_proxy_target(self))
+
+    def __len__(self):
+        return len(_proxy_target(self))
+
+    def __contains__(self, value):
+        return value in _proxy_target(self)
+
+    def __bool__(self):
+        return bool(_proxy_target(self))
+
+    def __or__(self, other):
+        return _proxy_target(self) | other
+
+    def __ror__(self, other):
+        return other | _proxy_target(self)
+
+    def __repr__(self):
+        return repr(_proxy_target(self))
+
+    def __dir__(self):
+        return dir(_proxy_target(self))
+
+def _is_dunder(name):
+    return (len(name) > 4) and name.startswith("__") and name.endswith("__")
+
+_proxy_namespace = _ClassProxy._namespace.__get__
+_set_proxy_namespace = _ClassProxy._namespace.__set__
+
+def _class_proxy(stub):
+    """
+    Returns a new proxy for the class stub.
+    """
+    cls = stub
+
+    class ClassProxy(_ClassProxy):
+        __slots__ = ()
+
+        def __getattribute__(self, name):
+            try:
+                value = getattr(cls, name)
+            except AttributeError:
+                # (only the stub has __forward_impl__.)
+                if ("__forward_impl__" in cls.__dict__) and not _is_dunder(name):
+                    load(self)
+                    return getattr(self, name)
+                # e.g. __mro_entries__, which the class machinery
+                # looks up on the proxy when it's used as a base.
+                return object.__getattribute__(self, name)
+            # make classmethods see the proxy as cls.
+            if (type(value) is MethodType) and (value.__self__ is cls):
+                return MethodType(value.__func__, self)
+            return value
+
+        def __call__(self, *args, **kwargs):
+            return cls(*args, **kwargs)
+
+        def __instancecheck__(self, instance):
+            return isinstance(instance, cls)
+
+    # every method above shares the cell for cls.
+    ClassProxy._cell = ClassProxy.__call__.__closure__[0]
+    proxy = object.__new__(ClassProxy)
+    # the attributes set on the proxy before continue_.
+    _set_proxy_namespace(proxy, {})
+    return proxy
+
+def _proxy_target(proxy):
+    return type(proxy)._cell.cell_contents
+
+def _set_proxy_target(proxy, cls):
+    type(proxy)._cell.cell_contents = cls
+
+backends = ("copy", "proxy")
+
+
+# Compact mode, for programs (e.g. code generated for schemas or
+# ORMs) that declare tens of thousands of classes.  forward()
+# usually gives each class its own __init__ closure and error
+# message, and two attributes, __forward__ and __forward_new_init__.
+# forward(compact=True) gives every class the same __init__,
+# _compact_init, which only builds the message when it raises,
+# and keeps the classes in _compact_classes instead of marking
+# them.  (They're kept alive until they're continued.)
+
+# maps id(cls) to cls, for the classes declared with
+# forward(compact=True) that haven't been continued yet.
+_compact_classes = {}
+
+def _is_compact(cls):
+    return id(cls) in _compact_classes
+
+def _compact_init(self, *a, **kw):
+    for cls in type(self).__mro__:
+        if cls.__dict__.get("__init__") is _compact_init:
+            break
+    raise TypeError(f"{cls.__name__} is a forward-declared class")
+
+def _forward_compact(cls):
+    cls.__init__ = _compact_init
+    _compact_classes[id(cls)] = cls
+    if _stats is not None:
+        _stats_forward(cls)
+    return cls
+
+def _is_forward(cls):
+    """
+    Returns True if cls is a forward-declared class
+    that hasn't been continued yet.
+    """
+    return (id(cls) in _compact_classes) or bool(getattr(cls, "__forward__", False))
+
+
+def _class_arguments(bases, kwds):
+    """
+    Returns a tuple of (metaclass, bases, kwds, orig_bases),
+    computed from the bases and keywords of a class the way a
+    class statement does (see types.resolve_bases and
+    types.prepare_class, which we can't import; see above).
+    orig_bases is None unless __mro_entries__ changed the bases.
+    """
+    bases = tuple(bases)
+    kwds = dict(kwds)
+    resolved = []
+    for base in bases:
+        if isinstance(base, type) or not hasattr(base, "__mro_entries__"):
+            resolved.append(base)
+        else:
+            resolved.extend(base.__mro_entries__(bases))
+    resolved = tuple(resolved)
+    orig_bases = bases if resolved != bases else None
+
+    metaclass = kwds.pop("metaclass", None)
+    if metaclass is None:
+        metaclass = type(resolved[0]) if resolved else type
+    if isinstance(metaclass, type):
+        # the most derived metaclass.
+        for base in resolved:
+            base_metaclass = type(base)
+            if issubclass(metaclass, base_metaclass):
+                continue
+            if issubclass(base_metaclass, metaclass):
+                metaclass = base_metaclass
+                continue
+            raise TypeError("metaclass conflict: the metaclass of a derived class must be a (non-strict) subclass of the metaclasses of all its bases")
+    return metaclass, resolved, kwds, orig_bases
+
+
+def forward(backend="copy", impl=None, block=False, timeout=None, compact=False, bases=None, kwds=None):
+    """
+    Returns a decorator that forward-declares a class.
+
+    backend selects the implementation.  "copy" (the default)
+    returns the class itself, and continue_ copies the body of
+    the continue class into it.  "proxy" returns a proxy for
+    the class, and continue_ creates the real class with the
+    metaclass, like a class statement would; see _class_proxy.
+
+    impl is the name of the module that continues the class
+    (relative names are relative to the class's module).
+    Instead of raising TypeError, instantiating the class before
+    it's continued imports that module; see load().  With the
+    "proxy" backend, so does reading an attribute the class
+    doesn't have (except "dunder" attributes).
+
+    If block is true, instead of raising TypeError, instantiating
+    the class before it's continued waits for another thread to
+    continue it, for up to timeout seconds (or forever if timeout
+    is None), and raises TypeError if it wasn't.  (If impl is
+    specified, block is ignored; importing impl already waits for
+    any other thread importing it, e.g. preload().)
+
+    (With the "copy" backend, an instance created while loading
+    or waiting was already created by the __new__ the class
+    had when it was declared.)
+
+    If compact is true, forward() uses less memory and time per
+    class: every class shares the same __init__ (which raises
+    TypeError), and nothing else is stored in the class.  This
+    is for programs declaring very many classes.  It only works
+    with the "copy" backend, and without impl or block.
+
+    bases and kwds are the bases and keywords of the class (e.g.
+    metaclass=Meta), like the arguments to types.new_class.  They
+    only work with the "proxy" backend, and then the class statement
+    mustn't declare any bases.  A decorator never sees the keywords
+    in a class statement, and the class statement itself calls the
+    metaclass and __init_subclass__ for the stub; declared here,
+    only continue_ uses them, to create the real class.
+    """
+    if backend not in backends:
+        raise ValueError(f"unknown backend {backend!r}, must be one of {', '.join(map(repr, backends))}")
+    if compact:
+        if (backend != "copy") or (impl is not None) or block:
+            raise ValueError("compact=True only works with the \"copy\" backend, and without impl or block")
+        return _forward_compact
+    arguments = None
+    if (bases is not None) or (kwds is not None):
+        if backend != "proxy":
+            raise ValueError("bases and kwds only work with the \"proxy\" backend")
+        arguments = _class_arguments(bases or (), kwds or {})
+
     def forward(cls):
+        if arguments is not None:
+            if (type(cls) is not type) or (cls.__bases__ != (object,)):
+                raise TypeError(f"{cls.__name__} must declare its bases and keywords either in forward() or in the class statement, not both")
+            # (see _continue_proxy.)
+            cls.__forward_arguments__ = arguments
         cls.__forward__ = True
         message = f"{cls.__name__} is a forward-declared class"
-        def __init__(self, *a, **kw):
-            raise TypeError(message)
+        forward_cls = cls
+        if impl is not None:
+            cls.__forward_impl__ = impl
+            def complete():
+                load(forward_cls)
+        elif block:
+            # released by continue_; see _wake_waiters.
+            lock = cls.__forward_lock__ = _thread.allocate_lock()
+            lock.acquire()
+            def complete():
+                _wait(forward_cls, lock, timeout)
+        else:
+            complete = None
+
+        if complete is None:
+            def __init__(self, *a, **kw):
+                raise TypeError(message)
+        else:
+            def __init__(self, *a, **kw):
+                complete()
+                self.__init__(*a, **kw)
         cls.__forward_new_init__ =  cls.__init__ = __init__
-        return cls
+
+        if backend == "proxy":
+            forward_cls = _class_proxy(cls)
+            if complete is not None:
+                # instances of the stub would be useless, so
+                # create an instance of the real class instead.
+                # (this __new__ isn't copied to the real class.)
+                def __new__(stub, *a, **kw):
+                    complete()
+                    return forward_cls(*a, **kw)
+                cls.__new__ = staticmethod(__new__)
+        _register(forward_cls)
+        if _stats is not None:
+            _stats_forward(forward_cls)
+        return forward_cls
     return forward
 
-def continue_(forward_cls):
+
+def _wait(cls, lock, timeout):
+    if not lock.acquire(True, -1 if timeout is None else timeout):
+        raise TypeError(f"{cls.__name__} is a forward-declared class, and wasn't continued within {timeout} seconds")
+    lock.release()
+
+def _wake_waiters(cls):
+    """
+    Wakes up the threads waiting for cls to be
+    continued, if it was declared with block=True.
+    """
+    lock = cls.__dict__.get("__forward_lock__")
+    if lock is not None:
+        del cls.__forward_lock__
+        lock.release()
+
+
+def load(cls):
+    """
+    Completes cls, a class forward-declared with forward(impl=...),
+    by importing the module that continues it.  Returns cls.
+    (If cls has already been completed, just returns cls.)
+
+    Raises TypeError if cls has no implementation module,
+    or if importing it didn't complete cls.
+    """
+    if not _is_forward(cls):
+        return cls
+    impl = getattr(cls, "__forward_impl__", None)
+    if impl is None:
+        raise TypeError(f"{cls.__name__} is a forward-declared class, with no implementation module")
+
+    # (imported here, because forward can't import it at the top; see above.)
+    import importlib
+    module = cls.__module__
+    package = module if hasattr(sys.modules.get(module), "__path__") else module.rpartition(".")[0]
+    importlib.import_module(impl, package)
+
+    if _is_forward(cls):
+        raise TypeError(f"importing {impl} didn't complete {cls.__name__}")
+    return cls
+
+
+def preload(modules, max_workers=None):
+    """
+    Imports the modules named in the iterable modules in the
+    background, in parallel, on a pool of up to max_workers
+    threads.  Returns a list of concurrent.futures.Future
+    objects, one per module, whose results are the modules.
+
+    Use this at startup to import the modules that continue
+    forward-declared classes (see forward(impl=...) and
+    forward(block=True)) while the program does other work.
+    """
+    import concurrent.futures
+    import importlib
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="forward-preload")
+    try:
+        return [executor.submit(importlib.import_module, name) for name in modules]
+    finally:
+        # the workers exit once they've imported everything.
+        executor.shutdown(wait=False)
+
+async def preload_async(modules, max_workers=None):
+    """
+    Like preload, for asyncio code: imports the modules named
+    in the iterable modules, in parallel, on a pool of up to
+    max_workers threads.  Returns a list of the modules.
+    """
+    import asyncio
+    return await asyncio.gather(*(asyncio.wrap_future(future) for future in preload(modules, max_workers)))
+
+
+def lazy_namespace(namespace, schema, **options):
+    """
+    Declares a module's classes from a schema, without creating
+    them: each one is created and forward-declared the first time
+    it's accessed, so startup only pays for the classes a program
+    uses.  A continue_ elsewhere completes them as usual.
+
+    namespace is the module's globals().  schema is a dict mapping
+    the names of the classes to tuples of their bases, or an
+    iterable of (name, bases) pairs.  A base is either a class or
+    a string, naming another class in the schema or a global in
+    the module.  options are passed to forward() for every class,
+    e.g. impl=".impl".
+
+    Installs a module __getattr__ (PEP 562), which calls any
+    __getattr__ the module already had for other names, and a
+    module __dir__.  Once created, a class is stored in namespace,
+    and __getattr__ isn't called for it again.  (Code in the
+    module itself doesn't go through __getattr__; it should
+    use __getattr__(name) to get a class that may not exist yet.)
+
+    Classes are created with type(name, bases, namespace); bases
+    may not use __mro_entries__.
+    """
+    if isinstance(schema, dict):
+        schema = schema.items()
+    schema = {name: tuple(bases) for name, bases in schema}
+    for name in schema:
+        if (not isinstance(name, str)) or not name.isidentifier():
+            raise ValueError(f"{name!r} isn't a valid class name")
+        if name in namespace:
+            raise ValueError(f"{name!r} is already defined in {namespace.get('__name__')}")
+
+    module = namespace.get("__name__")
+    decorator = forward(**options)
+    previous_getattr = namespace.get("__getattr__")
+    previous_dir = namespace.get("__dir__")
+    # (reentrant, because creating a class creates its bases.)
+    lock = _thread.RLock()
+    creating = set()
+
+    def create(name):
+        cls = namespace.get(name)
+        if cls is not None:
+            return cls
+        if name in creating:
+            raise TypeError(f"the bases of {name} refer to {name}")
+        creating.add(name)
+        try:
+            bases = []
+            for base in schema[name]:
+                if isinstance(base, str):
+                    if base in schema:
+                        base = create(base)
+                    elif base in namespace:
+                        base = namespace[base]
+                    else:
+                        raise NameError(f"base {base!r} of {name} isn't defined in {module}")
+                bases.append(base)
+            cls = type(name, tuple(bases), {"__module__": module, "__qualname__": name})
+            cls = decorator(cls)
+            namespace[name] = cls
+            return cls
+        finally:
+            creating.discard(name)
+
+    def __getattr__(name):
+        if name in schema:
+            with lock:
+                return create(name)
+        if previous_getattr is not None:
+            return previous_getattr(name)
+        raise AttributeError(f"module {module!r} has no attribute {name!r}")
+
+    def __dir__():
+        names = previous_dir() if previous_dir is not None else namespace
+        return sorted(set(names) | set(schema))
+
+    namespace["__getattr__"] = __getattr__
+    namespace["__dir__"] = __dir__
+
+
+# get_type_hints caches the type hints it resolves for a
+# forward-declared class in the class itself, as
+# __forward_type_hints__: a tuple of (include_extras, mro,
+# snapshot, hints), where snapshot is a list of copies of the
+# annotations of every class in mro.  (A global cache would keep
+# the classes alive, since the hints of classes that refer to each
+# other refer to the classes.)  continue_ sets it to None in the
+# class it completes, which also marks the class as one whose hints
+# get_type_hints caches.  It never writes to any other class: that
+# would show up in vars() and dir(), and e.g. typing.Protocol takes
+# the names in a protocol's __dict__ to be its members.
+
+def _own_annotations(cls):
+    if _lazy_annotations:
+        # (on 3.14+, type.__annotations__ is only cls's own,
+        # and the evaluated dict is cached.)
+        return getattr(cls, "__annotations__", None)
+    return cls.__dict__.get("__annotations__")
+
+def _annotations_snapshot(mro):
+    return [dict(annotations) if annotations else None for annotations in map(_own_annotations, mro)]
+
+def _forget_type_hints(cls):
+    if cls.__dict__.get("__forward_type_hints__") is not None:
+        cls.__forward_type_hints__ = None
+
+def _continued_type_hints(cls):
+    """
+    Called by continue_ for the class it completed:
+    drops its cached type hints, and lets get_type_hints
+    cache them in it again.
+    """
+    if not getattr(cls, "_is_protocol", False):
+        cls.__forward_type_hints__ = None
+
+def _caches_type_hints(cls):
+    if getattr(cls, "_is_protocol", False):
+        return False
+    return _is_forward(cls) or ("__forward_type_hints__" in cls.__dict__)
+
+def get_type_hints(cls, include_extras=False):
+    """
+    Returns typing.get_type_hints(cls, include_extras=include_extras),
+    for the class cls, caching the result.
+
+    Only caches the type hints of classes declared with forward(),
+    and not of protocols (see typing.Protocol); for every other
+    class, this is the same as typing.get_type_hints.
+
+    The annotations of a forward-declared class are split between
+    the forward class and its continue class (or assigned by hand),
+    and aren't complete until continue_ runs.  So the cache entry
+    for a class is dropped when continue_ completes it, and it's
+    recomputed whenever the annotations of cls or any of its base
+    classes change, or cls.__mro__ does.  (It isn't recomputed
+    when a name the annotations refer to is rebound later.)
+
+    Returns a new dict every time, which the caller may modify.
+    """
+    if isinstance(cls, _ClassProxy):
+        cls = _proxy_target(cls)
+    if not isinstance(cls, type):
+        raise TypeError(f"{cls!r} is not a class")
+    cache = _caches_type_hints(cls)
+    if cache:
+        mro = cls.__mro__
+        entry = cls.__dict__.get("__forward_type_hints__")
+        if (entry is not None) and (entry[0] == include_extras) and (entry[1] == mro):
+            if entry[2] == _annotations_snapshot(mro):
+                return dict(entry[3])
+        snapshot = _annotations_snapshot(mro)
+
+    # (imported here, because forward can't import it at the top; see above.)
+    import typing
+    if include_extras:
+        hints = typing.get_type_hints(cls, include_extras=True)
+    else:
+        hints = typing.get_type_hints(cls)
+    if not cache:
+        return hints
+    cls.__forward_type_hints__ = (include_extras, mro, snapshot, hints)
+    return dict(hints)
+
+
+def _check_forward(forward_cls):
+    if _is_compact(forward_cls):
+        return
     if ((not isinstance(forward_cls, type))
         or (not hasattr(forward_cls, '__forward__'))
         or not forward_cls.__forward__):
         raise TypeError(f"{forward_cls.__name__} is not a forward-declared class")
 
-    def continue_(continue_cls):
-        if not isinstance(continue_cls, type):
-            raise TypeError(f"{continue_cls.__name__} is not a class")
-        if hasattr(continue_cls, '__forward__') and continue_cls.__forward__:
-            raise TypeError(f"{continue_cls.__name__} must not be a forward-declared class")
+def _check_continue(continue_cls):
+    if not isinstance(continue_cls, type):
+        raise TypeError(f"{continue_cls.__name__} is not a class")
+    if hasattr(continue_cls, '__forward__') and continue_cls.__forward__:
+        raise TypeError(f"{continue_cls.__name__} must not be a forward-declared class")
+    # (the same test, for the compact classes it may inherit from.)
+    if _compact_classes and any(map(_is_compact, continue_cls.__mro__)):
+        raise TypeError(f"{continue_cls.__name__} must not be a forward-declared class")
+
+def _slot_names(cls):
+    """
+    Returns the set of names declared in cls.__slots__,
+    mangled the way CPython mangles them.
+    """
+    slots = cls.__dict__["__slots__"]
+    if isinstance(slots, str):
+        slots = (slots,)
+    stripped = cls.__name__.lstrip("_")
+    names = set()
+    for name in slots:
+        if stripped and name.startswith("__") and not name.endswith("__"):
+            name = f"_{stripped}{name}"
+        names.add(name)
+    return names
+
+def _is_slot(value, cls):
+    return (type(value) is MemberDescriptorType) and (value.__objclass__ is cls)
+
+# CPython fixes the layout of a class's instances when the class
+# is created, so continue_ can't add slots to the forward-declared
+# class.  But the continue class may repeat the __slots__ declared
+# in the forward class.  (That's what the tools/ editor does when
+# it forward-declares a class with __slots__.)
+
+def _check_slots(forward_cls, continue_cls):
+    if isinstance(forward_cls, _ClassProxy):
+        # the real class doesn't exist yet, so it can have any slots.
+        return
+    forward_slots = "__slots__" in forward_cls.__dict__
+    if "__slots__" in continue_cls.__dict__:
+        if not forward_slots:
+            raise TypeError(f"{forward_cls.__name__} must declare __slots__ in the forward-declared class, not the continue class")
+        names = _slot_names(continue_cls)
+        if names != _slot_names(forward_cls):
+            message = f"the __slots__ of {continue_cls.__name__} don't match the __slots__ of {forward_cls.__name__}"
+            if any(name.startswith("__") and not name.endswith("__") for name in names):
+                message += " (private names are mangled with the class name)"
+            raise TypeError(message)
+    if forward_slots:
+        slots = _slot_names(forward_cls)
+        for name, value in continue_cls.__dict__.items():
+            if (name in slots) and (name not in skip_attributes) and not _is_slot(value, continue_cls):
+                raise ValueError(f"{name!r} in __slots__ conflicts with class variable")
+
+def _continue_skip_attributes(continue_cls):
+    """
+    Returns the set of names in continue_cls.__dict__
+    that must not be copied to the forward class.
+    """
+    if "__slots__" not in continue_cls.__dict__:
+        return skip_attributes
+    skip = set(skip_attributes)
+    skip.add("__slots__")
+    skip.update(name for name, value in continue_cls.__dict__.items() if _is_slot(value, continue_cls))
+    return skip
+
+def _merge_annotations(forward_cls, annotations):
+    """
+    Merges annotations into forward_cls's existing
+    __annotations__ dict, if it has a non-empty one.
+    Returns True if it did.
+    """
+    original = getattr(forward_cls, "__annotations__", None)
+    if not original:
+        return False
+    original.update(annotations)
+    return True
+
+# PEP 649 and PEP 749: starting with Python 3.14, a class body
+# with annotations doesn't evaluate them.  It defines an
+# __annotate__ function instead, which type.__annotations__ calls
+# the first time someone asks for them.  Reading __annotations__
+# to merge them would evaluate them at import time, which is what
+# PEP 649 is meant to avoid.  So continue_ merges the __annotate__
+# functions instead, and nothing is evaluated until someone asks.
+
+_lazy_annotations = "__annotate__" in type.__dict__
+
+# where a class may keep its annotations in its __dict__ on 3.14+.
+# (continue_ merges these with _merge_annotate, never by copying.)
+annotate_attributes = frozenset({"__annotate__", "__annotate_func__", "__annotations__", "__annotations_cache__"})
+
+# annotationlib.Format.VALUE and .VALUE_WITH_FAKE_GLOBALS.
+_format_value = 1
+_format_value_with_fake_globals = 2
+
+def _combined_annotate(first, second, owner):
+    """
+    Returns an __annotate__ function returning the annotations
+    returned by first, updated with the ones returned by second.
+    """
+    def __annotate__(format):
+        if format == _format_value:
+            annotations = dict(first(format))
+            annotations.update(second(format))
+            return annotations
+        if format == _format_value_with_fake_globals:
+            # annotationlib then calls us with FORWARDREF or STRING,
+            # and we ask it to call first and second the same way.
+            raise NotImplementedError(format)
+        # (imported here, because forward can't import it at the top;
+        # see above.  whoever asked for these formats imported it.)
+        import annotationlib
+        annotations = dict(annotationlib.call_annotate_function(first, format, owner=owner))
+        annotations.update(annotationlib.call_annotate_function(second, format, owner=owner))
+        return annotations
+    return __annotate__
+
+def _lazy_annotate(forward_cls, continue_cls):
+    """
+    Returns the __annotate__ function forward_cls should have
+    after merging continue_cls into it, or None if continue_cls
+    has no __annotate__ function, or if forward_cls's annotations
+    were set explicitly.  (Then annotations are merged as dicts.)
+    """
+    annotate = continue_cls.__annotate__
+    if (annotate is None) or ("__annotations__" in forward_cls.__dict__):
+        return None
+    forward_annotate = forward_cls.__annotate__
+    if forward_annotate is None:
+        return annotate
+    return _combined_annotate(forward_annotate, annotate, forward_cls)
+
+def _repoint_class_cell(function, classes, new):
+    """
+    function must close over __class__ (because it uses
+    no-argument super() or __class__).  If that cell refers
+    to one of the classes in the tuple classes, repoints
+    it to new and returns True.
+    """
+    code = function.__code__
+    cell = function.__closure__[code.co_freevars.index("__class__")]
+    try:
+        contents = cell.cell_contents
+    except ValueError:
+        # the cell is empty
+        return False
+    for cls in classes:
+        if contents is cls:
+            cell.cell_contents = new
+            return True
+    return False
+
+# fix no-argument super! wow!
+#
+# Only functions that use no-argument super() (or __class__)
+# close over __class__.  And every function defined in the
+# body of the continue class shares the same __class__ cell
+# (including nested functions, and functions wrapped in
+# descriptors), so once we've repointed one, we're done.
+
+# the types of objects that may hold functions
+# defined in a class body, besides functions themselves.
+builtin_function_wrappers = (classmethod, staticmethod, property, MethodType, _functools.partial)
+functools_function_wrappers = ("partialmethod", "cached_property", "singledispatchmethod")
+
+def _function_wrappers():
+    """
+    Returns a tuple of the types of objects that may hold functions.
+
+    Some of them are defined in functools, which we can't import
+    (see above).  But if functools hasn't been imported, there can't
+    be any objects of those types either.  (So this can change; each
+    pass over the values in a class computes it once, and passes it
+    down.)
+    """
+    functools = sys.modules.get("functools")
+    if functools is None:
+        return builtin_function_wrappers
+    wrappers = [getattr(functools, name, None) for name in functools_function_wrappers]
+    return builtin_function_wrappers + tuple(w for w in wrappers if w is not None)
+
+def _wrapped(value):
+    """
+    Returns a list of the objects wrapped by value,
+    an instance of one of the function_wrappers types.
+    """
+    if isinstance(value, (classmethod, staticmethod, MethodType)):
+        return [value.__func__]
+    if isinstance(value, property):
+        return [value.fget, value.fset, value.fdel]
+    wrapped = [value.func]
+    dispatcher = getattr(value, "dispatcher", None)
+    if dispatcher is not None:
+        # singledispatchmethod
+        wrapped.extend(dispatcher.registry.values())
+    return wrapped
+
+def _reachable_functions(value, function_wrappers):
+    """
+    Yields every function reachable from value:
+    value itself, if it's a function, and every function
+    it wraps, recursively.  Follows the function_wrappers
+    types (from _function_wrappers()), and __wrapped__
+    (set by functools.wraps).
+    """
+    seen = set()
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if (value is None) or (id(value) in seen):
+            continue
+        seen.add(id(value))
+        if type(value) is FunctionType:
+            yield value
+            stack.append(value.__dict__.get("__wrapped__"))
+        elif isinstance(value, function_wrappers):
+            stack.extend(_wrapped(value))
+        elif callable(value) and not isinstance(value, type):
+            # e.g. a function decorated with functools.lru_cache
+            stack.append(getattr(value, "__wrapped__", None))
+
+# caches whether the instances of a type may be or hold
+# functions; see _may_hold_functions.  (this is cleared when
+# it gets big, so it never keeps many types alive.)
+_holds_functions = {FunctionType: True}
+_holds_functions_limit = 256
+
+def _may_hold_functions(value, function_wrappers):
+    """
+    Returns True if value, which isn't in the cache yet,
+    may be or hold functions (one of the function_wrappers
+    types, from _function_wrappers()), and caches the answer
+    for its type.  (Callable objects may wrap functions too,
+    e.g. a function decorated with functools.lru_cache.)
+    Returns False for classes, without caching the answer
+    for their metaclass; see _requalify.
+    """
+    if isinstance(value, type):
+        return False
+    holds = isinstance(value, function_wrappers) or callable(value)
+    if len(_holds_functions) >= _holds_functions_limit:
+        _holds_functions.clear()
+        _holds_functions[FunctionType] = True
+    _holds_functions[type(value)] = holds
+    return holds
+
+def _repoint_class_cells(values, old, new):
+    """
+    Finds the first function reachable from values that
+    closes over a __class__ cell referring to old, and
+    repoints that cell to new.  Returns True if it found one.
+    (continue_ does this for the functions it merges in
+    _requalify, in the same pass.)
+    """
+    old = (old,)
+    get = _holds_functions.get
+    function_wrappers = _function_wrappers()
+    for value in values:
+        if type(value) is FunctionType:
+            if ("__class__" in value.__code__.co_freevars) and _repoint_class_cell(value, old, new):
+                return True
+            # only closures (e.g. wrappers made by decorators)
+            # can wrap another function.
+            if value.__closure__ is None:
+                continue
+        else:
+            holds = get(type(value))
+            if holds is None:
+                holds = _may_hold_functions(value, function_wrappers)
+            if not holds:
+                continue
+        for function in _reachable_functions(value, function_wrappers):
+            if ("__class__" in function.__code__.co_freevars) and _repoint_class_cell(function, old, new):
+                return True
+    return False
+
+# The functions and classes defined in the body of the continue
+# class have qualified names starting with its name, e.g.
+# "_____.print".  pickle finds functions and classes by their
+# qualified names (so multiprocessing does too), and profilers
+# and tracebacks show them.  So continue_ renames them after the
+# forward-declared class, e.g. "Printer.print".
+#
+# On Python 3.11+, their code objects have a qualified name too,
+# co_qualname, which some profilers show; so do the code objects
+# nested in them (which name the functions and classes their bodies
+# define later).  Renaming those means copying every code object,
+# which makes continue_ several times slower, and pickle doesn't
+# need it.  So it's off by default.  Run Python with
+# "-X forward_rename_code", set the environment variable
+# PYTHONFORWARDRENAMECODE to a non-empty string, or set
+# forward.rename_code to True, and continue_ renames them too.
+
+rename_code_option = "forward_rename_code"
+rename_code_variable = "PYTHONFORWARDRENAMECODE"
+rename_code = _requested(rename_code_option, rename_code_variable)
+
+_has_co_qualname = hasattr(CodeType, "co_qualname")
+
+def _requalify_code(code, old, new):
+    """
+    Returns a copy of code, with the co_qualname of code and of
+    every code object nested in its constants starting with old
+    replaced with new.  Returns code itself if none of them do.
+    """
+    qualname = code.co_qualname
+    consts = code.co_consts
+    # (most code objects don't have nested code objects.)
+    if CodeType in map(type, consts):
+        requalified = tuple([_requalify_code(const, old, new) if type(const) is CodeType else const for const in consts])
+        if any(a is not b for a, b in zip(requalified, consts)):
+            if qualname.startswith(old):
+                return code.replace(co_qualname=new + qualname[len(old):], co_consts=requalified)
+            return code.replace(co_consts=requalified)
+    if qualname.startswith(old):
+        return code.replace(co_qualname=new + qualname[len(old):])
+    return code
+
+def _requalify_function(function, old, new):
+    qualname = function.__qualname__
+    if qualname.startswith(old):
+        function.__qualname__ = new + qualname[len(old):]
+    if rename_code and _has_co_qualname:
+        _requalify_function_code(function, old, new)
+
+def _requalify_function_code(function, old, new):
+    code = function.__code__
+    requalified = _requalify_code(code, old, new)
+    if requalified is not code:
+        function.__code__ = requalified
 
+# for _requalify, which map()s them over lists of functions,
+# to read or check them all at once, instead of in a Python loop.
+_function_qualname = _operator.attrgetter("__qualname__")
+_function_freevars = _operator.attrgetter("__code__.co_freevars")
+
+def _rename_functions(functions, old, new):
+    """
+    Renames the functions in the list functions whose
+    qualified names start with old, to start with new.
+    Does it with one str.replace on all their names,
+    joined together, instead of one function at a time.
+    """
+    joined = "\n" + "\n".join(map(_function_qualname, functions))
+    renamed = joined.replace("\n" + old, "\n" + new)
+    if renamed == joined:
+        return
+    qualnames = renamed.split("\n")
+    del qualnames[0]
+    if len(qualnames) != len(functions):
+        # one of the names has a newline in it.
+        for function in functions:
+            qualname = function.__qualname__
+            if qualname.startswith(old):
+                function.__qualname__ = new + qualname[len(old):]
+        return
+    # (any() just runs the map; setattr returns None.)
+    any(map(setattr, functions, itertools.repeat("__qualname__"), qualnames))
+
+def _requalify(values, old, cls, classes):
+    """
+    Renames the functions and classes reachable from values,
+    whose qualified names start with old (the __qualname__
+    of the continue class), after cls, the completed class.
+    Follows the attributes of the classes it renames.
+
+    It's the only pass continue_ makes over the functions it
+    merged, so it also repoints the __class__ cell they share
+    (see _repoint_class_cells) from any of the classes in the
+    tuple classes to cls.  Returns True if it repointed it.
+    """
+    old += "."
+    new = cls.__qualname__ + "."
+    repointed = False
+
+    # most values are functions defined in the class body, or
+    # values of types known not to hold functions (e.g. ints).
+    # _requalify_reachable deals with the rest.
+    functions = []
+    # only closures use __class__, or are made by
+    # functools.wraps (which sets __wrapped__).
+    closures = []
+    rest = []
+    get = _holds_functions.get
+    for value in values:
+        if type(value) is FunctionType:
+            functions.append(value)
+            if value.__closure__ is not None:
+                closures.append(value)
+        elif get(type(value)) is not False:
+            rest.append(value)
+
+    if functions:
+        _rename_functions(functions, old, new)
+        if rename_code and _has_co_qualname:
+            for function in functions:
+                _requalify_function_code(function, old, new)
+        if closures:
+            uses_class = map(tuple.__contains__, map(_function_freevars, closures), itertools.repeat("__class__"))
+            for function in itertools.compress(closures, uses_class):
+                if _repoint_class_cell(function, classes, cls):
+                    repointed = True
+                    break
+            rest.extend(filter(None, map(getattr, closures, itertools.repeat("__wrapped__"), itertools.repeat(None))))
+
+    if rest:
+        repointed = _requalify_reachable(rest, old, new, cls, classes, repointed)
+    return repointed
+
+def _requalify_reachable(values, old, new, cls, classes, repointed):
+    """
+    The rest of _requalify: renames the functions and classes
+    reachable from values, which may be wrapped in descriptors,
+    or nested classes.  repointed says whether _requalify already
+    repointed the __class__ cell.  Returns True if either did.
+    """
+    start = len(old)
+    code = rename_code and _has_co_qualname
+    get = _holds_functions.get
+    function_wrappers = _function_wrappers()
+    seen = set()
+    stack = list(values)
+    pop = stack.pop
+    while stack:
+        value = pop()
+        if type(value) is FunctionType:
+            qualname = value.__qualname__
+            if qualname.startswith(old):
+                value.__qualname__ = new + qualname[start:]
+            if code:
+                _requalify_function_code(value, old, new)
+            if value.__closure__ is not None:
+                if (not repointed) and ("__class__" in value.__code__.co_freevars):
+                    repointed = _repoint_class_cell(value, classes, cls)
+                wrapped = getattr(value, "__wrapped__", None)
+                if wrapped is not None:
+                    stack.append(wrapped)
+            continue
+        holds = get(type(value))
+        if holds is None:
+            # (see _may_hold_functions.)
+            if isinstance(value, type):
+                qualname = value.__qualname__
+                if qualname.startswith(old) and (id(value) not in seen):
+                    seen.add(id(value))
+                    value.__qualname__ = new + qualname[start:]
+                    stack.extend(value.__dict__.values())
+                continue
+            holds = _may_hold_functions(value, function_wrappers)
+        if holds:
+            for function in _reachable_functions(value, function_wrappers):
+                _requalify_function(function, old, new)
+                if (not repointed) and ("__class__" in function.__code__.co_freevars):
+                    repointed = _repoint_class_cell(function, classes, cls)
+    return repointed
+
+def _copy_attributes(forward_cls, continue_cls, skip):
+    """
+    Copies the attributes of continue_cls to forward_cls,
+    one at a time, except the names in skip.
+    (This is faster for small classes.)
+    Returns the number of attributes copied.
+    """
+    copied = 0
+    for name, value in continue_cls.__dict__.items():
+        if name in skip:
+            continue
+        copied += 1
+        if (name == "__annotations__") and _merge_annotations(forward_cls, value):
+            continue
+        setattr(forward_cls, name, value)
+    return copied
+
+def _dunder_names(names):
+    """
+    Returns a list of the "dunder" names in the iterable names.
+    Finds them with str.find, instead of examining every name
+    in a Python loop.
+    """
+    joined = "\n" + "\n".join(names) + "\n"
+    found = []
+    start = joined.find("\n__")
+    while start != -1:
+        end = joined.find("\n", start + 1)
+        name = joined[start + 1:end]
+        if (len(name) > 4) and name.endswith("__"):
+            found.append(name)
+        start = joined.find("\n__", end)
+    return found
+
+def _merge_plan(forward_cls, continue_cls, skip):
+    """
+    Computes the attributes to copy from continue_cls to
+    forward_cls, except the names in skip.  Returns a tuple
+    of two dicts mapping names to values, (names, specials);
+    specials contains the "dunder" names, which may affect
+    the type's slots.
+    """
+    names = continue_cls.__dict__.copy()
+    for name in skip:
+        names.pop(name, None)
+    try:
+        dunders = _dunder_names(names)
+    except TypeError:
+        raise TypeError(f"{continue_cls.__name__} has an attribute whose name isn't a string") from None
+    specials = {name: names.pop(name) for name in dunders if name in names}
+    if ("__annotations__" in specials) and _merge_annotations(forward_cls, specials["__annotations__"]):
+        del specials["__annotations__"]
+    return names, specials
+
+def _type_dict(cls):
+    """
+    Returns the dict behind cls.__dict__, if it's safe
+    to update it directly.  Otherwise returns None.
+    """
+    if (type(cls) is not type) or not _can_update_type_dict:
+        return None
+    referents = gc.get_referents(cls.__dict__)
+    if (len(referents) != 1) or (type(referents[0]) is not dict):
+        return None
+    return referents[0]
+
+def _invalidate_type_cache(cls):
+    """
+    Invalidates the attribute cache of cls (and of its
+    subclasses), after updating its dict directly.
+    Every setattr and delattr on a class does that.
+    """
+    cls.__forward__ = None
+    del cls.__forward__
+
+def _merge(forward_cls, continue_cls, replaced=()):
+    if isinstance(forward_cls, _ClassProxy):
+        return _continue_proxy(forward_cls, continue_cls, replaced)
+    if _stats is not None:
+        start = _clock()
+
+    # Every setattr on a class invalidates its attribute cache
+    # (and the caches of its subclasses).  So for big classes,
+    # where we can, we store the ordinary names directly into
+    # the class's dict in one bulk update, and let the "del"
+    # statements below (which we run anyway) invalidate the
+    # caches once.  (Or _invalidate_type_cache does, if none
+    # of them run.)  The "dunder" names always go through
+    # setattr, because they may need to update the type's slots.
+    skip = _continue_skip_attributes(continue_cls)
+    annotate = None
+    if _lazy_annotations:
+        annotate = _lazy_annotate(forward_cls, continue_cls)
+        if annotate is not None:
+            skip = skip | annotate_attributes
+    type_dict = None
+    if len(continue_cls.__dict__) >= bulk_merge_threshold:
+        type_dict = _type_dict(forward_cls)
+    if type_dict is not None:
+        names, specials = _merge_plan(forward_cls, continue_cls, skip)
+        type_dict.update(names)
+
+    if _is_compact(forward_cls):
+        del _compact_classes[id(forward_cls)]
+        # if they haven't touched forward_cls.__init__, remove it.
+        if forward_cls.__dict__.get("__init__") is _compact_init:
+            del forward_cls.__init__
+        elif type_dict is not None:
+            _invalidate_type_cache(forward_cls)
+    else:
         del forward_cls.__forward__
 
         assert hasattr(forward_cls, '__init__')
@@ -50,29 +1328,245 @@ def continue_(forward_cls):
             del forward_cls.__init__
         del forward_cls.__forward_new_init__
 
-        for name, value in continue_cls.__dict__.items():
-            if name == "__doc__":
-                if not value:
-                    continue
-            elif name == "__annotations__":
-                original = getattr(forward_cls, name, None)
-                if original:
-                    original.update(value)
-                    continue
-                # fall through to setattr below
-            elif name in dont_overwrite_attributes:
-                continue
-            if name in existing_attributes:
-                continue
+    if "__forward_impl__" in forward_cls.__dict__:
+        del forward_cls.__forward_impl__
+
+    if type_dict is None:
+        attributes = _copy_attributes(forward_cls, continue_cls, skip)
+    else:
+        for name, value in specials.items():
             setattr(forward_cls, name, value)
+        attributes = len(names) + len(specials)
+    if annotate is not None:
+        # (through the setter, which drops any cached annotations.)
+        forward_cls.__annotate__ = annotate
 
-            # fix no-argument super! wow!
-            if callable(value) and hasattr(value, "__closure__") and value.__closure__:
-                for closure in value.__closure__:
-                    if closure.cell_contents == continue_cls:
-                        closure.cell_contents = forward_cls
+    if _stats is not None:
+        merged = _clock()
+    # the functions in continue_cls may close over the class
+    # the class statement created, or a class one of the
+    # decorators replaced it with (see _decorate).
+    _requalify(continue_cls.__dict__.values(), continue_cls.__qualname__, forward_cls, (continue_cls, *replaced))
+    if _stats is not None:
+        _stats_continue(forward_cls, start, merged, _clock(), attributes)
 
-        return forward_cls
+    _wake_waiters(forward_cls)
+    _unregister(forward_cls)
+    _continued_type_hints(forward_cls)
+    return forward_cls
+
+# names in the continue class's __dict__ that aren't
+# copied into the namespace of the real class.
+proxy_skip_attributes = frozenset({"__dict__", "__weakref__", "__module__", "__qualname__"})
+
+# names in the stub's __dict__ that aren't copied into the
+# namespace of the real class.  (forward() put these there.)
+proxy_stub_skip_attributes = proxy_skip_attributes | {"__forward__", "__forward_new_init__", "__forward_impl__", "__forward_lock__", "__forward_arguments__", "__annotations_cache__"}
+
+# the only names in the stub's __dict__ that are copied into
+# the namespace of the real class, if __prepare__ doesn't
+# return a plain dict.  (Such a metaclass, e.g. enum.EnumType,
+# checks every name the class body sets, and would reject
+# the ones it added to the stub's __dict__ itself.)
+proxy_stub_attributes = ("__doc__", "__slots__", "__orig_bases__")
+
+def _proxy_stub_namespace(stub, namespace_type):
+    """
+    Returns a dict of the attributes in the stub's __dict__
+    that belong in the namespace of the real class: the body
+    of the forward class, and anything set on it since.
+    namespace_type is the type of the namespace __prepare__
+    returned for the real class.
+    """
+    stub_dict = stub.__dict__
+    if namespace_type is not dict:
+        return {attribute: stub_dict[attribute] for attribute in proxy_stub_attributes if stub_dict.get(attribute) is not None}
+    forward_init = stub_dict.get("__forward_new_init__")
+    # forward() replaced __new__ if it set either of these.
+    forward_new = ("__forward_impl__" in stub_dict) or ("__forward_lock__" in stub_dict)
+    namespace = {}
+    for attribute, value in stub_dict.items():
+        if (attribute in proxy_stub_skip_attributes) or _is_slot(value, stub):
+            continue
+        if ((attribute == "__init__") and (value is forward_init)) or ((attribute == "__new__") and forward_new):
+            continue
+        if (attribute == "__doc__") and (value is None):
+            continue
+        if attribute == "__annotate_func__":
+            # where type keeps the __annotate__ function of the class body.
+            attribute = "__annotate__"
+        namespace[attribute] = value
+    return namespace
+
+class _retired_stub:
+    pass
+
+def _retire_stub(stub):
+    """
+    Takes stub out of its bases' __subclasses__(), once continue_
+    has created the real class.  (Otherwise it stays there until
+    the garbage collector gets to it.)  Only works if its instances
+    have the same layout as _retired_stub's.
+    """
+    try:
+        stub.__bases__ = (_retired_stub,)
+    except TypeError:
+        pass
+
+def _continue_proxy(proxy, continue_cls, replaced):
+    """
+    Creates the real class for proxy (see _class_proxy) the way
+    a class statement would: by calling its metaclass with
+    the namespace from its __prepare__, filled in with the
+    body of continue_cls.  Then points proxy at it.
+    """
+    if _stats is not None:
+        start = _clock()
+    stub = _proxy_target(proxy)
+    name = stub.__name__
+    # the bases and keywords passed to forward(), if any.
+    arguments = stub.__dict__.get("__forward_arguments__")
+    if arguments is None:
+        # (the class statement didn't keep its keywords.)
+        metaclass, bases, kwds, orig_bases = type(stub), stub.__bases__, {}, None
+    else:
+        metaclass, bases, kwds, orig_bases = arguments
+    prepare = getattr(metaclass, "__prepare__", None)
+    namespace = prepare(name, bases, **kwds) if prepare is not None else {}
+    namespace["__module__"] = stub.__module__
+    namespace["__qualname__"] = stub.__qualname__
+    if orig_bases is not None:
+        namespace["__orig_bases__"] = orig_bases
+
+    skip = proxy_skip_attributes
+    annotate = None
+    if _lazy_annotations:
+        annotate = _lazy_annotate(stub, continue_cls)
+        if annotate is not None:
+            skip = skip | annotate_attributes
+    # the continue class overrides the forward class,
+    # like setting its attributes one at a time would.
+    stub_namespace = _proxy_stub_namespace(stub, type(namespace))
+    for attribute, value in stub_namespace.items():
+        if (annotate is None) or (attribute not in annotate_attributes):
+            namespace[attribute] = value
+    # the attributes set on the proxy before continue_.
+    namespace.update(_proxy_namespace(proxy))
+    for attribute, value in continue_cls.__dict__.items():
+        if (attribute in skip) or _is_slot(value, continue_cls):
+            continue
+        if (attribute == "__doc__") and (value is None):
+            continue
+        if (attribute == "__annotations__") and namespace.get("__annotations__"):
+            # merged, like _merge_annotations does.
+            annotations = dict(namespace["__annotations__"])
+            annotations.update(value)
+            value = annotations
+        namespace[attribute] = value
+    if annotate is not None:
+        # where a class statement puts it.
+        namespace["__annotate__"] = annotate
+
+    cls = metaclass(name, bases, namespace, **kwds)
+    if arguments is None:
+        _retire_stub(stub)
+    if _stats is not None:
+        merged = _clock()
+    _requalify(continue_cls.__dict__.values(), continue_cls.__qualname__, cls, (continue_cls, *replaced))
+    # and the functions in the forward class close over the stub.
+    _repoint_class_cells(stub_namespace.values(), stub, cls)
+    if _stats is not None:
+        _stats_continue(proxy, start, merged, _clock(), len(namespace))
+    _set_proxy_target(proxy, cls)
+    _set_proxy_namespace(proxy, None)
+    bind_proxy = getattr(metaclass, "__bind_proxy__", None)
+    if bind_proxy is not None:
+        bind_proxy(proxy, cls)
+
+    _wake_waiters(stub)
+    _unregister(proxy)
+    _continued_type_hints(cls)
+    return proxy
+
+
+def _decorate(continue_cls, decorators):
+    """
+    Applies decorators to continue_cls, the last one first,
+    as if they were stacked above its class statement.
+
+    Returns a list of the classes: continue_cls, followed by
+    every new class a decorator returned in its place (e.g.
+    @dataclass(slots=True) returns a new class).  The last
+    one is the class to merge into the forward class.
+    """
+    classes = [continue_cls]
+    for decorator in reversed(decorators):
+        cls = decorator(classes[-1])
+        if cls is classes[-1]:
+            continue
+        if not isinstance(cls, type):
+            raise TypeError(f"decorator {decorator!r} didn't return a class")
+        _check_continue(cls)
+        classes.append(cls)
+    return classes
+
+
+def continue_(forward_cls, *decorators):
+    """
+    Completes forward_cls with the body of the decorated class.
+
+    decorators are applied to the continue class before it's
+    merged, the last one first, as if they were stacked above
+    its class statement.  Use this for decorators that examine
+    the class *and* return a different class, which can't be
+    stacked above @continue_(); for example:
+
+        @continue_(X, dataclass(slots=True))
+        class _:
+            ...
+
+    (Any slots must still be declared in the forward class.)
+    """
+    _check_forward(forward_cls)
+
+    def continue_(continue_cls):
+        _check_continue(continue_cls)
+        replaced = ()
+        if decorators:
+            *replaced, continue_cls = _decorate(continue_cls, decorators)
+        _check_slots(forward_cls, continue_cls)
+        return _merge(forward_cls, continue_cls, replaced)
     return continue_
 
+
+def continue_many(classes):
+    """
+    Completes many forward-declared classes in one pass.
+
+    classes is either a dict mapping forward-declared classes
+    to their continuation classes, or an iterable of
+    (forward_cls, continue_cls) pairs.
+
+    Every pair is checked before any class is modified, so
+    if any pair is invalid (raising TypeError) no class is
+    completed.  Returns a list of the completed classes.
+    """
+    if isinstance(classes, dict):
+        classes = classes.items()
+    pairs = list(classes)
+    seen = set()
+    for forward_cls, continue_cls in pairs:
+        _check_forward(forward_cls)
+        _check_continue(continue_cls)
+        _check_slots(forward_cls, continue_cls)
+        if forward_cls in seen:
+            raise TypeError(f"{forward_cls.__name__} appears more than once")
+        seen.add(forward_cls)
+    return [_merge(forward_cls, continue_cls) for forward_cls, continue_cls in pairs]
+
+
+# continue_many, pending, get_type_hints, and lazy_namespace
+# are deliberately not in __all__:
+# tools/editor adds "from forward import *" to modules, and only
+# cleans up the names "forward" and "continue_" afterwards.
 __all__ = ["forward", "continue_"]
@@ -0,0 +1,284 @@
+# Demo of "forward" prototype by Larry Hastings, March 2022.
+# This software is placed in the public domain or under the CC0-1.0-Universal license, whichever is more permissive.
+"""
+An import hook that accepts the proposed "forward class" /
+"continue class" syntax in .py files:
+
+    forward class X(base, metaclass=Meta)
+
+    continue class X:
+        # class body goes here
+        pass
+
+Call install() before importing modules that use the syntax.
+Each statement is compiled as the equivalent decorated class
+statement:
+
+    @forward()
+    class X(base, metaclass=Meta):
+        ...
+
+    @continue_(X)
+    class _____:
+        # class body goes here
+        pass
+
+The line numbers are preserved.  The compiled code is cached in
+__pycache__ like any other module, in a file of its own (e.g.
+"x.cpython-311.forward-2.pyc"), and is recompiled whenever the
+source changes.
+
+The hook only handles modules whose source uses the syntax
+(or that it has already compiled).  It doesn't change the way
+any other module is imported.  (But it does have to read their
+source once per import to find out.)
+
+(The forward package doesn't import this module itself; see
+the comment at the top of forward/__init__.py.)
+"""
+
+import ast
+import importlib.machinery
+import importlib.util
+import io
+import os.path
+import re
+import sys
+import tokenize
+
+__all__ = ["install", "uninstall", "parse"]
+
+# incremented whenever the translation changes,
+# so modules compiled by an older version are recompiled.
+syntax_version = 2
+
+# the name the compiled code binds the forward module to.
+# (dunder names aren't mangled, even inside a class body.)
+module_name = "__forward_syntax__"
+
+class_name = "_____"
+
+_uses_syntax_re = re.compile(rb"^[ \t]*(?:forward|continue)[ \t]+class\b", re.MULTILINE)
+
+
+def _syntax_error(message, filename, token, source_lines):
+    row, col = token.start
+    line = source_lines[row - 1] if row <= len(source_lines) else ""
+    return SyntaxError(message, (filename, row, col + 1, line))
+
+def _translate(source, filename):
+    """
+    Rewrites the "forward class" and "continue class" statements in
+    source as class statements that ast can parse.  Returns a tuple:
+    (text, forwards, continues), where forwards and continues are
+    sets of the (lineno, col_offset) of the rewritten class statements.
+
+        forward class X(base)  ->  class X(base): ...
+        continue class X:      ->  class _____(X):
+
+    (So the expression after "continue class" is parsed in place,
+    with the right line numbers.)
+    """
+    # (split the way tokenize does: str.splitlines also
+    # splits on form feeds, and other characters.)
+    source_lines = io.StringIO(source).readlines()
+    try:
+        tokens = list(tokenize.generate_tokens(io.StringIO(source).readline))
+    except (tokenize.TokenError, SyntaxError):
+        # let ast.parse report the error.
+        return source, set(), set()
+    forwards = set()
+    continues = set()
+    # (row, col, end_col, replacement), for text on one line.
+    edits = []
+
+    skip = {tokenize.NL, tokenize.COMMENT, tokenize.INDENT, tokenize.DEDENT}
+    at_start = True
+    for i, token in enumerate(tokens):
+        if token.type in skip:
+            continue
+        if token.type == tokenize.NEWLINE:
+            at_start = True
+            continue
+        statement_start = at_start
+        at_start = False
+        if not (statement_start
+            and (token.type == tokenize.NAME)
+            and (token.string in ("forward", "continue"))
+            and (i + 2 < len(tokens))
+            and (tokens[i + 1].type == tokenize.NAME)
+            and (tokens[i + 1].string == "class")):
+            continue
+
+        keyword = tokens[i + 1]
+        row, col = token.start
+        if (keyword.start[0] != row) or (tokens[i + 2].start[0] != row):
+            raise _syntax_error(f"'{token.string} class' and what follows must start on the same line", filename, keyword, source_lines)
+
+        # find the end of the logical line.
+        end = i + 2
+        while tokens[end].type not in (tokenize.NEWLINE, tokenize.ENDMARKER):
+            end += 1
+        last = end - 1
+        while tokens[last].type in skip:
+            last -= 1
+
+        if token.string == "forward":
+            name = tokens[i + 2]
+            if name.type != tokenize.NAME:
+                raise _syntax_error("expected a class name after 'forward class'", filename, name, source_lines)
+            if (last != i + 2) and not ((tokens[i + 3].string == "(") and (tokens[last].string == ")")):
+                raise _syntax_error("'forward class' statements have no body", filename, tokens[i + 3], source_lines)
+            edits.append((row, col, keyword.start[1], ""))
+            edits.append((tokens[last].end[0], tokens[last].end[1], tokens[last].end[1], ": ..."))
+            forwards.add((row, col))
+        else:
+            colon = tokens[last]
+            if (colon.string != ":") or (last == i + 2):
+                raise _syntax_error("expected 'continue class <expression>:'", filename, colon, source_lines)
+            first = tokens[i + 2]
+            edits.append((row, col, first.start[1], f"class {class_name}("))
+            before = tokens[last - 1]
+            edits.append((before.end[0], before.end[1], before.end[1], ")"))
+            continues.add((row, col))
+
+    if not edits:
+        return source, forwards, continues
+
+    for row, col, end_col, replacement in sorted(edits, reverse=True):
+        line = source_lines[row - 1]
+        source_lines[row - 1] = line[:col] + replacement + line[end_col:]
+    return "".join(source_lines), forwards, continues
+
+
+def _decorator(node, function, args):
+    call = ast.Call(
+        func=ast.Attribute(value=ast.Name(id=module_name, ctx=ast.Load()), attr=function, ctx=ast.Load()),
+        args=args,
+        keywords=[],
+        )
+    return ast.copy_location(call, node)
+
+def _import_position(tree):
+    """
+    Returns the index in tree.body (the statements of a module)
+    after its docstring and "from __future__" imports.
+    """
+    body = tree.body
+    index = 0 if ast.get_docstring(tree, clean=False) is None else 1
+    while (index < len(body)) and isinstance(body[index], ast.ImportFrom) and (body[index].module == "__future__"):
+        index += 1
+    return index
+
+def parse(source, filename="<unknown>"):
+    """
+    Parses source, Python source code that may use the "forward class"
+    and "continue class" statements.  Returns an ast.Module, where
+    they're class statements decorated with forward() and continue_().
+    """
+    text, forwards, continues = _translate(source, filename)
+    tree = ast.parse(text, filename)
+    if not (forwards or continues):
+        return tree
+
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.ClassDef):
+            continue
+        position = (node.lineno, node.col_offset)
+        if position in forwards:
+            node.decorator_list.append(_decorator(node, "forward", []))
+        elif position in continues:
+            expression = node.bases.pop()
+            node.decorator_list.append(_decorator(node, "continue_", [expression]))
+
+    index = _import_position(tree)
+    anchor = tree.body[index] if index < len(tree.body) else tree.body[-1]
+    statement = ast.Import(names=[ast.alias(name="forward", asname=module_name)])
+    tree.body.insert(index, ast.copy_location(statement, anchor))
+    return ast.fix_missing_locations(tree)
+
+
+def _cache_path(bytecode_path):
+    """
+    Returns the path where the hook caches the code for a
+    module, given the path where Python would cache it.
+    """
+    base, _, suffix = bytecode_path.rpartition(".")
+    return f"{base}.forward-{syntax_version}.{suffix}"
+
+class ForwardSyntaxLoader(importlib.machinery.SourceFileLoader):
+    """
+    Loads a source file that may use the "forward class" and
+    "continue class" statements, caching the compiled code
+    in a file of its own.  (See _cache_path.)
+    """
+
+    def source_to_code(self, data, path, *, _optimize=-1):
+        source = importlib.util.decode_source(data)
+        return compile(parse(source, path), path, "exec", dont_inherit=True, optimize=_optimize)
+
+    def _remap(self, path):
+        try:
+            bytecode_path = importlib.util.cache_from_source(self.path)
+        except NotImplementedError:
+            return path
+        return _cache_path(path) if path == bytecode_path else path
+
+    def get_data(self, path):
+        return super().get_data(self._remap(path))
+
+    def set_data(self, path, data, *, _mode=0o666):
+        return super().set_data(self._remap(path), data, _mode=_mode)
+
+
+def _uses_syntax(path):
+    try:
+        if os.path.isfile(_cache_path(importlib.util.cache_from_source(path))):
+            return True
+    except NotImplementedError:
+        pass
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return False
+    return _uses_syntax_re.search(data) is not None
+
+class ForwardSyntaxFinder:
+    """
+    A meta path finder that finds modules like the regular path
+    finder, and loads the ones that use the "forward class" and
+    "continue class" statements with ForwardSyntaxLoader.
+    """
+
+    @classmethod
+    def find_spec(cls, fullname, path=None, target=None):
+        spec = importlib.machinery.PathFinder.find_spec(fullname, path, target)
+        if (spec is None) or (type(spec.loader) is not importlib.machinery.SourceFileLoader):
+            return None
+        if not _uses_syntax(spec.origin):
+            return None
+        spec.loader = ForwardSyntaxLoader(fullname, spec.origin)
+        return spec
+
+    @classmethod
+    def invalidate_caches(cls):
+        pass
+
+
+def install():
+    """
+    Installs the import hook, so modules imported
+    afterwards may use the "forward class" and
+    "continue class" statements.
+    """
+    if ForwardSyntaxFinder not in sys.meta_path:
+        sys.meta_path.insert(0, ForwardSyntaxFinder)
+
+def uninstall():
+    """
+    Removes the import hook.  (Modules already
+    imported with it stay imported.)
+    """
+    while ForwardSyntaxFinder in sys.meta_path:
+        sys.meta_path.remove(ForwardSyntaxFinder)
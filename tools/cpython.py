@@ -0,0 +1,62 @@
+"""
+Helpers for running the Python interpreter built
+in a CPython checkout (or any other interpreter).
+"""
+
+import os.path
+import subprocess
+
+__all__ = []
+
+def export(fn):
+    __all__.append(fn.__name__)
+    return fn
+
+
+interpreter_candidates = (
+    "python",
+    "python.exe",
+    "python3",
+    "PCbuild/amd64/python.exe",
+    "PCbuild/win32/python.exe",
+    "PCbuild/arm64/python.exe",
+    "bin/python3",
+    "Scripts/python.exe",
+)
+
+@export
+def find_interpreter(path):
+    """
+    returns the path to a Python interpreter.
+
+    path is either the path to a Python interpreter, or a
+    directory: the root of a built CPython checkout (where
+    the interpreter is "python", "python.exe", or under
+    "PCbuild"), or a virtual environment or installation.
+
+    raises RuntimeError if no interpreter is found.
+    """
+    if os.path.isfile(path):
+        if not os.access(path, os.X_OK):
+            raise RuntimeError(f"{path!r} isn't executable")
+        return path
+    if not os.path.isdir(path):
+        raise RuntimeError(f"{path!r} doesn't exist")
+    for candidate in interpreter_candidates:
+        candidate = os.path.join(path, candidate)
+        if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+            return candidate
+    raise RuntimeError(f"couldn't find a Python interpreter in {path!r} (did you build it?)")
+
+
+@export
+def run_python(python, args, *, timeout=None, env=None):
+    """
+    runs the interpreter python with the list args, in isolated mode.
+    returns the subprocess.CompletedProcess, with stdout and stderr
+    captured as text.
+    """
+    return subprocess.run(
+        [python, "-I"] + list(args),
+        capture_output=True, text=True, timeout=timeout, env=env,
+        )
@@ -2,7 +2,8 @@
 
 """
 usage:
-    edit_file.py [-a|-r|-t] [-i <ignore>] [-v] <python_script>...
+    edit_file.py [-a|-r|-t] [-i <ignore>] [-e <engine>] [-u|-l] [-v] <python_script>...
+    edit_file.py [-a|-r|-t] [-i <ignore>] [-e <engine>] [-u|-l] [-v] -
 
 Edits the Python script found at <python_script>
 to add/remove/toggle use of the "forward class"
@@ -58,11 +59,28 @@ the bottom of the file.
     (the list of things to ignore is only used when adding
     @forward() declarations.)
 
+-e <engine> selects the rewriter engine, either "lines" (the
+default) or "ast".  the "ast" engine parses each file once with
+the ast and tokenize modules; it isn't fooled by class statements
+inside triple-quoted strings, and it handles class headers that
+span multiple lines.
+
+-u writes a unified diff of the changes to stdout, instead of
+editing the files.  -l writes a machine-readable list of edits
+to stdout instead, one line of JSON per modified file.  (either
+way, nothing on disk is touched, and the summary goes to stderr.)
+
+If <python_script> is "-", edit_file.py works as a filter:
+it reads a Python script from stdin, and writes the edited
+script to stdout (or the diff, or the list of edits, with -u
+or -l).  The summary goes to stderr.  The script is read and
+written as UTF-8.
+
 -v toggles debugging print statements.
 
 This program is just a hack.  It barely works well enough
 to let us test the proof-of-concept against the CPython
-standard library.  The parser is rudimentary:
+standard library.  The default "lines" parser is rudimentary:
     * It isn't smart about class statements inside
       triple-quoted strings.
     * If the class declaration line doesn't end
@@ -70,6 +88,7 @@ standard library.  The parser is rudimentary:
 
 """
 
+import io
 import os.path
 import re
 import sys
@@ -85,12 +104,22 @@ path = None
 behavior = "toggle"
 ignore = []
 verbose = False
+engine = "lines"
+output = "write"
 
 process_options = True
 process_ignore = False
+process_engine = False
 
 for arg in sys.argv[1:]:
 
+    if process_engine:
+        if arg not in editor.engines:
+            usage(f"unknown engine {arg!r}")
+        engine = arg
+        process_engine = False
+        continue
+
     if process_ignore:
         value = arg
         if value.isdigit():
@@ -99,7 +128,7 @@ for arg in sys.argv[1:]:
         process_ignore = False
         continue
 
-    if arg.startswith("-") and process_options:
+    if (arg != "-") and arg.startswith("-") and process_options:
         if arg == "--":
             process_options = False
             continue
@@ -109,6 +138,15 @@ for arg in sys.argv[1:]:
         if arg == "-i":
             process_ignore = True
             continue
+        if arg == "-e":
+            process_engine = True
+            continue
+        if arg == "-u":
+            output = "diff"
+            continue
+        if arg == "-l":
+            output = "edits"
+            continue
 
         behavior = editor.option_to_behavior(arg)
         if not behavior:
@@ -117,21 +155,42 @@ for arg in sys.argv[1:]:
 
     path = arg
     try:
-        behavior, modified_lines = editor.forward_edit_file(path, behavior, ignore, verbose=verbose)
+        if path == "-":
+            path = "<stdin>"
+            text = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8").read()
+            behavior, modified_lines, edited = editor.forward_edit_text(text, behavior, ignore, path=path, engine=engine, verbose=verbose)
+            if output == "write":
+                report = edited
+            elif modified_lines:
+                report = editor.format_edits(path, behavior, modified_lines, text, edited, output)
+            else:
+                report = ""
+            sys.stdout.flush()
+            sys.stdout.buffer.write(report.encode("utf-8"))
+            sys.stdout.flush()
+            summary = sys.stderr
+        else:
+            behavior, modified_lines = editor.forward_edit_file(path, behavior, ignore, engine=engine, output=output, verbose=verbose)
+            summary = sys.stdout if output == "write" else sys.stderr
         if verbose:
-            print()
-        print(f"{path}\n")
+            print(file=summary)
+        print(f"{path}\n", file=summary)
         if modified_lines:
-            print(f"    modified with {modified_lines} modifications.")
+            print(f"    modified with {modified_lines} modifications.", file=summary)
         else:
-            print(f"    not modified.")
+            print(f"    not modified.", file=summary)
     except RuntimeError as e:
         usage(str(e))
     except UnicodeDecodeError:
         raise RuntimeError(f"could not decode file {path!r}")
+    except SyntaxError as e:
+        usage(f"could not parse file {path!r}: {e}")
 
 if process_ignore:
     usage("missing argument to -i")
 
+if process_engine:
+    usage("missing argument to -e")
+
 if not path:
     usage("no files specified")
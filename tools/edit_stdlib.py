@@ -2,7 +2,7 @@
 
 """
 usage:
-    edit_stdlib.py [-a|-r|-t] [-v] <path>...
+    edit_stdlib.py [-a|-r|-t] [-v] [-j <jobs>] [-o] [-c] [-e <engine>] [-u|-l] <path>...
 
 Toggles @forward() declarations in the Lib/ directory of a
 CPython checkout from "git".
@@ -62,9 +62,34 @@ the bottom of the files.
 
 -v toggles debugging print statements.
 
+-j <jobs> edits files in parallel, using a pool of <jobs> worker
+processes.  the results are the same as editing serially.
+
+-o toggles "only cycles" mode: edit_stdlib.py only adds @forward()
+to the classes that refer to each other in cycles (as found by
+find_cycles.py), which are the only ones that need it, and
+leaves every other class alone.  (only used when adding
+@forward() declarations.)
+
+-c toggles use of a manifest file (".forward-manifest.json") in
+the root of the tree.  the manifest records a hash of every edited
+file, so later runs can skip files that haven't changed since they
+were last edited.
+
+-e <engine> selects the rewriter engine, either "lines" (the
+default) or "ast".  the "ast" engine parses each file once with
+the ast and tokenize modules; it isn't fooled by class statements
+inside triple-quoted strings, and it handles class headers that
+span multiple lines.
+
+-u writes a unified diff of the changes to stdout, instead of
+editing the files.  -l writes a machine-readable list of edits
+to stdout instead, one line of JSON per modified file.  (either
+way, nothing on disk is touched, and the summary goes to stderr.)
+
 This program is just a hack.  It barely works well enough
 to let us test the proof-of-concept against the CPython
-standard library.  The parser is rudimentary:
+standard library.  The default "lines" parser is rudimentary:
     * It isn't smart about class statements inside
       triple-quoted strings.
     * If the class declaration line doesn't end
@@ -230,52 +255,103 @@ def usage(s):
     sys.exit(f"error: {s}\n\n{__doc__.strip()}")
 
 
-path = None
-behavior = "toggle"
-verbose = False
+def main():
+    path = None
+    behavior = "toggle"
+    verbose = False
+    jobs = None
+    manifest = False
+    only_cycles = False
+    engine = "lines"
+    output = "write"
+
+    process_options = True
+    process_jobs = False
+    process_engine = False
 
-process_options = True
+    for arg in sys.argv[1:]:
 
-for arg in sys.argv[1:]:
+        if process_engine:
+            if arg not in editor.engines:
+                usage(f"unknown engine {arg!r}")
+            engine = arg
+            process_engine = False
+            continue
 
-    if arg.startswith("-") and process_options:
-        if arg == "--":
-            process_options = False
+        if process_jobs:
+            if not arg.isdigit():
+                usage(f"invalid argument to -j: {arg!r}")
+            jobs = int(arg)
+            process_jobs = False
             continue
-        if arg == "-v":
-            verbose = not verbose
+
+        if arg.startswith("-") and process_options:
+            if arg == "--":
+                process_options = False
+                continue
+            if arg == "-v":
+                verbose = not verbose
+                continue
+            if arg == "-j":
+                process_jobs = True
+                continue
+            if arg == "-o":
+                only_cycles = not only_cycles
+                continue
+            if arg == "-c":
+                manifest = not manifest
+                continue
+            if arg == "-e":
+                process_engine = True
+                continue
+            if arg == "-u":
+                output = "diff"
+                continue
+            if arg == "-l":
+                output = "edits"
+                continue
+
+            behavior = editor.option_to_behavior(arg)
+            if not behavior:
+                usage("unknown option " + arg)
             continue
 
-        behavior = editor.option_to_behavior(arg)
-        if not behavior:
-            usage("unknown option " + arg)
-        continue
-
-    path = arg
-    try:
-        for subpath in process_paths("""
-            Doc
-            Grammar
-            Lib
-            LICENSE
-            Python
-            PCbuild
-            configure
-            .git
-        """):
-            if not os.path.exists(os.path.join(path, subpath)):
-                usage(f"bad CPython checkout.  no {subpath!r} found.")
-        with open(os.path.join(path, ".git", "HEAD"), "rt") as f:
-            revision = f.read().strip()
-        if revision != checkout_id:
-            print(f"{   revision=}\n{checkout_id=}")
-            usage(f"bad CPython git revision in {path!r}.\ngo to that directory and run:\n\n    git checkout {checkout_id}")
-        behavior, modified_files, modified_lines = editor.forward_edit_tree(os.path.join(path, "Lib"), behavior, ignore_files, ignore_directories, ignore_file_map, verbose=verbose, install_forward_module=True)
-        if verbose:
-            print()
-        print(f"{path}\n    {modified_files} files modified with {modified_lines} modified lines.")
-    except RuntimeError as e:
-        usage(str(e))
-
-if not path:
-    usage("no paths specified.")
+        path = arg
+        try:
+            for subpath in process_paths("""
+                Doc
+                Grammar
+                Lib
+                LICENSE
+                Python
+                PCbuild
+                configure
+                .git
+            """):
+                if not os.path.exists(os.path.join(path, subpath)):
+                    usage(f"bad CPython checkout.  no {subpath!r} found.")
+            with open(os.path.join(path, ".git", "HEAD"), "rt") as f:
+                revision = f.read().strip()
+            if revision != checkout_id:
+                print(f"{   revision=}\n{checkout_id=}")
+                usage(f"bad CPython git revision in {path!r}.\ngo to that directory and run:\n\n    git checkout {checkout_id}")
+            behavior, modified_files, modified_lines = editor.forward_edit_tree(os.path.join(path, "Lib"), behavior, ignore_files, ignore_directories, ignore_file_map, verbose=verbose, install_forward_module=True, jobs=jobs, manifest=manifest, engine=engine, output=output, only_cycles=only_cycles)
+            summary = sys.stdout if output == "write" else sys.stderr
+            if verbose:
+                print(file=summary)
+            print(f"{path}\n    {modified_files} files modified with {modified_lines} modified lines.", file=summary)
+        except RuntimeError as e:
+            usage(str(e))
+
+    if process_jobs:
+        usage("missing argument to -j")
+
+    if process_engine:
+        usage("missing argument to -e")
+
+    if not path:
+        usage("no paths specified.")
+
+
+if __name__ == "__main__":
+    main()
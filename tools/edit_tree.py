@@ -2,7 +2,7 @@
 
 """
 usage:
-    edit_tree.py [-a|-r|-t] [-i <file> <ignore>] [-f <file>] [-d <directory>] [-m] path...
+    edit_tree.py [-a|-r|-t] [-i <file> <ignore>] [-f <file>] [-d <directory>] [-m] [-j <jobs>] [-o] [-c] [-e <engine>] [-u|-l] path...
 
 Toggles @forward() declarations in an entire tree of Python files.
 
@@ -69,6 +69,33 @@ in the tree.
 
 -v toggles debugging print statements.
 
+-j <jobs> edits files in parallel, using a pool of <jobs> worker
+processes.  the results are the same as editing serially.
+
+-o toggles "only cycles" mode: edit_tree.py only adds @forward()
+to the classes that refer to each other in cycles (as found by
+find_cycles.py), which are the only ones that need it, and
+leaves every other class alone.  (only used when adding
+@forward() declarations.)  it always uses the "ast" engine,
+since the "lines" engine can't tell which class statements
+the cycles refer to.
+
+-c toggles use of a manifest file (".forward-manifest.json") in
+the root of the tree.  the manifest records a hash of every edited
+file, so later runs can skip files that haven't changed since they
+were last edited, and files with nothing to edit either way.
+
+-e <engine> selects the rewriter engine, either "lines" (the
+default) or "ast".  the "ast" engine parses each file once with
+the ast and tokenize modules; it isn't fooled by class statements
+inside triple-quoted strings, and it handles class headers that
+span multiple lines.
+
+-u writes a unified diff of the changes to stdout, instead of
+editing the files.  -l writes a machine-readable list of edits
+to stdout instead, one line of JSON per modified file.  (either
+way, nothing on disk is touched, and the summary goes to stderr.)
+
 -m toggles whether or not edit_tree.py will also install the
 "forward" module in path.  by default, if behavior is "add",
 and there is no "forward" module installed in path, edit_tree.py
@@ -79,7 +106,7 @@ if "behavior" is "remove".)
 
 This program is just a hack.  It barely works well enough
 to let us test the proof-of-concept against the CPython
-standard library.  The parser is rudimentary:
+standard library.  The default "lines" parser is rudimentary:
     * It isn't smart about class statements inside
       triple-quoted strings.
     * If the class declaration line doesn't end
@@ -95,78 +122,130 @@ import editor
 def usage(s):
     sys.exit(f"error: {s}\n\n{__doc__.strip()}")
 
-path = None
-behavior = "toggle"
-ignore_files = []
-ignore_directories = []
-ignore_file_map = defaultdict(list)
-verbose = False
-install_forward_module = True
-
-process_options = True
-process_directory = False
-process_file = False
-process_ignore = False
-ignore_filename = None
-
-for arg in sys.argv[1:]:
-
-    if process_directory:
-        ignore_directories.append(arg)
-        process_directory = False
-        continue
-
-    if process_file:
-        ignore_files.append(arg)
-        process_file = False
-        continue
-
-    if process_ignore:
-        if ignore_filename is None:
-            ignore_filename = arg
-            continue
 
-        value = arg
-        if value.isdigit():
-            value = int(value)
-        ignore_file_map[ignore_filename].append(value)
-        ignore_filename = None
-        process_ignore = False
-        continue
-
-    if arg.startswith("-") and process_options:
-        if arg == "--":
-            process_options = False
+def main():
+    path = None
+    behavior = "toggle"
+    ignore_files = []
+    ignore_directories = []
+    ignore_file_map = defaultdict(list)
+    verbose = False
+    install_forward_module = True
+    jobs = None
+    manifest = False
+    only_cycles = False
+    engine = "lines"
+    output = "write"
+
+    process_options = True
+    process_directory = False
+    process_file = False
+    process_ignore = False
+    process_jobs = False
+    process_engine = False
+    ignore_filename = None
+
+    for arg in sys.argv[1:]:
+
+        if process_engine:
+            if arg not in editor.engines:
+                usage(f"unknown engine {arg!r}")
+            engine = arg
+            process_engine = False
             continue
-        if arg == "-v":
-            verbose = not verbose
+
+        if process_jobs:
+            if not arg.isdigit():
+                usage(f"invalid argument to -j: {arg!r}")
+            jobs = int(arg)
+            process_jobs = False
             continue
-        if arg == "-m":
-            install_forward_module = not install_forward_module
+
+        if process_directory:
+            ignore_directories.append(arg)
+            process_directory = False
             continue
-        if arg == "-d":
-            process_directory = True
+
+        if process_file:
+            ignore_files.append(arg)
+            process_file = False
             continue
-        if arg == "-f":
-            process_file = True
+
+        if process_ignore:
+            if ignore_filename is None:
+                ignore_filename = arg
+                continue
+
+            value = arg
+            if value.isdigit():
+                value = int(value)
+            ignore_file_map[ignore_filename].append(value)
+            ignore_filename = None
+            process_ignore = False
             continue
-        if arg == "-i":
-            process_ignore = True
+
+        if arg.startswith("-") and process_options:
+            if arg == "--":
+                process_options = False
+                continue
+            if arg == "-v":
+                verbose = not verbose
+                continue
+            if arg == "-m":
+                install_forward_module = not install_forward_module
+                continue
+            if arg == "-d":
+                process_directory = True
+                continue
+            if arg == "-f":
+                process_file = True
+                continue
+            if arg == "-i":
+                process_ignore = True
+                continue
+            if arg == "-j":
+                process_jobs = True
+                continue
+            if arg == "-o":
+                only_cycles = not only_cycles
+                continue
+            if arg == "-c":
+                manifest = not manifest
+                continue
+            if arg == "-e":
+                process_engine = True
+                continue
+            if arg == "-u":
+                output = "diff"
+                continue
+            if arg == "-l":
+                output = "edits"
+                continue
+
+            behavior = editor.option_to_behavior(arg)
+            if not behavior:
+                usage("unknown option " + arg)
             continue
 
-        behavior = editor.option_to_behavior(arg)
-        if not behavior:
-            usage("unknown option " + arg)
-        continue
-
-    path = arg
-    try:
-        behavior, modified_files, modified_lines = editor.forward_edit_tree(path, behavior, ignore_files, ignore_directories, dict(ignore_file_map), verbose=verbose, install_forward_module=install_forward_module)
-        if verbose:
-            print()
-        print(f"{path}\n    {modified_files} files modified with {modified_lines} modified lines.")
-    except RuntimeError as e:
-        usage(str(e))
-
-if not path:
-    usage("no paths specified.")
+        path = arg
+        try:
+            behavior, modified_files, modified_lines = editor.forward_edit_tree(path, behavior, ignore_files, ignore_directories, dict(ignore_file_map), verbose=verbose, install_forward_module=install_forward_module, jobs=jobs, manifest=manifest, engine=engine, output=output, only_cycles=only_cycles)
+            summary = sys.stdout if output == "write" else sys.stderr
+            if verbose:
+                print(file=summary)
+            print(f"{path}\n    {modified_files} files modified with {modified_lines} modified lines.", file=summary)
+        except RuntimeError as e:
+            usage(str(e))
+
+    if process_jobs:
+        usage("missing argument to -j")
+
+    if process_engine:
+        usage("missing argument to -e")
+
+    if not path:
+        usage("no paths specified.")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,18 @@ usage in a Python script or tree.
 """
 
 import ast
+import concurrent.futures
+import difflib
+import hashlib
+import io
+import json
 import os.path
 import re
 import shutil
 import sys
+import tokenize
+
+from . import cycles
 
 __all__ = []
 
@@ -39,6 +47,22 @@ def get_indent(line, stripped):
 
 class_name_re = re.compile("^class ([_A-Za-z0-9]+)[( :]")
 
+class_statement_re = re.compile(r"^[ \t]*class\b", re.MULTILINE)
+
+newline_re = re.compile(r"\r\n|\r|\n")
+
+def split_lines(text):
+    """
+    splits text into lines where the tokenizer does, so the
+    line numbers match the ast's.  (str.splitlines also splits
+    at form feeds, vertical tabs, and a few other characters
+    a line of Python may contain.)
+    """
+    lines = newline_re.split(text)
+    if not lines[-1]:
+        lines.pop()
+    return lines
+
 
 import_line = "from forward import *"
 del_forward_line = "del forward"
@@ -51,8 +75,35 @@ ignore_sentinel_line = "# hey, forward.tools.editor! ignore this file!"
 lines_to_strip = {import_line, del_forward_line, del_continue__line}
 
 
+outputs = ("write", "diff", "edits")
+
 @export
-def forward_edit_file(path, behavior, ignore, *, verbose=False, indent=""):
+def format_edits(path, behavior, modified_lines, before, after, output):
+    """
+    formats the changes from before to after (the text of the
+    file at path) as a string, according to output:
+      "diff" is a unified diff.
+      "edits" is a single line of JSON.
+    """
+    before = before.splitlines()
+    after = after.splitlines()
+    if output == "diff":
+        lines = difflib.unified_diff(before, after, fromfile=path, tofile=path, lineterm="")
+        return "".join(line + "\n" for line in lines)
+
+    assert output == "edits"
+    matcher = difflib.SequenceMatcher(None, before, after, autojunk=False)
+    edits = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        edits.append({"line": i1 + 1, "delete": i2 - i1, "insert": after[j1:j2]})
+    report = {"path": path, "behavior": behavior, "modified_lines": modified_lines, "edits": edits}
+    return json.dumps(report) + "\n"
+
+
+@export
+def forward_edit_file(path, behavior, ignore, *, engine="lines", output="write", stream=None, verbose=False, indent=""):
     """
     edits a Python file, either
       * adding,
@@ -95,6 +146,30 @@ def forward_edit_file(path, behavior, ignore, *, verbose=False, indent=""):
     (when behavior is "remove", or behavior is still "toggle",
     ignore is, itself, ignored.)
 
+    engine is a string naming the rewriter engine, either "lines" or "ast":
+      "lines" is the original line-by-line state machine.  it's
+        easily fooled by class statements inside triple-quoted
+        strings, and by class headers spanning multiple lines.
+      "ast" parses the file once with the ast and tokenize modules,
+        and isn't fooled by either.  it raises SyntaxError if the
+        file isn't valid Python.
+
+    output is a string, either "write", "diff", or "edits":
+      "write" means rewrite the file in place.
+      "diff" means leave the file alone, and instead write a
+        unified diff of the changes to stream.
+      "edits" means leave the file alone, and instead write a
+        single line of JSON describing the changes to stream:
+            {"path": path, "behavior": final_behavior,
+             "modified_lines": modified_lines, "edits": [edit, ...]}
+        each edit is {"line": n, "delete": count, "insert": [lines]},
+        meaning "replace count lines starting at line n (1-based,
+        in the original file) with these lines".
+    (nothing is written to stream if the file isn't modified.)
+
+    stream is a file-like object, default sys.stdout.
+    it's only used if output isn't "write".
+
     if verbose is true, forward_edit_file will print debugging information.
 
     indent is a string prepended to every line printed for debugging.
@@ -112,19 +187,81 @@ def forward_edit_file(path, behavior, ignore, *, verbose=False, indent=""):
     adding or removing a line counts as one modification.
     """
     if verbose:
-        print(f"{indent}forward_edit_file\n{indent}  {path=}\n{indent}  {behavior=}\n{indent}  {ignore=}\n{indent}  {verbose=}")
+        print(f"{indent}forward_edit_file\n{indent}  {path=}\n{indent}  {behavior=}\n{indent}  {ignore=}\n{indent}  {engine=}\n{indent}  {output=}\n{indent}  {verbose=}")
+
+    if output not in outputs:
+        outputs_str = ', '.join(repr(x) for x in outputs)
+        raise RuntimeError(f"output {output!r} not in {outputs_str}")
+
+    if not (path.endswith(".py") and os.path.exists(path)):
+        raise RuntimeError(f"invalid Python file {path!r}")
+
+    with open(path, "rt", encoding="utf-8") as f:
+        stat = os.stat(f.fileno())
+        times_ns = stat.st_atime_ns, stat.st_mtime_ns
+        text = f.read()
+
+    behavior, modified_lines, edited = forward_edit_text(text, behavior, ignore, path=path, engine=engine, verbose=verbose, indent=indent)
+
+    if not modified_lines:
+        pass
+    elif output == "write":
+        output_path = path
+        with open(output_path, "wt") as f:
+            f.write(edited)
+        os.utime(output_path, ns=times_ns)
+    else:
+        if stream is None:
+            stream = sys.stdout
+        stream.write(format_edits(path, behavior, modified_lines, text, edited, output))
+
+    if verbose:
+        print(f"{indent}  returning {behavior=}, {modified_lines=}")
+    return behavior, modified_lines
+
 
+@export
+def forward_edit_text(text, behavior, ignore=(), *, path="<string>", engine="lines", verbose=False, indent=""):
+    """
+    the guts of forward_edit_file, working on a string instead
+    of a file: edits text, the contents of a Python file.
+    nothing is read from or written to disk.
+
+    behavior, ignore, engine, verbose, and indent are the same
+    as the arguments to forward_edit_file().
+
+    path is only used in error messages.
+
+    returns a tuple:
+        (final_behavior, modified_lines, text)
+    final_behavior and modified_lines are the same as the values
+    returned by forward_edit_file().  if modified_lines is nonzero,
+    text is the edited text, otherwise it's the original text.
+    """
     if behavior not in behaviors:
         behaviors_str = ', '.join(repr(x) for x in behaviors)
         raise RuntimeError(f"behavior {behavior!r} not in {behaviors_str}")
 
-    if not (path.endswith(".py") and os.path.exists(path)):
-        raise RuntimeError(f"invalid Python file {path!r}")
+    if engine not in engines:
+        engines_str = ', '.join(repr(x) for x in engines)
+        raise RuntimeError(f"engine {engine!r} not in {engines_str}")
 
     invalid_ignore_values = [o for o in ignore if not isinstance(o, (int, str))]
     if invalid_ignore_values:
         raise RuntimeError(f"invalid values in ignore: {invalid_ignore_values}")
 
+    return engines[engine](text, path, behavior, ignore, verbose=verbose, indent=indent)
+
+
+def _forward_edit_text_lines(text, path, behavior, ignore, *, verbose=False, indent=""):
+    """
+    the original "lines" engine.  a line-by-line state machine,
+    using simple string checks to recognize class definitions.
+
+    it's fast and simple, but it's easily fooled: it doesn't
+    understand triple-quoted strings, and it ignores class
+    definitions whose first line doesn't end with a colon.
+    """
     lines = []
     modified_lines = 0
 
@@ -136,24 +273,37 @@ def forward_edit_file(path, behavior, ignore, *, verbose=False, indent=""):
     else:
         state = "initial"
 
-    with open(path, "rt", encoding="utf-8") as f:
-        stat = os.stat(f.fileno())
-        times_ns = stat.st_atime_ns, stat.st_mtime_ns
-        text = f.read()
-
-    for line_number, line in enumerate(text.splitlines(), 1):
+    # classes that declare __slots__ need special handling,
+    # which needs the ast.  maps the line number of the class
+    # definition to the lines to put in the forward class.
+    # (see _slots_statement.)
+    slots = {}
+    if (behavior != "remove") and ("__slots__" in text):
+        text_lines = split_lines(text)
+        tree = compile(text, path, 'exec', ast.PyCF_ALLOW_TOP_LEVEL_AWAIT | ast.PyCF_ONLY_AST, dont_inherit=True)
+        for node in _class_definitions(tree.body, []):
+            line = text_lines[node.lineno - 1]
+            slots[node.lineno] = _slots_statement(text_lines, node, line[:node.col_offset])
+
+    # (numbering the lines the way the ast does.)
+    for line_number, line in enumerate(split_lines(text), 1):
         original = line.rstrip('\n')
         line = line.rstrip()
         stripped = line.lstrip()
 
         if not stripped:
-            lines.append(original)
+            if state == "looking for class declaration":
+                # a blank line in the __slots__ we copied
+                # into the forward class.  (see _slots_statement.)
+                modified_lines += 1
+            else:
+                lines.append(original)
             continue
 
         if line == ignore_sentinel_line:
             if verbose:
                 print(f"{indent}  skipping this file, found sentinel line.")
-            return behavior, 0
+            return behavior, 0, text
 
         if state == "detect":
             if stripped.startswith("class "):
@@ -199,7 +349,7 @@ def forward_edit_file(path, behavior, ignore, *, verbose=False, indent=""):
                 # this file already has forward declarations!
                 if verbose:
                     print(f"{indent}  skipping this file, behavior='add' and it already has forward declarations.")
-                return behavior, 0
+                return behavior, 0, text
 
             if is_class_definition(stripped):
                 code_indent = get_indent(line, stripped)
@@ -213,12 +363,20 @@ def forward_edit_file(path, behavior, ignore, *, verbose=False, indent=""):
                     lines.append(original)
                     continue
 
+                class_slots = slots.get(line_number, [])
+                if class_slots is None:
+                    if verbose:
+                        print(f"{indent}  can't copy the __slots__ of class {classname}, line {line_number}, skipping it.")
+                    lines.append(original)
+                    continue
+                class_slots = class_slots or [code_indent + f"    ..."]
+
                 lines.append(code_indent + forward_decorator_line)
                 lines.append(original)
-                lines.append(code_indent + f"    ...")
+                lines.extend(class_slots)
                 lines.append(code_indent + f"@continue_({classname})")
                 lines.append(code_indent + continue_class_declaration_line)
-                modified_lines += 4
+                modified_lines += 3 + len(class_slots)
                 continue
             lines.append(original)
             continue
@@ -249,7 +407,7 @@ def forward_edit_file(path, behavior, ignore, *, verbose=False, indent=""):
     if not lines:
         if verbose:
             print(f"{indent}  file is empty.")
-        return behavior, 0
+        return behavior, 0, text
 
     if not modified_lines:
         if verbose:
@@ -285,18 +443,515 @@ def forward_edit_file(path, behavior, ignore, *, verbose=False, indent=""):
 
         text = "\n".join(lines) + "\n"
 
-        output_path = path
-        with open(output_path, "wt") as f:
-            f.write(text)
-        os.utime(output_path, ns=times_ns)
+    return behavior, modified_lines, text
 
-    if verbose:
-        print(f"{indent}  returning {behavior=}, {modified_lines=}")
-    return behavior, modified_lines
+
+def _is_call_to(node, name):
+    return (isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and (node.func.id == name))
+
+def _is_forward_decorator(node):
+    return _is_call_to(node, "forward") and not (node.args or node.keywords)
+
+def _is_continue_decorator(node, classname):
+    return (_is_call_to(node, "continue_")
+        and (len(node.args) == 1)
+        and (not node.keywords)
+        and isinstance(node.args[0], ast.Name)
+        and (node.args[0].id == classname))
+
+def _class_definitions(body, classes):
+    """
+    appends every class definition found in the list of statements
+    body to classes, recursively.  (class definitions are statements,
+    so we only need to look in lists of statements, not expressions.)
+    """
+    for node in body:
+        if isinstance(node, ast.ClassDef):
+            classes.append(node)
+        for field in ("body", "orelse", "finalbody", "handlers"):
+            child = getattr(node, field, None)
+            if child:
+                _class_definitions(child, classes)
+        for case in getattr(node, "cases", ()):
+            _class_definitions(case.body, classes)
+    return classes
+
+def _class_header_end(lines, node):
+    """
+    returns the line number of the colon ending the header
+    of the class definition node, or None if the class body
+    starts on the same line as the colon (e.g. "class C: pass").
+    """
+    body_start = node.body[0]
+    if getattr(body_start, "decorator_list", None):
+        body_start = body_start.decorator_list[0]
+    body_line = body_start.lineno
+
+    # fast path: the usual one-line "class C(A, B):" header.
+    line = lines[node.lineno - 1]
+    if ((body_line > node.lineno)
+        and ("#" not in line)
+        and line.rstrip().endswith(":")
+        and all((n.end_lineno == node.lineno) for n in node.bases + node.keywords)):
+        return node.lineno
+
+    # slow path: tokenize just the header.
+    header = [lines[node.lineno - 1].lstrip()] + lines[node.lineno:body_line]
+    readline = iter(line + "\n" for line in header).__next__
+    depth = 0
+    try:
+        for token in tokenize.generate_tokens(readline):
+            if token.type != tokenize.OP:
+                continue
+            if token.string in "([{":
+                depth += 1
+            elif token.string in ")]}":
+                depth -= 1
+            elif (token.string == ":") and not depth:
+                colon_line = node.lineno + token.start[0] - 1
+                return colon_line if colon_line < body_line else None
+    except (tokenize.TokenError, StopIteration):
+        pass
+    return None
+
+
+def _assigns_slots(node):
+    if isinstance(node, ast.Assign):
+        targets = node.targets
+    elif isinstance(node, (ast.AnnAssign, ast.AugAssign)):
+        targets = [node.target]
+    else:
+        return False
+    return any(isinstance(t, ast.Name) and (t.id == "__slots__") for t in targets)
+
+def _slots_assignments(body, found):
+    """
+    appends every statement assigning to __slots__ in the list
+    of statements body to found, recursively, without looking
+    inside function or class definitions.
+    """
+    for node in body:
+        if _assigns_slots(node):
+            found.append(node)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        for field in ("body", "orelse", "finalbody", "handlers"):
+            child = getattr(node, field, None)
+            if child:
+                _slots_assignments(child, found)
+        for case in getattr(node, "cases", ()):
+            _slots_assignments(case.body, found)
+    return found
+
+def _is_simple_slots(value):
+    if isinstance(value, str):
+        names = [value]
+    elif isinstance(value, (tuple, list, set, dict)):
+        names = list(value)
+    else:
+        return False
+    for name in names:
+        if not isinstance(name, str):
+            return False
+        if name.startswith("__") and not name.endswith("__"):
+            # private names are mangled using the class name,
+            # so the continue class can't repeat them.
+            return False
+    return True
+
+def _slots_statement(lines, node, code_indent):
+    """
+    forward() classes must declare their __slots__ themselves;
+    the continue class can only repeat them.  (CPython fixes the
+    layout of a class's instances when the class is created.)
+
+    returns the lines to put in the body of the forward class
+    for the class definition node, to declare the same __slots__:
+    an empty list if the class doesn't declare __slots__, or a copy
+    of its "__slots__ = ..." statement.  returns None if it can't
+    be copied, in which case we shouldn't forward-declare the class.
+
+    it can only copy one assignment of a literal (strings, or a
+    tuple / list / dict of strings) to __slots__ at the top level
+    of the class body, on lines of its own.
+    """
+    found = _slots_assignments(node.body, [])
+    if not found:
+        return []
+    if len(found) != 1:
+        return None
+    statement = found[0]
+    if (statement not in node.body) or not isinstance(statement, ast.Assign) or (len(statement.targets) != 1):
+        return None
+    try:
+        value = ast.literal_eval(statement.value)
+    except (ValueError, TypeError):
+        return None
+    if not _is_simple_slots(value):
+        return None
+    first = lines[statement.lineno - 1]
+    last = lines[statement.end_lineno - 1]
+    if first[:statement.col_offset].strip():
+        return None
+    trailing = last[statement.end_col_offset:].strip()
+    if trailing and not trailing.startswith("#"):
+        return None
+    copy = [code_indent + "    " + first[statement.col_offset:]]
+    copy.extend(lines[statement.lineno:statement.end_lineno])
+    return copy
+
+
+def _forward_edit_text_ast(text, path, behavior, ignore, *, verbose=False, indent=""):
+    """
+    the "ast" engine.  parses the file once, with the ast and tokenize
+    modules, and computes every edit from that one parse.
+
+    it isn't fooled by class statements inside strings, and it handles
+    class headers that span multiple lines.  it only removes @forward()
+    declarations written in its own style (the style it adds).
+
+    raises SyntaxError if text isn't valid Python.
+    """
+    # cheap checks first, so we only parse files we might edit.
+    if not class_statement_re.search(text):
+        if verbose:
+            print(f"{indent}  no class definitions in file.")
+        return behavior, 0, text
+
+    if (behavior == "remove") and (forward_decorator_line not in text):
+        if verbose:
+            print(f"{indent}  no @forward() declarations in file.")
+        return behavior, 0, text
+
+    lines = split_lines(text)
+
+    if ignore_sentinel_line in text:
+        for line in lines:
+            if line.rstrip() == ignore_sentinel_line:
+                if verbose:
+                    print(f"{indent}  skipping this file, found sentinel line.")
+                return behavior, 0, text
+
+    tree = compile(text, path, 'exec', ast.PyCF_ALLOW_TOP_LEVEL_AWAIT | ast.PyCF_ONLY_AST, dont_inherit=True)
+
+    classes = _class_definitions(tree.body, [])
+
+    if behavior == "toggle":
+        first = None
+        if classes:
+            node = min(classes, key=lambda node: node.decorator_list[0].lineno if node.decorator_list else node.lineno)
+            line = node.decorator_list[0].lineno if node.decorator_list else node.lineno
+            marker = "remove" if any(_is_forward_decorator(d) for d in node.decorator_list) else "add"
+            first = (line, marker)
+        for node in tree.body:
+            if isinstance(node, ast.ImportFrom) and (lines[node.lineno - 1].strip() == import_line):
+                if (first is None) or (node.lineno < first[0]):
+                    first = (node.lineno, "remove")
+                break
+        if first is None:
+            if verbose:
+                print(f"{indent}  no class definitions in file.")
+            return behavior, 0, text
+        behavior = first[1]
+
+    # edits, keyed by (1-based) line number
+    insert_before = {}
+    insert_after = {}
+    delete = set()
+
+    def insert(d, line_number, line):
+        d.setdefault(line_number, []).append(line)
+
+    if behavior == "add":
+        if any(_is_forward_decorator(d) for node in classes for d in node.decorator_list):
+            # this file already has forward declarations!
+            if verbose:
+                print(f"{indent}  skipping this file, behavior='add' and it already has forward declarations.")
+            return behavior, 0, text
+
+        ignore_line_numbers = {o for o in ignore if isinstance(o, int)}
+        ignore_classnames = {o for o in ignore if isinstance(o, str)}
+
+        for node in classes:
+            if (node.lineno in ignore_line_numbers) or (node.name in ignore_classnames):
+                continue
+            header_end = _class_header_end(lines, node)
+            if header_end is None:
+                # the class body is on the same line as the header.
+                continue
+            line = lines[node.lineno - 1]
+            code_indent = line[:node.col_offset]
+            if code_indent.strip():
+                continue
+            slots = _slots_statement(lines, node, code_indent)
+            if slots is None:
+                if verbose:
+                    print(f"{indent}  can't copy the __slots__ of class {node.name}, line {node.lineno}, skipping it.")
+                continue
+            insert(insert_before, node.lineno, code_indent + forward_decorator_line)
+            for slots_line in slots or [code_indent + "    ..."]:
+                insert(insert_after, header_end, slots_line)
+            insert(insert_after, header_end, code_indent + f"@continue_({node.name})")
+            insert(insert_after, header_end, code_indent + continue_class_declaration_line)
+
+        if insert_before:
+            # the import goes before the first statement,
+            # skipping the docstring and any "from __future__" imports.
+            first_line = None
+            for i, node in enumerate(tree.body):
+                if ((i == 0)
+                    and isinstance(node, ast.Expr)
+                    and isinstance(node.value, ast.Constant)
+                    and isinstance(node.value.value, str)):
+                    continue
+                if isinstance(node, ast.ImportFrom) and (node.module == "__future__"):
+                    continue
+                first_line = node.lineno
+                if getattr(node, "decorator_list", None):
+                    first_line = node.decorator_list[0].lineno
+                break
+            if first_line is None:
+                insert(insert_after, len(lines), import_line)
+            else:
+                insert_before.setdefault(first_line, []).insert(0, import_line)
+            insert(insert_after, len(lines), "")
+            insert(insert_after, len(lines), del_forward_line)
+            insert(insert_after, len(lines), del_continue__line)
+            insert(insert_after, len(lines), "")
+    else:
+        assert behavior == "remove"
+
+        def remove_forward_declarations(body):
+            for node, next_node in zip(body, body[1:]):
+                if not (isinstance(node, ast.ClassDef) and isinstance(next_node, ast.ClassDef)):
+                    continue
+                forward_decorators = [d for d in node.decorator_list if _is_forward_decorator(d)]
+                if not forward_decorators:
+                    continue
+                decorator_line = forward_decorators[0].lineno
+                if lines[decorator_line - 1].strip() != forward_decorator_line:
+                    continue
+                if not ((next_node.name == "_____")
+                    and (len(next_node.decorator_list) == 1)
+                    and _is_continue_decorator(next_node.decorator_list[0], node.name)):
+                    continue
+                header_end = _class_header_end(lines, node)
+                continue_header_end = _class_header_end(lines, next_node)
+                if (header_end is None) or (continue_header_end is None):
+                    continue
+                expected = {"", "...", "pass", f"@continue_({node.name})", continue_class_declaration_line}
+                # the forward class may also declare __slots__.
+                slots = set()
+                for statement in node.body:
+                    if _assigns_slots(statement):
+                        slots.update(range(statement.lineno, statement.end_lineno + 1))
+                span = range(header_end + 1, continue_header_end + 1)
+                if any((i not in slots) and (lines[i - 1].strip() not in expected) for i in span):
+                    continue
+                delete.add(decorator_line)
+                delete.update(span)
+
+            for node in body:
+                for field in ("body", "orelse", "finalbody", "handlers"):
+                    child = getattr(node, field, None)
+                    if child:
+                        remove_forward_declarations(child)
+                for case in getattr(node, "cases", ()):
+                    remove_forward_declarations(case.body)
+
+        remove_forward_declarations(tree.body)
+
+        for node in tree.body:
+            if node.lineno != node.end_lineno:
+                continue
+            if lines[node.lineno - 1].strip() in lines_to_strip:
+                if isinstance(node, (ast.ImportFrom, ast.Delete)):
+                    delete.add(node.lineno)
+
+    modified_lines = len(delete) + sum(len(l) for l in insert_before.values()) + sum(len(l) for l in insert_after.values())
+    if not modified_lines:
+        if verbose:
+            print(f"{indent}  no modified lines in file.")
+        return behavior, 0, text
+
+    output = []
+    for line_number, line in enumerate(lines, 1):
+        output.extend(insert_before.get(line_number, ()))
+        if line_number not in delete:
+            output.append(line)
+        output.extend(insert_after.get(line_number, ()))
+
+    if behavior == "remove":
+        # we removed the "del forward" and "del continue_" lines.
+        # let's also strip the two blank lines we inserted.
+        for _ in range(2):
+            if output and not output[-1]:
+                output.pop()
+                modified_lines += 1
+
+    text = "\n".join(output) + "\n"
+    return behavior, modified_lines, text
+
+
+engines = {
+    "lines": _forward_edit_text_lines,
+    "ast": _forward_edit_text_ast,
+}
+
+
+manifest_filename = ".forward-manifest.json"
+manifest_version = 2
+
+
+def _hash_file(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def _load_manifest(path):
+    """
+    loads the manifest stored in the root of the tree at path.
+    returns a dict mapping relative paths to manifest entries.
+    a missing, unreadable, or out-of-date manifest is treated as empty.
+    """
+    manifest_path = os.path.join(path, manifest_filename)
+    try:
+        with open(manifest_path, "rt", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not (isinstance(manifest, dict) and (manifest.get("version") == manifest_version)):
+        return {}
+    return manifest.get("files", {})
+
+def _save_manifest(path, files):
+    manifest_path = os.path.join(path, manifest_filename)
+    temporary_path = manifest_path + ".tmp"
+    with open(temporary_path, "wt", encoding="utf-8") as f:
+        json.dump({"version": manifest_version, "files": files}, f, indent=1, sort_keys=True)
+        f.write("\n")
+    os.replace(temporary_path, manifest_path)
+
+
+def _forward_edit_tree_file(file_path, behavior, ignore, entry, *, engine="lines", output="write", stream=None, verbose=False, indent=""):
+    """
+    edits one file on behalf of forward_edit_tree.
+
+    entry is the file's entry from the manifest, or None if
+    forward_edit_tree isn't using a manifest.  (if it is using
+    a manifest, but the file isn't in it, entry should be {}.)
+    for each behavior, entry records the hash of the contents
+    we last saw it change nothing in (because it had just
+    been applied, or because there was nothing to edit), along
+    with the ignore list and engine.  if the file's contents
+    hash to the value recorded for the requested behavior, the
+    file is already in the requested state and we don't even
+    parse it.  (so a file with nothing to edit is skipped both
+    ways, once it's been through "add" and "remove".)
+
+    returns a tuple:
+        (final_behavior, modified_lines, entry)
+    entry is the file's new manifest entry, or None if
+    forward_edit_tree isn't using a manifest.
+    """
+    if entry is None:
+        behavior, modified_lines = forward_edit_file(file_path, behavior, ignore, engine=engine, output=output, stream=stream, verbose=verbose, indent=indent)
+        return behavior, modified_lines, None
+
+    ignore = list(ignore)
+    digest = _hash_file(file_path)
+    hashes = {}
+    if (entry.get("ignore") == ignore) and (entry.get("engine") == engine):
+        hashes = dict(entry.get("hashes", {}))
+    # ("toggle" is never skipped; we have to parse
+    # the file to find out which way it goes.)
+    if (behavior != "toggle") and (hashes.get(behavior) == digest):
+        if verbose:
+            print(f"{indent}skipping, {behavior!r} wouldn't change it (found in manifest)")
+        return behavior, 0, entry
+
+    behavior, modified_lines = forward_edit_file(file_path, behavior, ignore, engine=engine, output=output, stream=stream, verbose=verbose, indent=indent)
+    if modified_lines and (output == "write"):
+        digest = _hash_file(file_path)
+    if (behavior != "toggle") and ((not modified_lines) or (output == "write")):
+        hashes[behavior] = digest
+    entry = {"hashes": hashes, "modified_lines": modified_lines, "ignore": ignore, "engine": engine}
+    return behavior, modified_lines, entry
+
+def _forward_edit_tree_file_job(args):
+    """
+    _forward_edit_tree_file for a worker process.
+    args is a tuple (file_path, behavior, ignore, entry, engine, output).
+    returns a tuple (modified_lines, entry, report).
+    report is the text forward_edit_file wrote to its stream
+    (always empty if output is "write").
+    """
+    file_path, behavior, ignore, entry, engine, output = args
+    stream = io.StringIO()
+    try:
+        _, modified_lines, entry = _forward_edit_tree_file(file_path, behavior, ignore, entry, engine=engine, output=output, stream=stream)
+    except (UnicodeDecodeError, SyntaxError):
+        # just ignore files we couldn't understand
+        return 0, None, ""
+    return modified_lines, entry, stream.getvalue()
 
 
 @export
-def forward_edit_tree(path, behavior, ignore_files, ignore_directories, ignore_file_map, *, verbose=False, install_forward_module=True):
+def tree_files(path, ignore_files=(), ignore_directories=(), *, verbose=False):
+    """
+    returns a list of tuples (relative_path, file_path), one for
+    every "*.py" file found under path, in os.walk order (so the
+    result is deterministic).  relative_path is relative to path.
+
+    ignore_files and ignore_directories are the same as the
+    arguments to forward_edit_tree.
+    """
+    # huge speedup time! holy moly!
+    if not isinstance(ignore_directories, set):
+        ignore_directories = set(ignore_directories)
+    if not isinstance(ignore_files, set):
+        ignore_files = set(ignore_files)
+
+    files = []
+
+    for (dirpath, dirnames, filenames) in os.walk(path):
+
+        if verbose:
+            print()
+            print(f"  {dirpath=}")
+
+        assert dirpath.startswith(path)
+        relative_dir = os.path.relpath(dirpath, path)
+        if relative_dir in ignore_directories:
+            if verbose:
+                print(f"      ignoring (was found in ignore_directories)")
+            dirnames.clear()
+            continue
+
+        if verbose:
+            print(f"  {dirnames=}")
+            print(f"  {filenames=}")
+
+        for filename in filenames:
+            if not (filename and filename.endswith(".py")):
+                continue
+            relative_path = os.path.normpath(os.path.join(relative_dir, filename))
+            if relative_path in ignore_files:
+                if verbose:
+                    print()
+                    print(f"  {relative_path=}")
+                    print(f"    ignoring (was found in ignore_files)")
+                continue
+
+            file_path = os.path.join(dirpath, filename)
+            files.append((relative_path, file_path))
+
+    return files
+
+
+@export
+def forward_edit_tree(path, behavior, ignore_files, ignore_directories, ignore_file_map, *, verbose=False, install_forward_module=True, jobs=None, manifest=False, engine="lines", output="write", stream=None, only_cycles=False):
     """
     Applies forward_edit_file to all the "*.py" files found under path.
 
@@ -329,6 +984,41 @@ def forward_edit_tree(path, behavior, ignore_files, ignore_directories, ignore_f
     doesn't simply pass in "toggle" for every file; it passes in the behavior
     returned by forward_edit_file() for the file.)
 
+    if jobs is an integer greater than 1, forward_edit_tree edits files
+    in a pool of that many worker processes.  files are still processed
+    one at a time until "toggle" behavior has been decided, and the
+    results are identical to a serial run.  (verbose output from the
+    workers is suppressed.)
+
+    engine is the same as the argument to forward_edit_file().
+    (files the engine can't parse are skipped.)
+
+    output and stream are the same as the arguments to forward_edit_file().
+    if output isn't "write", forward_edit_tree doesn't touch the disk
+    at all: it doesn't install the "forward" module, and it doesn't
+    update the manifest.  reports are written to stream file by file,
+    in the same order as a serial run, as soon as they're produced.
+
+    if only_cycles is true, forward_edit_tree only adds @forward() to
+    the classes that are part of reference cycles, as found by
+    editor.cycles.  (it analyzes every file first, then adds the line
+    numbers of every other class statement to the file's "ignore" list.)
+    that's usually a small fraction of the classes, so the edited tree
+    creates far fewer forward classes.  only_cycles always uses the
+    "ast" engine: the line numbers come from the ast, and the "lines"
+    engine would also edit class statements the ast doesn't see
+    (e.g. in docstrings).
+
+    if manifest is true, forward_edit_tree maintains a manifest file
+    (".forward-manifest.json") in the root of path.  it records, for
+    every file edited, the hashes of the file's contents in which
+    "add" and "remove" last changed nothing, and its modified line
+    count.  on later runs, forward_edit_tree skips files that are
+    already in the requested state, without reading them in as text
+    or parsing them.  so re-running after editing a handful of files
+    only has to process those files, and files with nothing to edit
+    are skipped whichever way the tree is edited.
+
     returns a tuple:
         (final_behavior, modified_files, modified_lines)
     final_behavior and modified_lines are the same as returned from
@@ -338,18 +1028,21 @@ def forward_edit_tree(path, behavior, ignore_files, ignore_directories, ignore_f
     """
 
     if verbose:
-        print(f"forward_edit_tree\n  {path=}\n  {behavior=}\n  {ignore_files=}\n  {ignore_directories=}\n  {ignore_file_map=}\n  {verbose=}\n  {install_forward_module=}")
+        print(f"forward_edit_tree\n  {path=}\n  {behavior=}\n  {ignore_files=}\n  {ignore_directories=}\n  {ignore_file_map=}\n  {verbose=}\n  {install_forward_module=}\n  {jobs=}\n  {manifest=}\n  {engine=}\n  {output=}\n  {only_cycles=}")
+
+    if (jobs is not None) and ((not isinstance(jobs, int)) or (jobs < 1)):
+        raise RuntimeError(f"invalid jobs value {jobs!r}")
+
+    if output not in outputs:
+        outputs_str = ', '.join(repr(x) for x in outputs)
+        raise RuntimeError(f"output {output!r} not in {outputs_str}")
+    if stream is None:
+        stream = sys.stdout
 
     modified_files = 0
     modified_lines = 0
 
-    # huge speedup time! holy moly!
-    if not isinstance(ignore_directories, set):
-        ignore_directories = set(ignore_directories)
-    if not isinstance(ignore_files, set):
-        ignore_files = set(ignore_files)
-
-    if install_forward_module:
+    if install_forward_module and (output == "write"):
         editor_module = sys.modules['editor']
         editor_module_path = editor_module.__file__.replace("\\", "/")
         assert editor_module_path.endswith("/forward/tools/editor/__init__.py")
@@ -364,47 +1057,73 @@ def forward_edit_tree(path, behavior, ignore_files, ignore_directories, ignore_f
             shutil.copy2(forward_module_path, output_module_path)
             modified_files += 1
 
-    for (dirpath, dirnames, filenames) in os.walk(path):
+    # first pass: walk the tree and build the list of files to edit.
+    work = [(relative_path, file_path, ignore_file_map.get(relative_path, ())) for relative_path, file_path in tree_files(path, ignore_files, ignore_directories, verbose=verbose)]
 
+    if only_cycles:
+        engine = "ast"
+        infos = cycles.analyze_files([(relative_path, file_path) for relative_path, file_path, _ in work], jobs=jobs)
+        found = cycles.find_cycles(cycles.class_graph(infos))
+        cycle_ignores = cycles.ignore_lines(infos, found)
         if verbose:
             print()
-            print(f"  {dirpath=}")
+            print(f"  found {len(found)} cycles, with {sum(len(cycle) for cycle in found)} classes")
+        work = [(relative_path, file_path, list(ignore) + cycle_ignores.get(relative_path, [])) for relative_path, file_path, ignore in work]
 
-        assert dirpath.startswith(path)
-        relative_dir = os.path.relpath(dirpath, path)
-        if relative_dir in ignore_directories:
-            if verbose:
-                print(f"      ignoring (was found in ignore_directories)")
-            dirnames.clear()
-            continue
-
-        if verbose:
-            print(f"  {dirnames=}")
-            print(f"  {filenames=}")
+    if manifest:
+        old_entries = _load_manifest(path)
+        new_entries = {}
+    else:
+        old_entries = new_entries = None
 
-        for filename in filenames:
-            if not (filename and filename.endswith(".py")):
-                continue
-            relative_path = os.path.normpath(os.path.join(relative_dir, filename))
-            if verbose:
-                print()
-                print(f"  {relative_path=}")
-            if relative_path in ignore_files:
-                if verbose:
-                    print(f"    ignoring (was found in ignore_files)")
-                continue
+    def entry_for(relative_path):
+        if old_entries is None:
+            return None
+        return old_entries.get(relative_path, {})
 
-            ignore = ignore_file_map.get(relative_path, ())
+    def record(relative_path, file_modified_lines, entry):
+        nonlocal modified_files
+        nonlocal modified_lines
+        if file_modified_lines:
+            modified_files += 1
+            modified_lines += file_modified_lines
+        if entry is not None:
+            new_entries[relative_path] = entry
+
+    # second pass: edit the files.
+    # we have to process files serially until "toggle" is resolved.
+    i = 0
+    while i < len(work):
+        if (behavior != "toggle") and jobs and (jobs > 1):
+            break
+        relative_path, file_path, ignore = work[i]
+        i += 1
+        if verbose:
+            print()
+            print(f"  {relative_path=}")
+        try:
+            behavior, file_modified_lines, entry = _forward_edit_tree_file(file_path, behavior, ignore, entry_for(relative_path), engine=engine, output=output, stream=stream, verbose=verbose, indent="    ")
+        except (UnicodeDecodeError, SyntaxError):
+            # just ignore files we couldn't understand
+            continue
+        record(relative_path, file_modified_lines, entry)
 
-            file_path = os.path.join(dirpath, filename)
-            try:
-                behavior, file_modified_lines = forward_edit_file(file_path, behavior, ignore, verbose=verbose, indent="    ")
-            except UnicodeDecodeError:
-                # just ignore files we couldn't understand
-                continue
-            if file_modified_lines:
-                modified_files += 1
-                modified_lines += file_modified_lines
+    if i < len(work):
+        if verbose:
+            print()
+            print(f"  editing {len(work) - i} remaining files with {jobs} worker processes")
+        remaining = work[i:]
+        args = [(file_path, behavior, ignore, entry_for(relative_path), engine, output) for relative_path, file_path, ignore in remaining]
+        chunksize = max(1, len(args) // (jobs * 8))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = executor.map(_forward_edit_tree_file_job, args, chunksize=chunksize)
+            for (relative_path, _, _), (file_modified_lines, entry, report) in zip(remaining, results):
+                record(relative_path, file_modified_lines, entry)
+                if report:
+                    stream.write(report)
+
+    if manifest and (output == "write"):
+        _save_manifest(path, new_entries)
 
     if verbose:
         print(f"  returning {behavior=}, {modified_files=}, {modified_lines=}")
@@ -0,0 +1,474 @@
+"""
+Finds the classes in a tree of Python files that are
+part of reference cycles, so forward_edit_tree() can
+forward-declare only those classes.
+
+Class A "refers to" class B if B is named while A's
+class statement runs: in A's bases, keywords (like
+"metaclass="), or decorators; in annotations in A's
+body, including the annotations of its methods (and
+annotations written as strings); or in any other code
+in A's body (class attributes, default values for
+method arguments, decorators on methods).  Code inside
+methods runs later, so it doesn't count.  Neither does a
+class naming itself in a string annotation (like
+'def copy(self) -> "A"'); that's the usual way to write
+it, and it doesn't need a forward declaration.
+
+References are resolved across modules, using the
+imports at the top level of each module.  The classes
+that need forward declarations are the ones in cycles
+in this graph: the strongly connected components with
+more than one class, and classes that refer to
+themselves.
+
+It's a static analysis, so it's approximate.  It only
+knows about classes defined at the top level of a
+module (and the classes nested inside those), and it
+doesn't follow names assigned at runtime (like
+"Alias = SomeClass").
+"""
+
+import ast
+import concurrent.futures
+import os.path
+
+__all__ = []
+
+def export(fn):
+    __all__.append(fn.__name__)
+    return fn
+
+
+# how far _resolve will chase a name through
+# "from x import y" re-exports before giving up.
+max_resolve_depth = 16
+
+
+@export
+def module_name(relative_path):
+    """
+    returns the name of the module defined by the file at
+    relative_path (relative to the root of the tree),
+    and whether or not it's a package.
+    """
+    parts = os.path.normpath(relative_path)[:-len(".py")].replace("\\", "/").split("/")
+    is_package = parts[-1] == "__init__"
+    if is_package:
+        parts.pop()
+    return ".".join(parts), is_package
+
+
+def _dotted_name(node):
+    """
+    returns the tuple of names in the dotted name node
+    (for "a.b.c", ("a", "b", "c")), or None if node
+    isn't a dotted name.
+    """
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not (isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)):
+        return None
+    parts.append(node.id)
+    parts.reverse()
+    return tuple(parts)
+
+def _expression_references(node, kind, found):
+    """
+    appends a tuple (parts, kind, lineno) to found for every
+    dotted name in the expression node.  if kind is "annotation",
+    strings are parsed as expressions and searched too, and the
+    names in them are found with kind "string annotation".
+    (the bodies of lambdas are skipped; they run later.)
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.Name, ast.Attribute)):
+            parts = _dotted_name(node)
+            if parts is not None:
+                found.append((parts, kind, node.lineno))
+                continue
+        elif isinstance(node, ast.Lambda):
+            stack.extend(node.args.defaults)
+            stack.extend(d for d in node.args.kw_defaults if d is not None)
+            continue
+        elif (kind in ("annotation", "string annotation")) and isinstance(node, ast.Constant) and isinstance(node.value, str):
+            try:
+                expression = ast.parse(node.value.strip(), mode="eval").body
+            except SyntaxError:
+                continue
+            for child in ast.walk(expression):
+                if hasattr(child, "lineno"):
+                    child.lineno = node.lineno
+            _expression_references(expression, "string annotation", found)
+            continue
+        stack.extend(ast.iter_child_nodes(node))
+
+def _function_references(node, found):
+    for decorator in node.decorator_list:
+        _expression_references(decorator, "class body", found)
+    args = node.args
+    for arg in args.posonlyargs + args.args + args.kwonlyargs + [args.vararg, args.kwarg]:
+        if (arg is not None) and (arg.annotation is not None):
+            _expression_references(arg.annotation, "annotation", found)
+    if node.returns is not None:
+        _expression_references(node.returns, "annotation", found)
+    for default in args.defaults + args.kw_defaults:
+        if default is not None:
+            _expression_references(default, "class body", found)
+
+def _class_body_references(body, found):
+    """
+    appends the references made by the list of statements
+    body (the body of a class statement, or part of it)
+    to found.  nested class statements are skipped; they
+    get their own entries.
+    """
+    for statement in body:
+        if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            _function_references(statement, found)
+            continue
+        if isinstance(statement, ast.ClassDef):
+            continue
+        if isinstance(statement, ast.AnnAssign):
+            _expression_references(statement.annotation, "annotation", found)
+            if statement.value is not None:
+                _expression_references(statement.value, "class body", found)
+            continue
+        for field, value in ast.iter_fields(statement):
+            if field in ("body", "orelse", "finalbody"):
+                _class_body_references(value, found)
+            elif field == "handlers":
+                for handler in value:
+                    if handler.type is not None:
+                        _expression_references(handler.type, "class body", found)
+                    _class_body_references(handler.body, found)
+            elif field == "cases":
+                for case in value:
+                    _expression_references(case.pattern, "class body", found)
+                    if case.guard is not None:
+                        _expression_references(case.guard, "class body", found)
+                    _class_body_references(case.body, found)
+            elif isinstance(value, ast.AST):
+                _expression_references(value, "class body", found)
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        _expression_references(item, "class body", found)
+
+def _nested_statements(body):
+    """
+    yields the statements in the list of statements body,
+    including the ones nested inside compound statements
+    (if, try, with, for, ...), but not the ones inside
+    function or class definitions.
+    """
+    for statement in body:
+        yield statement
+        if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        for field in ("body", "orelse", "finalbody"):
+            yield from _nested_statements(getattr(statement, field, ()))
+        for handler in getattr(statement, "handlers", ()):
+            yield from _nested_statements(handler.body)
+        for case in getattr(statement, "cases", ()):
+            yield from _nested_statements(case.body)
+
+
+@export
+def analyze_text(text, path, relative_path):
+    """
+    analyzes the Python source code in text, from the
+    file relative_path (relative to the root of the tree).
+    (path is only used in error messages.)
+
+    returns a dict:
+        "path": relative_path
+        "module": the module's name
+        "classes": maps the qualnames of the classes the
+            analysis knows about to the line numbers of
+            their class statements
+        "class_lines": the line numbers of every class
+            statement in the file, sorted
+        "bindings": maps the names bound by imports at the
+            top level of the module to either ("module", name)
+            or ("from", module, name)
+        "stars": the modules imported with "import *"
+        "references": a list of tuples
+            (qualname, scope, parts, kind, lineno),
+            one per dotted name referred to by a class.
+            scope is the qualname of the class whose namespace
+            the name is looked up in first (None for the module).
+
+    raises SyntaxError if text isn't valid Python.
+    """
+    tree = compile(text, path, 'exec', ast.PyCF_ALLOW_TOP_LEVEL_AWAIT | ast.PyCF_ONLY_AST, dont_inherit=True)
+    module, is_package = module_name(relative_path)
+    package = module if is_package else module.rpartition(".")[0]
+
+    classes = {}
+    bindings = {}
+    stars = []
+    references = []
+
+    def visit_class(node, scope):
+        qualname = f"{scope}.{node.name}" if scope else node.name
+        classes[qualname] = node.lineno
+        found = []
+        for base in node.bases:
+            _expression_references(base, "base", found)
+        for keyword in node.keywords:
+            _expression_references(keyword.value, "keyword", found)
+        for decorator in node.decorator_list:
+            _expression_references(decorator, "decorator", found)
+        for parts, kind, lineno in found:
+            references.append((qualname, scope, parts, kind, lineno))
+        found = []
+        _class_body_references(node.body, found)
+        for parts, kind, lineno in found:
+            references.append((qualname, qualname, parts, kind, lineno))
+        for statement in _nested_statements(node.body):
+            if isinstance(statement, ast.ClassDef):
+                visit_class(statement, qualname)
+
+    for statement in _nested_statements(tree.body):
+        if isinstance(statement, ast.ClassDef):
+            visit_class(statement, None)
+        elif isinstance(statement, ast.Import):
+            for alias in statement.names:
+                if alias.asname:
+                    bindings[alias.asname] = ("module", alias.name)
+                else:
+                    name = alias.name.partition(".")[0]
+                    bindings[name] = ("module", name)
+        elif isinstance(statement, ast.ImportFrom):
+            if statement.level:
+                base = package.split(".") if package else []
+                if statement.level > 1:
+                    base = base[:-(statement.level - 1)]
+                from_module = ".".join(base + ([statement.module] if statement.module else []))
+            else:
+                from_module = statement.module
+            for alias in statement.names:
+                if alias.name == "*":
+                    stars.append(from_module)
+                else:
+                    bindings[alias.asname or alias.name] = ("from", from_module, alias.name)
+
+    return {
+        "path": relative_path,
+        "module": module,
+        "classes": classes,
+        "class_lines": sorted(node.lineno for node in ast.walk(tree) if isinstance(node, ast.ClassDef)),
+        "bindings": bindings,
+        "stars": stars,
+        "references": references,
+        }
+
+def _analyze_file_job(args):
+    relative_path, file_path = args
+    try:
+        with open(file_path, "rt", encoding="utf-8") as f:
+            text = f.read()
+        return analyze_text(text, file_path, relative_path)
+    except (UnicodeDecodeError, SyntaxError, ValueError):
+        # just ignore files we couldn't understand
+        return None
+
+@export
+def analyze_files(files, *, jobs=None):
+    """
+    analyzes files, an iterable of tuples
+    (relative_path, file_path), with analyze_text().
+    (files that aren't UTF-8, or aren't valid Python,
+    are skipped.)
+
+    if jobs is an integer greater than 1, analyzes the files
+    in a pool of that many worker processes.
+
+    returns a dict mapping module names to the results.
+    """
+    files = list(files)
+    if jobs and (jobs > 1):
+        chunksize = max(1, len(files) // (jobs * 8))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(_analyze_file_job, files, chunksize=chunksize))
+    else:
+        results = [_analyze_file_job(args) for args in files]
+    return {info["module"]: info for info in results if info is not None}
+
+
+def _class_prefix(classes, qualname, parts):
+    """
+    qualname is a class in classes.  returns the qualname
+    of the innermost class named by the dotted name
+    qualname.parts[0].parts[1]..., which is qualname itself
+    if parts[0] isn't a class nested in it.  ("A.attribute"
+    still refers to A.)
+    """
+    for part in parts:
+        nested = f"{qualname}.{part}"
+        if nested not in classes:
+            break
+        qualname = nested
+    return qualname
+
+def _resolve_in_module(infos, module, parts, depth):
+    """
+    resolves parts, a dotted name relative to module
+    (its submodules, then the names defined in it).
+    """
+    while parts and (f"{module}.{parts[0]}" in infos) and (parts[0] not in infos[module]["classes"]):
+        module = f"{module}.{parts[0]}"
+        parts = parts[1:]
+    if not parts:
+        # a reference to the module itself.
+        return None
+    return _resolve(infos, module, None, parts, depth)
+
+def _resolve(infos, module, scope, parts, depth=0):
+    """
+    resolves parts, a dotted name looked up in the class scope
+    (or None for the module), in module.  returns the class
+    it names as a tuple (module, qualname), or None.
+    """
+    if depth > max_resolve_depth:
+        return None
+    info = infos.get(module)
+    if info is None:
+        return None
+    classes = info["classes"]
+    name = parts[0]
+    if scope and (f"{scope}.{name}" in classes):
+        return (module, _class_prefix(classes, f"{scope}.{name}", parts[1:]))
+    if name in classes:
+        return (module, _class_prefix(classes, name, parts[1:]))
+
+    binding = info["bindings"].get(name)
+    if binding is None:
+        for star in info["stars"]:
+            node = _resolve(infos, star, None, parts, depth + 1)
+            if node is not None:
+                return node
+        return None
+    if binding[0] == "module":
+        return _resolve_in_module(infos, binding[1], parts[1:], depth + 1)
+    _, from_module, from_name = binding
+    if f"{from_module}.{from_name}" in infos:
+        return _resolve_in_module(infos, f"{from_module}.{from_name}", parts[1:], depth + 1)
+    return _resolve(infos, from_module, None, (from_name,) + parts[1:], depth + 1)
+
+@export
+def class_graph(infos):
+    """
+    builds the graph of references between classes.
+    infos is a dict returned by analyze_files().
+
+    returns a dict mapping every class, as a tuple
+    (module, qualname), to a dict mapping the classes it
+    refers to, to a list of the references, as tuples
+    (kind, lineno).  (a class naming itself in a string
+    annotation isn't a reference; see above.)
+    """
+    graph = {}
+    for module, info in infos.items():
+        for qualname in info["classes"]:
+            graph[(module, qualname)] = {}
+        for qualname, scope, parts, kind, lineno in info["references"]:
+            target = _resolve(infos, module, scope, parts)
+            if target is None:
+                continue
+            if (kind == "string annotation") and (target == (module, qualname)):
+                continue
+            graph[(module, qualname)].setdefault(target, []).append((kind, lineno))
+    return graph
+
+
+@export
+def strongly_connected_components(graph):
+    """
+    returns the strongly connected components of graph, a
+    dict mapping every node to an iterable of the nodes it
+    refers to, as a list of lists of nodes.
+
+    (Tarjan's algorithm, without recursion, as the graph
+    for a large tree can be deeper than the recursion limit.)
+    """
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    for root in graph:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph[root]))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(graph.get(child, ()))))
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+@export
+def find_cycles(graph):
+    """
+    returns the cycles in graph (a dict returned by
+    class_graph()): its strongly connected components
+    with more than one class, and the classes that refer
+    to themselves.  each cycle is a sorted list of classes;
+    the list of cycles is sorted too.
+    """
+    cycles = []
+    for component in strongly_connected_components(graph):
+        if (len(component) > 1) or (component[0] in graph[component[0]]):
+            cycles.append(sorted(component))
+    cycles.sort()
+    return cycles
+
+@export
+def ignore_lines(infos, cycles):
+    """
+    returns a dict mapping the relative path of every file
+    in infos to a sorted list of the line numbers of the
+    class statements in it that aren't in any of cycles.
+    (so passing these as "ignore" lists to forward_edit_file
+    forward-declares only the classes in cycles.)
+    """
+    forward = {}
+    for cycle in cycles:
+        for module, qualname in cycle:
+            info = infos[module]
+            forward.setdefault(info["path"], set()).add(info["classes"][qualname])
+    ignore = {}
+    for info in infos.values():
+        lines = forward.get(info["path"], ())
+        ignore[info["path"]] = [line for line in info["class_lines"] if line not in lines]
+    return ignore
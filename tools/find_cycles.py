@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+"""
+usage:
+    find_cycles.py [-f <file>] [-d <directory>] [-j <jobs>] [-v] path...
+
+Finds the classes that refer to each other in cycles in an
+entire tree of Python files.  These are the only classes that
+need forward declarations; "edit_tree.py -o" and
+"edit_stdlib.py -o" forward-declare only these classes.
+
+Class A refers to class B if B is named in A's bases, keywords,
+or decorators, in annotations in A's body (including the
+annotations of its methods), or in any other code run by A's
+class statement.  (Code inside methods doesn't count, and
+neither does a class naming itself in a string annotation.)  Names
+are resolved across the modules in the tree, by following
+imports.  See tools/editor/cycles.py for the details.
+
+Prints every cycle, with the file and line of every class
+in it, and the references between them.
+
+-f tells find_cycles.py to ignore a particular file in the tree.
+
+-d tells find_cycles.py to ignore an entire subtree of directories
+in the tree.
+
+-j <jobs> parses files in parallel, using a pool of <jobs> worker
+processes.
+
+-v also prints every reference between classes in the tree.
+"""
+
+import sys
+
+import editor
+
+
+def usage(s):
+    sys.exit(f"error: {s}\n\n{__doc__.strip()}")
+
+
+def print_cycles(path, ignore_files, ignore_directories, jobs, verbose):
+    files = editor.tree_files(path, ignore_files, ignore_directories)
+    infos = editor.cycles.analyze_files(files, jobs=jobs)
+    graph = editor.cycles.class_graph(infos)
+    cycles = editor.cycles.find_cycles(graph)
+
+    if verbose:
+        for (module, qualname), targets in sorted(graph.items()):
+            for (target_module, target_qualname), references in sorted(targets.items()):
+                kinds = ", ".join(f"{kind} line {lineno}" for kind, lineno in references)
+                print(f"{module}.{qualname} -> {target_module}.{target_qualname}  ({kinds})")
+        print()
+
+    for i, cycle in enumerate(cycles, 1):
+        print(f"cycle {i}:")
+        members = set(cycle)
+        for node in cycle:
+            module, qualname = node
+            info = infos[module]
+            print(f"    {module}.{qualname}  ({info['path']}, line {info['classes'][qualname]})")
+            for target, references in sorted(graph[node].items()):
+                if target not in members:
+                    continue
+                kind, lineno = references[0]
+                print(f"        -> {target[0]}.{target[1]}  ({kind}, line {lineno})")
+    if cycles:
+        print()
+
+    classes = sum(len(cycle) for cycle in cycles)
+    percent = f" ({classes / len(graph) * 100:.1f}%)" if graph else ""
+    print(f"{path}\n    {len(infos)} files, {len(graph)} classes, {len(cycles)} cycles with {classes} classes{percent}.")
+
+
+def main():
+    paths = []
+    ignore_files = []
+    ignore_directories = []
+    jobs = None
+    verbose = False
+
+    process_directory = False
+    process_file = False
+    process_jobs = False
+
+    for arg in sys.argv[1:]:
+
+        if process_jobs:
+            if not arg.isdigit():
+                usage(f"invalid argument to -j: {arg!r}")
+            jobs = int(arg)
+            process_jobs = False
+            continue
+
+        if process_directory:
+            ignore_directories.append(arg)
+            process_directory = False
+            continue
+
+        if process_file:
+            ignore_files.append(arg)
+            process_file = False
+            continue
+
+        if arg == "-v":
+            verbose = not verbose
+            continue
+        if arg == "-d":
+            process_directory = True
+            continue
+        if arg == "-f":
+            process_file = True
+            continue
+        if arg == "-j":
+            process_jobs = True
+            continue
+        if arg.startswith("-"):
+            usage("unknown option " + arg)
+        paths.append(arg)
+
+    if process_jobs or process_directory or process_file:
+        usage("missing argument")
+
+    if not paths:
+        usage("no paths specified.")
+
+    for path in paths:
+        print_cycles(path, ignore_files, ignore_directories, jobs, verbose)
+
+
+if __name__ == "__main__":
+    main()
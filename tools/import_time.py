@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+
+"""
+usage:
+    import_time.py [-n <runs>] [-m <module>] [-M <file>] [-v] <pristine> <edited>
+
+Compares the time it takes to import standard library modules
+with a pristine CPython tree, and with a tree edited by
+edit_stdlib.py to use @forward() everywhere.
+
+<pristine> and <edited> are either Python interpreters, or the
+roots of built CPython checkouts.  (The interpreter for a checkout
+is "python" or "python.exe" in the root, or under "PCbuild".)
+
+Every module is imported in a fresh interpreter, using
+"-X importtime", once per run, alternating between the two trees.
+The measurement for a module is the cumulative time reported for
+importing it (including everything it imports that wasn't already
+imported at startup).  Before measuring, every module is imported
+once in each tree, so the bytecode caches are warm.
+
+Reports the median time over all runs for each module, for both
+trees, and the difference; and the totals over all modules.
+
+-n <runs> sets the number of runs (default 10).
+
+-m adds a module to the list of modules to import.
+-M <file> adds every module listed in <file>, one per line.
+('#' starts a comment.)  If you don't specify any modules,
+import_time.py uses a default list of popular modules.
+
+-v prints every measurement.
+"""
+
+import statistics
+import sys
+
+import cpython
+
+
+default_modules = """
+    argparse
+    asyncio
+    collections
+    concurrent.futures
+    csv
+    dataclasses
+    datetime
+    decimal
+    email.message
+    enum
+    fractions
+    http.client
+    ipaddress
+    json
+    logging
+    pathlib
+    pickle
+    random
+    shutil
+    socket
+    subprocess
+    tarfile
+    threading
+    typing
+    unittest
+    urllib.request
+    uuid
+    xml.etree.ElementTree
+    zipfile
+""".split()
+
+
+def usage(s):
+    sys.exit(f"error: {s}\n\n{__doc__.strip()}")
+
+
+def read_module_list(path):
+    modules = []
+    with open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line, _, comment = line.partition("#")
+            line = line.strip()
+            if line:
+                modules.append(line)
+    return modules
+
+
+def parse_importtime(stderr):
+    """
+    parses the output of "-X importtime".
+    returns a dict mapping the names of modules imported at
+    the top level (not imported by another module) to their
+    cumulative import time in microseconds.
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        cumulative = fields[1].strip()
+        if not cumulative.isdigit():
+            # the header line
+            continue
+        # fields[2] is " " followed by two spaces per level of nesting.
+        name = fields[2][1:]
+        if name != name.lstrip():
+            continue
+        times[name] = int(cumulative)
+    return times
+
+def import_time(python, module):
+    """
+    imports module in a fresh interpreter.
+    returns the cumulative import time in microseconds.
+    (returns 0 if the module was already imported at startup.)
+    """
+    result = cpython.run_python(python, ["-X", "importtime", "-c", f"import {module}"])
+    if result.returncode:
+        raise RuntimeError(f"{python} couldn't import {module}:\n{result.stderr}")
+    return parse_importtime(result.stderr).get(module, 0)
+
+
+def main():
+    runs = 10
+    modules = []
+    verbose = False
+    paths = []
+
+    process_runs = False
+    process_module = False
+    process_module_file = False
+
+    for arg in sys.argv[1:]:
+        if process_runs:
+            if not arg.isdigit():
+                usage(f"invalid argument to -n: {arg!r}")
+            runs = int(arg)
+            process_runs = False
+            continue
+        if process_module:
+            modules.append(arg)
+            process_module = False
+            continue
+        if process_module_file:
+            modules.extend(read_module_list(arg))
+            process_module_file = False
+            continue
+        if arg == "-n":
+            process_runs = True
+            continue
+        if arg == "-m":
+            process_module = True
+            continue
+        if arg == "-M":
+            process_module_file = True
+            continue
+        if arg == "-v":
+            verbose = not verbose
+            continue
+        if arg.startswith("-"):
+            usage("unknown option " + arg)
+        paths.append(arg)
+
+    if process_runs or process_module or process_module_file:
+        usage("missing argument")
+    if len(paths) != 2:
+        usage("you must specify exactly two trees, <pristine> and <edited>.")
+    if not modules:
+        modules = default_modules
+
+    try:
+        trees = {
+            "pristine": cpython.find_interpreter(paths[0]),
+            "edited": cpython.find_interpreter(paths[1]),
+        }
+
+        # warm up the bytecode caches.
+        for python in trees.values():
+            for module in modules:
+                import_time(python, module)
+
+        times = {(name, module): [] for name in trees for module in modules}
+        order = list(trees)
+        for run in range(runs):
+            for module in modules:
+                for name in order:
+                    us = import_time(trees[name], module)
+                    times[(name, module)].append(us)
+                    if verbose:
+                        print(f"run {run + 1:3}  {name:8}  {module:30} {us:9} us")
+            order.reverse()
+    except RuntimeError as e:
+        usage(str(e))
+
+    if verbose:
+        print()
+    print(f"pristine: {trees['pristine']}\n  edited: {trees['edited']}\n    runs: {runs}\n")
+    print(f"{'module':30} {'pristine ms':>11} {'edited ms':>11} {'delta ms':>9} {'delta':>7}")
+    totals = {"pristine": 0, "edited": 0}
+    for module in modules:
+        pristine = statistics.median(times[("pristine", module)])
+        edited = statistics.median(times[("edited", module)])
+        totals["pristine"] += pristine
+        totals["edited"] += edited
+        percent = f"{(edited - pristine) / pristine * 100:+6.1f}%" if pristine else "    n/a"
+        print(f"{module:30} {pristine / 1000:11.2f} {edited / 1000:11.2f} {(edited - pristine) / 1000:+9.2f} {percent}")
+    pristine = totals["pristine"]
+    edited = totals["edited"]
+    percent = f"{(edited - pristine) / pristine * 100:+6.1f}%" if pristine else "    n/a"
+    print(f"{'total':30} {pristine / 1000:11.2f} {edited / 1000:11.2f} {(edited - pristine) / 1000:+9.2f} {percent}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+
+"""
+usage:
+    memory_footprint.py [-m <module>] [-M <file>] [-f <frames>] [-k <count>] [-v] <pristine> <edited>
+
+Compares the memory used by importing standard library modules
+with a pristine CPython tree, and with a tree edited by
+edit_stdlib.py to use @forward() everywhere.
+
+<pristine> and <edited> are either Python interpreters, or the
+roots of built CPython checkouts.  (The interpreter for a checkout
+is "python" or "python.exe" in the root, or under "PCbuild".)
+
+In each tree, a fresh interpreter, traced by tracemalloc from
+startup ("-X tracemalloc"), imports every module in the list.
+Then it reports:
+
+  * the memory allocated at startup, the peak, and the memory
+    still allocated after the imports (the "retained" memory,
+    which every process importing these modules pays for);
+  * how much of that was cyclic garbage, freed by gc.collect()
+    (continuation classes are freed this way; until the collector
+    runs, they and everything they refer to stay allocated);
+  * the retained memory grouped by module, for both trees.
+    Memory allocated by the forward module is charged to the
+    module that called it, and also reported separately;
+  * the allocation sites (file and line) retaining the most
+    memory in each tree; and
+  * any continuation classes (classes named "_____", the name
+    the tools give them) still alive after gc.collect(), and
+    what refers to them.  There shouldn't be any.
+
+-m adds a module to the list of modules to import.
+-M <file> adds every module listed in <file>, one per line.
+('#' starts a comment.)  If you don't specify any modules,
+memory_footprint.py uses the same default list as import_time.py.
+
+-f <frames> sets the number of frames tracemalloc records per
+allocation (default 16).  More frames attribute more memory to
+the right module, but use more memory and time.
+
+-k <count> sets the number of allocation sites and modules to
+print (default 20).
+
+-v prints every module, and every allocation site in the
+forward module.
+"""
+
+import json
+import sys
+
+import cpython
+import import_time
+
+
+# runs in the tree being measured, with "-X tracemalloc".
+# sys.argv[1:] is the list of modules to import.  prints the
+# result as JSON.  (it only uses built-in modules, and modules
+# imported at startup, until it has the traces; tracemalloc.py
+# itself may not be importable in an edited tree.)
+measure_script = r"""
+import _tracemalloc
+import gc
+import os
+import sys
+
+startup = current = _tracemalloc.get_traced_memory()[0]
+peak = 0
+imports = []
+for module in sys.argv[1:]:
+    _tracemalloc.reset_peak()
+    error = None
+    try:
+        __import__(module)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    before_collect, module_peak = _tracemalloc.get_traced_memory()
+    gc.collect()
+    retained = _tracemalloc.get_traced_memory()[0]
+    imports.append([module, retained - current, before_collect - retained, module_peak - current, error])
+    peak = max(peak, module_peak)
+    current = retained
+
+# tuples of (domain, size, frames, ...), where frames
+# is a tuple of (filename, lineno), most recent first.
+traces = _tracemalloc._get_traces()
+_tracemalloc.stop()
+
+stdlib = os.path.realpath(os.path.dirname(os.__file__))
+forward = sys.modules.get("forward")
+forward_file = os.path.realpath(forward.__file__) if forward is not None else None
+
+# maps filenames to the name of the standard library module
+# in the file, "forward", or "" for any other file.
+names = {}
+def module_name(filename):
+    name = names.get(filename)
+    if name is None:
+        path = os.path.realpath(filename)
+        if path == forward_file:
+            name = "forward"
+        elif path.startswith(stdlib + os.sep):
+            name = os.path.relpath(path, stdlib)[:-len(".py")].replace(os.sep, ".")
+            if name.endswith(".__init__"):
+                name = name[:-len(".__init__")]
+        else:
+            name = ""
+        names[filename] = name
+    return name
+
+# sites are keyed by module (or filename, for other files)
+# and line.  memory allocated by the forward module is also
+# charged to the innermost standard library module calling it.
+sites = {}
+by_forward = {}
+for trace in traces:
+    size = trace[1]
+    frames = trace[2]
+    filename, lineno = frames[0]
+    name = module_name(filename)
+    site = (name or filename, lineno)
+    site_size, count = sites.get(site, (0, 0))
+    sites[site] = (site_size + size, count + 1)
+    if name == "forward":
+        caller = "(unknown)"
+        for filename, lineno in frames[1:]:
+            name = module_name(filename)
+            if name and (name != "forward"):
+                caller = name
+                break
+        by_forward[caller] = by_forward.get(caller, 0) + size
+
+survivors = []
+for o in gc.get_objects():
+    if isinstance(o, type) and (o.__name__ == "_____"):
+        referrers = sorted({type(r).__name__ for r in gc.get_referrers(o) if r is not survivors})
+        survivors.append([o.__module__, o.__qualname__, referrers])
+
+import json
+print(json.dumps({
+    "startup": startup,
+    "peak": peak,
+    "retained": current,
+    "imports": imports,
+    "by_forward": by_forward,
+    "sites": [[site, lineno, size, count] for (site, lineno), (size, count) in sites.items()],
+    "survivors": survivors,
+}))
+"""
+
+
+def usage(s):
+    sys.exit(f"error: {s}\n\n{__doc__.strip()}")
+
+
+def measure(python, modules, frames):
+    result = cpython.run_python(python, ["-X", f"tracemalloc={frames}", "-c", measure_script] + modules)
+    if result.returncode:
+        raise RuntimeError(f"{python} couldn't measure the imports:\n{result.stderr}")
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def kib(size):
+    return f"{size / 1024:12.1f}"
+
+def print_row(label, pristine, edited):
+    percent = f"{(edited - pristine) / pristine * 100:+6.1f}%" if pristine else "    n/a"
+    print(f"{label:40} {kib(pristine)} {kib(edited)} {kib(edited - pristine)} {percent}")
+
+
+def main():
+    modules = []
+    frames = 16
+    count = 20
+    verbose = False
+    paths = []
+
+    process_module = False
+    process_module_file = False
+    process_frames = False
+    process_count = False
+
+    for arg in sys.argv[1:]:
+        if process_module:
+            modules.append(arg)
+            process_module = False
+            continue
+        if process_module_file:
+            modules.extend(import_time.read_module_list(arg))
+            process_module_file = False
+            continue
+        if process_frames:
+            if not (arg.isdigit() and int(arg)):
+                usage(f"invalid argument to -f: {arg!r}")
+            frames = int(arg)
+            process_frames = False
+            continue
+        if process_count:
+            if not arg.isdigit():
+                usage(f"invalid argument to -k: {arg!r}")
+            count = int(arg)
+            process_count = False
+            continue
+        if arg == "-m":
+            process_module = True
+            continue
+        if arg == "-M":
+            process_module_file = True
+            continue
+        if arg == "-f":
+            process_frames = True
+            continue
+        if arg == "-k":
+            process_count = True
+            continue
+        if arg == "-v":
+            verbose = not verbose
+            continue
+        if arg.startswith("-"):
+            usage("unknown option " + arg)
+        paths.append(arg)
+
+    if process_module or process_module_file or process_frames or process_count:
+        usage("missing argument")
+    if len(paths) != 2:
+        usage("you must specify exactly two trees, <pristine> and <edited>.")
+    if not modules:
+        modules = import_time.default_modules
+
+    try:
+        trees = {
+            "pristine": cpython.find_interpreter(paths[0]),
+            "edited": cpython.find_interpreter(paths[1]),
+        }
+        results = {name: measure(python, modules, frames) for name, python in trees.items()}
+    except RuntimeError as e:
+        usage(str(e))
+    pristine = results["pristine"]
+    edited = results["edited"]
+
+    print(f"pristine: {trees['pristine']}\n  edited: {trees['edited']}\n modules: {len(modules)}\n")
+    failed = False
+    for name, result in results.items():
+        for module, _, _, _, error in result["imports"]:
+            if error:
+                print(f"{name} tree couldn't import {module}: {error}")
+                failed = True
+    if failed:
+        print("(the comparison is only fair if both trees import the same modules.)\n")
+
+    pristine_garbage = sum(garbage for _, _, garbage, _, _ in pristine["imports"])
+    edited_garbage = sum(garbage for _, _, garbage, _, _ in edited["imports"])
+    print(f"{'':40} {'pristine KiB':>12} {'edited KiB':>12} {'delta KiB':>12} {'delta':>7}")
+    print_row("startup", pristine["startup"], edited["startup"])
+    print_row("peak", pristine["peak"], edited["peak"])
+    print_row("retained", pristine["retained"], edited["retained"])
+    print_row("cyclic garbage (freed by gc.collect())", pristine_garbage, edited_garbage)
+    print_row("retained, allocated by forward", 0, sum(edited["by_forward"].values()))
+    print()
+
+    # sorted by the difference, worst first.
+    rows = []
+    for p, e in zip(pristine["imports"], edited["imports"]):
+        rows.append((e[1] - p[1], p[0], p[1], e[1], e[2], e[3]))
+    rows.sort(key=lambda row: (-row[0], row[1]))
+    if not verbose:
+        rows = rows[:count]
+    print("the memory each module added (including the modules it imported first):")
+    print(f"{'module':40} {'pristine KiB':>12} {'edited KiB':>12} {'delta KiB':>12} {'garbage KiB':>12} {'peak KiB':>12}")
+    for delta, module, p, e, garbage, peak in rows:
+        print(f"{module:40} {kib(p)} {kib(e)} {kib(delta)} {kib(garbage)} {kib(peak)}")
+    print("(garbage and peak are for the edited tree.)")
+    print()
+
+    by_forward = sorted(edited["by_forward"].items(), key=lambda item: (-item[1], item[0]))
+    if not verbose:
+        by_forward = by_forward[:count]
+    print(f"{'retained, allocated by forward for':40} {'KiB':>12}")
+    for module, size in by_forward:
+        print(f"{module:40} {kib(size)}")
+    print()
+
+    for name, result in results.items():
+        sites = sorted(result["sites"], key=lambda site: -site[2])
+        if verbose and (name == "edited"):
+            sites = sites[:count] + [site for site in sites[count:] if site[0] == "forward"]
+        else:
+            sites = sites[:count]
+        print(f"{'retained, by allocation site (' + name + ')':40} {'KiB':>12} {'blocks':>12}")
+        for site, lineno, size, blocks in sites:
+            print(f"{site + ':' + str(lineno):40} {kib(size)} {blocks:12}")
+        print()
+
+    survivors = edited["survivors"]
+    print(f"continuation classes still alive after gc.collect(): {len(survivors)}")
+    for module, qualname, referrers in survivors[:count]:
+        print(f"    {module}.{qualname}, referred to by: {', '.join(referrers)}")
+    if survivors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
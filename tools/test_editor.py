@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+"""
+usage:
+    test_editor.py [-v] [path...]
+
+Checks that the editor round-trips Python source: adding
+@forward() declarations to a file and then removing them
+gives back the original text, with both engines.
+
+Checks the sample sources in this file, and every .py file
+named on the command line.  Prints every file that doesn't
+round-trip, with a diff, and exits with status 1 if any didn't.
+
+-v prints every file checked.
+"""
+
+import difflib
+import sys
+
+import editor
+
+
+# sources the editor has had trouble with.
+samples = {
+    "multi-line __slots__ with a blank line": '''
+class Opcode:
+    __slots__ = (
+        "name",
+
+        # the argument
+        "arg",
+    )
+
+    def __init__(self, name, arg):
+        self.name = name
+        self.arg = arg
+''',
+
+    "form feed between classes": '''
+class A:
+    pass
+\f
+class B:
+    __slots__ = ("b",)
+''',
+}
+
+
+def usage(s):
+    sys.exit(f"error: {s}\n\n{__doc__.strip()}")
+
+
+def round_trip(text, path, engine):
+    """
+    returns None if text round-trips with engine,
+    otherwise a diff of the original text and
+    the result of adding and then removing
+    the forward declarations.
+    """
+    behavior, modified_lines, added = editor.forward_edit_text(text, "add", path=path, engine=engine)
+    if not modified_lines:
+        return None
+    behavior, modified_lines, removed = editor.forward_edit_text(added, "remove", path=path, engine=engine)
+    if removed == text:
+        return None
+    return "".join(difflib.unified_diff(text.splitlines(True), removed.splitlines(True), path, f"{path} ({engine})"))
+
+
+def main():
+    verbose = False
+    paths = []
+    for arg in sys.argv[1:]:
+        if arg == "-v":
+            verbose = True
+            continue
+        if arg.startswith("-"):
+            usage("unknown option " + arg)
+        paths.append(arg)
+
+    sources = [(f"<{name}>", text) for name, text in samples.items()]
+    for path in paths:
+        with open(path, "rt", encoding="utf-8") as f:
+            sources.append((path, f.read()))
+
+    failures = 0
+    for path, text in sources:
+        for engine in sorted(editor.engines):
+            diff = round_trip(text, path, engine)
+            if verbose:
+                print(f"{path} ({engine}): {'ok' if diff is None else 'FAILED'}")
+            if diff is not None:
+                failures += 1
+                print(f"{path} doesn't round-trip with the {engine!r} engine:")
+                print(diff)
+    if failures:
+        sys.exit(1)
+    print(f"{len(sources)} files round-trip with every engine.")
+
+
+if __name__ == "__main__":
+    main()
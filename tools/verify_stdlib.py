@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+
+"""
+usage:
+    verify_stdlib.py [-j <jobs>] [-n <runs>] [-m <module>] [-M <file>] [-t <test>] [-v] <pristine> <edited>
+
+Checks a CPython tree edited by edit_stdlib.py against the
+pristine tree it was made from.
+
+<pristine> and <edited> are either Python interpreters, or the
+roots of built CPython checkouts.  (The interpreter for a checkout
+is "python" or "python.exe" in the root, or under "PCbuild".)
+
+The edited files are the .py files in the standard library of
+<edited> that are missing from, or differ from, the standard
+library of <pristine>.  verify_stdlib.py:
+
+  * byte-compiles every edited file with the edited interpreter,
+  * imports every edited module in a fresh interpreter, in both
+    trees, using "-X importtime", and
+  * optionally runs some of CPython's regression tests in the
+    edited tree (and, if they fail, in the pristine tree too).
+
+It reports every file that doesn't compile, every module that
+imports in the pristine tree but not in the edited tree, and the
+median import time over all runs of every module, for both trees.
+(Modules that fail in both trees are listed, but aren't failures.)
+Before measuring, every module is imported once in each tree, so
+the bytecode caches are warm.  Exits with status 1 if anything
+failed.
+
+-j <jobs> sets the number of worker processes (default: the
+number of CPUs).  Every compile, import, and test runs in a
+worker process of its own; the import times are noisier with
+more jobs, so use "-j 1" for careful measurements.
+
+-n <runs> sets the number of runs (default 1).
+
+-m adds a module to the list of modules to import.
+-M <file> adds every module listed in <file>, one per line.
+('#' starts a comment.)  If you don't specify any modules,
+verify_stdlib.py imports every edited module, except for the
+ones in skip_modules.
+
+-t adds a test to run with regrtest ("python -m test -j <jobs>"),
+e.g. "-t test_enum".  -t may be specified multiple times.
+
+-v prints every measurement, and the output of regrtest.
+"""
+
+import concurrent.futures
+import os
+import re
+import statistics
+import subprocess
+import sys
+import textwrap
+
+import cpython
+import import_time
+
+
+# these modules do something when imported
+# (besides defining things), so they aren't
+# imported unless you ask for them with -m.
+# (neither is any "__main__" module.)
+skip_modules = """
+    antigravity
+    idlelib.idle
+    this
+""".split()
+
+# directories in the standard library that aren't
+# part of it, or can't be edited by edit_stdlib.py.
+ignore_directories = {
+    "__pycache__",
+    "lib-dynload",
+    "site-packages",
+}
+
+import_timeout = 120
+
+# uses only builtins, so it works even if the
+# edited standard library can't import anything.
+# (it's run with -S, so "site" isn't imported either.)
+compile_script = """
+import sys
+for path in sys.argv[1:]:
+    try:
+        with open(path, "rb") as f:
+            compile(f.read(), path, "exec", dont_inherit=True)
+    except (SyntaxError, ValueError) as e:
+        print(path + "\\t" + " ".join(f"{type(e).__name__}: {e}".split()))
+"""
+
+stdlib_script = "import sysconfig; print(sysconfig.get_paths()['stdlib'])"
+
+
+def usage(s):
+    sys.exit(f"error: {s}\n\n{__doc__.strip()}")
+
+
+def stdlib_directory(python):
+    result = cpython.run_python(python, ["-c", stdlib_script])
+    if result.returncode:
+        raise RuntimeError(f"{python} couldn't find its standard library:\n{result.stderr}")
+    return result.stdout.strip()
+
+
+def edited_files(pristine_lib, edited_lib):
+    """
+    returns a sorted list of the paths (relative to edited_lib)
+    of the .py files in edited_lib that are missing from, or
+    differ from, the same file in pristine_lib.
+    """
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(edited_lib):
+        dirnames[:] = sorted(d for d in dirnames if d not in ignore_directories)
+        for filename in filenames:
+            if not filename.endswith(".py"):
+                continue
+            path = os.path.join(dirpath, filename)
+            relpath = os.path.relpath(path, edited_lib)
+            pristine_path = os.path.join(pristine_lib, relpath)
+            with open(path, "rb") as f:
+                edited = f.read()
+            try:
+                with open(pristine_path, "rb") as f:
+                    pristine = f.read()
+            except FileNotFoundError:
+                pristine = None
+            if edited != pristine:
+                paths.append(relpath)
+    paths.sort()
+    return paths
+
+
+def module_name(lib, relpath):
+    """
+    returns the name of the module defined by the file
+    relpath (relative to lib), or None if it isn't
+    importable by name (e.g. test data).
+    """
+    parts = relpath[:-len(".py")].split(os.sep)
+    if parts[-1] == "__init__":
+        parts.pop()
+    if (not parts) or not all(part.isidentifier() for part in parts):
+        return None
+    directory = lib
+    for part in parts[:-1]:
+        directory = os.path.join(directory, part)
+        if not os.path.isfile(os.path.join(directory, "__init__.py")):
+            return None
+    return ".".join(parts)
+
+
+def compile_files(python, lib, paths, jobs):
+    """
+    compiles paths (relative to lib) to bytecode with
+    python, using jobs worker processes.  (it doesn't
+    write .pyc files; importing them does that.)
+    returns a dict mapping the paths that didn't compile
+    to the error.
+    """
+    chunks = [paths[i::jobs] for i in range(jobs)]
+    chunks = [chunk for chunk in chunks if chunk]
+    failures = {}
+    with concurrent.futures.ThreadPoolExecutor(jobs) as executor:
+        results = executor.map(lambda chunk: cpython.run_python(python, ["-S", "-c", compile_script] + [os.path.join(lib, path) for path in chunk]), chunks)
+        for chunk, result in zip(chunks, results):
+            for line in result.stdout.splitlines():
+                path, _, error = line.partition("\t")
+                failures[os.path.relpath(path, lib)] = error
+            if result.returncode:
+                lines = result.stderr.strip().splitlines()
+                error = lines[-1] if lines else f"exit status {result.returncode}"
+                for path in chunk:
+                    failures.setdefault(path, error)
+    return failures
+
+
+def smoke_import(python, module):
+    """
+    imports module in a fresh interpreter.
+    returns a tuple: (microseconds, error).  error is None
+    if the import succeeded, otherwise a one-line description.
+    """
+    try:
+        result = cpython.run_python(python, ["-X", "importtime", "-c", f"import {module}"], timeout=import_timeout)
+    except subprocess.TimeoutExpired:
+        return 0, f"timed out after {import_timeout} seconds"
+    if result.returncode:
+        lines = [line for line in result.stderr.splitlines() if line and not line.startswith("import time:")]
+        return 0, lines[-1] if lines else f"exit status {result.returncode}"
+    return import_time.parse_importtime(result.stderr).get(module, 0), None
+
+
+def print_failures(failures):
+    """
+    prints failures, a dict mapping modules to errors,
+    grouped by error, most common first.  (one class that
+    can't be forward-declared usually breaks every module
+    that imports its module.)
+    """
+    groups = {}
+    for module, error in failures.items():
+        groups.setdefault(error, []).append(module)
+    for error, group in sorted(groups.items(), key=lambda item: (-len(item[1]), item[0])):
+        print(f"    {error}")
+        print(textwrap.fill(" ".join(group), initial_indent=" " * 8, subsequent_indent=" " * 8, break_on_hyphens=False))
+
+
+def run_tests(python, tests, jobs):
+    """
+    runs tests with regrtest.
+    returns the subprocess.CompletedProcess.
+    """
+    return cpython.run_python(python, ["-m", "test", "-j", str(jobs)] + tests)
+
+test_result_re = re.compile(r"^(?:Tests )?[Rr]esult: ")
+
+def print_test_result(name, result, verbose):
+    if verbose:
+        print(result.stdout.rstrip())
+        print(result.stderr.rstrip())
+    lines = [line for line in result.stdout.splitlines() if test_result_re.match(line)]
+    print(f"{name:8}  exit status {result.returncode}  {lines[-1] if lines else ''}")
+    if result.returncode and not verbose:
+        for line in (result.stdout + result.stderr).splitlines()[-15:]:
+            print(f"    {line}")
+
+
+def main():
+    jobs = os.cpu_count() or 1
+    runs = 1
+    modules = []
+    tests = []
+    verbose = False
+    paths = []
+
+    process_jobs = False
+    process_runs = False
+    process_module = False
+    process_module_file = False
+    process_test = False
+
+    for arg in sys.argv[1:]:
+        if process_jobs:
+            if not (arg.isdigit() and int(arg)):
+                usage(f"invalid argument to -j: {arg!r}")
+            jobs = int(arg)
+            process_jobs = False
+            continue
+        if process_runs:
+            if not (arg.isdigit() and int(arg)):
+                usage(f"invalid argument to -n: {arg!r}")
+            runs = int(arg)
+            process_runs = False
+            continue
+        if process_module:
+            modules.append(arg)
+            process_module = False
+            continue
+        if process_module_file:
+            modules.extend(import_time.read_module_list(arg))
+            process_module_file = False
+            continue
+        if process_test:
+            tests.append(arg)
+            process_test = False
+            continue
+        if arg == "-j":
+            process_jobs = True
+            continue
+        if arg == "-n":
+            process_runs = True
+            continue
+        if arg == "-m":
+            process_module = True
+            continue
+        if arg == "-M":
+            process_module_file = True
+            continue
+        if arg == "-t":
+            process_test = True
+            continue
+        if arg == "-v":
+            verbose = not verbose
+            continue
+        if arg.startswith("-"):
+            usage("unknown option " + arg)
+        paths.append(arg)
+
+    if process_jobs or process_runs or process_module or process_module_file or process_test:
+        usage("missing argument")
+    if len(paths) != 2:
+        usage("you must specify exactly two trees, <pristine> and <edited>.")
+
+    try:
+        trees = {
+            "pristine": cpython.find_interpreter(paths[0]),
+            "edited": cpython.find_interpreter(paths[1]),
+        }
+        pristine_lib = stdlib_directory(trees["pristine"])
+        edited_lib = stdlib_directory(trees["edited"])
+    except RuntimeError as e:
+        usage(str(e))
+
+    print(f"pristine: {trees['pristine']}\n          {pristine_lib}")
+    print(f"  edited: {trees['edited']}\n          {edited_lib}\n")
+
+    files = edited_files(pristine_lib, edited_lib)
+    if not files:
+        usage(f"no edited files in {edited_lib!r}")
+    if not modules:
+        for path in files:
+            module = module_name(edited_lib, path)
+            if (module is None) or (module in skip_modules) or (module.rpartition(".")[2] == "__main__"):
+                continue
+            modules.append(module)
+
+    failed = False
+
+    # stage 1: byte-compile.
+    compile_failures = compile_files(trees["edited"], edited_lib, files, jobs)
+    print(f"compiled {len(files)} edited files: {len(compile_failures)} failed.")
+    for path, error in sorted(compile_failures.items()):
+        print(f"    {path}: {error}")
+    print()
+    failed = failed or bool(compile_failures)
+
+    # stage 2: smoke-import, and time it.
+    # (modules that are new in the edited tree, like
+    # forward itself, are only imported there.)
+    new_modules = {module_name(edited_lib, path) for path in files if not os.path.exists(os.path.join(pristine_lib, path))}
+    tasks = [(name, module) for module in modules for name in trees if not ((name == "pristine") and (module in new_modules))]
+    errors = {}
+    times = {task: [] for task in tasks}
+    with concurrent.futures.ThreadPoolExecutor(jobs) as executor:
+        # the first import warms up the bytecode caches.
+        for task, (us, error) in zip(tasks, executor.map(lambda task: smoke_import(trees[task[0]], task[1]), tasks)):
+            if error:
+                errors[task] = error
+        timed = [(name, module) for name, module in tasks if (module not in new_modules) and (("pristine", module) not in errors) and (("edited", module) not in errors)]
+        for run in range(runs):
+            for task, (us, error) in zip(timed, executor.map(lambda task: smoke_import(trees[task[0]], task[1]), timed)):
+                if error:
+                    # it imported the first time, so this is flaky.
+                    errors.setdefault(task, error)
+                    continue
+                times[task].append(us)
+                if verbose:
+                    print(f"run {run + 1:3}  {task[0]:8}  {task[1]:30} {us:9} us")
+            timed.reverse()
+    if verbose:
+        print()
+
+    regressions = [module for module in modules if (("edited", module) in errors) and (("pristine", module) not in errors)]
+    both = [module for module in modules if (("edited", module) in errors) and (("pristine", module) in errors)]
+    fixed = [module for module in modules if (("pristine", module) in errors) and (("edited", module) not in errors)]
+    print(f"imported {len(modules)} modules: {len(regressions)} failed.")
+    print_failures({module: errors[("edited", module)] for module in regressions})
+    if both:
+        print(f"{len(both)} modules also failed to import in the pristine tree:")
+        failures = {}
+        for module in both:
+            error = errors[("edited", module)]
+            if errors[("pristine", module)] != error:
+                error += f"\n        (pristine: {errors[('pristine', module)]})"
+            failures[module] = error
+        print_failures(failures)
+    if fixed:
+        print(f"{len(fixed)} modules only failed to import in the pristine tree:")
+        print_failures({module: errors[("pristine", module)] for module in fixed})
+    print()
+    failed = failed or bool(regressions)
+
+    # sorted by the difference, worst first.
+    deltas = []
+    for module in modules:
+        pristine = times.get(("pristine", module))
+        edited = times[("edited", module)]
+        if pristine and edited:
+            pristine = statistics.median(pristine)
+            edited = statistics.median(edited)
+            deltas.append((edited - pristine, module, pristine, edited))
+    deltas.sort(key=lambda t: (-t[0], t[1]))
+
+    print(f"runs: {runs}\n")
+    print(f"{'module':30} {'pristine ms':>11} {'edited ms':>11} {'delta ms':>9} {'delta':>7}")
+    totals = {"pristine": 0, "edited": 0}
+    for delta, module, pristine, edited in deltas:
+        totals["pristine"] += pristine
+        totals["edited"] += edited
+        percent = f"{delta / pristine * 100:+6.1f}%" if pristine else "    n/a"
+        print(f"{module:30} {pristine / 1000:11.2f} {edited / 1000:11.2f} {delta / 1000:+9.2f} {percent}")
+    pristine = totals["pristine"]
+    edited = totals["edited"]
+    percent = f"{(edited - pristine) / pristine * 100:+6.1f}%" if pristine else "    n/a"
+    print(f"{'total':30} {pristine / 1000:11.2f} {edited / 1000:11.2f} {(edited - pristine) / 1000:+9.2f} {percent}")
+
+    # stage 3: regrtest.
+    if tests:
+        print()
+        print(f"regrtest: {' '.join(tests)}")
+        result = run_tests(trees["edited"], tests, jobs)
+        print_test_result("edited", result, verbose)
+        if result.returncode:
+            pristine_result = run_tests(trees["pristine"], tests, jobs)
+            print_test_result("pristine", pristine_result, verbose)
+            if not pristine_result.returncode:
+                failed = True
+            else:
+                print("(the tests fail in the pristine tree too.)")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()